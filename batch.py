@@ -0,0 +1,27 @@
+import argparse
+import json
+from loguru import logger
+from modules.config_manager import ConfigManager
+from modules.batch_manager import BatchManager
+from modules.utils import set_logger
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Пакетная генерация вариантов постера")
+    parser.add_argument("spec", help="JSON-файл с описанием пакета (base, grid, variants, seeds, outputs)")
+    parser.add_argument("-o", "--output-dir", default="batch_output", help="Каталог для результатов")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Число рабочих процессов (по умолчанию — все ядра)")
+    parser.add_argument("-c", "--config", default="config.ini", help="Путь к конфигурации")
+    parser.add_argument("--log-level", default="INFO")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    set_logger()
+    logger.info("Запуск пакетной генерации")
+    with open(args.spec, encoding="utf-8") as spec_file:
+        spec = json.load(spec_file)
+    config_manager = ConfigManager(args.config, args.log_level)
+    batch_manager = BatchManager(config_manager, args.config, args.log_level)
+    batch_manager.run(spec, args.output_dir, args.workers)
@@ -0,0 +1,70 @@
+"""Замер стоимости стадий кадра в зависимости от числа точек.
+
+Запуск из корня репозитория:
+    python benchmarks/scaling.py [--points 100 1000 10000 100000] [--frames 10] [--backend auto]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loguru import logger
+from modules.config_manager import ConfigManager
+from modules.animation_manager import AnimationManager
+from modules.render_manager import RenderManager
+
+
+def measure(function, frames):
+    """Среднее время вызова в миллисекундах."""
+    started = time.perf_counter()
+    for _ in range(frames):
+        function()
+    return (time.perf_counter() - started) * 1000 / frames
+
+
+def run(points_amounts, frames, config_path, backend="auto"):
+    base_config = ConfigManager(config_path, "ERROR")
+    stages = ["init", "points", "holes", "triangulation", "validation", "draw_points", "draw_lines", "draw_fill"]
+    print(f"{'N':>8} " + " ".join(f"{stage:>13}" for stage in stages) + f" {'bytes/point':>12}")
+    for points_amount in points_amounts:
+        config = base_config.with_overrides({"points_amount": points_amount, "fill_check": True,
+                                               "triangulation_backend": backend})
+        animation_manager = AnimationManager(config, "ERROR")
+        render_manager = RenderManager(config, None, "ERROR")
+        animation_manager.update_frame()
+        render_manager.triangles = animation_manager.get_frame()
+        frame = animation_manager.frame
+
+        timings = {
+            "init": measure(animation_manager.init_frame, 1),
+            "points": measure(animation_manager._update_points, frames),
+            "holes": measure(animation_manager._update_hole_vertices, frames),
+            "triangulation": measure(animation_manager._update_triangles, frames),
+            "validation": measure(lambda: animation_manager.mesh_validator.inspect(
+                frame["points"], frame["triangles"]), frames),
+        }
+        render_manager.triangles = animation_manager.get_frame()
+        render_manager._ensure_target()
+        timings["draw_points"] = measure(render_manager.draw_points, frames)
+        timings["draw_lines"] = measure(render_manager.draw_lines, frames)
+        timings["draw_fill"] = measure(render_manager.draw_fill, frames)
+
+        # Память на точку: массивы состояния кадра и результат триангуляции
+        arrays = [frame["points"], frame["velocities"]] + [value for value in frame["triangles"].values()
+                                                           if hasattr(value, "nbytes")]
+        bytes_per_point = sum(array.nbytes for array in arrays) / len(frame["points"])
+        print(f"{points_amount:>8} " + " ".join(f"{timings[stage]:>11.2f}ms" for stage in stages)
+              + f" {bytes_per_point:>12.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--config", default="config.ini")
+    parser.add_argument("--backend", default="auto", help="Движок триангуляции: auto, triangle, scipy")
+    args = parser.parse_args()
+    logger.remove()
+    run(args.points, args.frames, args.config, args.backend)
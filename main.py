@@ -1,3 +1,7 @@
+import time
+STARTUP_STARTED = time.perf_counter()
+
+import argparse
 import sys
 from PySide6.QtWidgets import QApplication
 from PySide6.QtCore import QTimer
@@ -9,76 +13,177 @@ from loguru import logger
 from modules.utils import set_logger
 
 class MainApplication:
-    def __init__(self, log_level):
+    def __init__(self, log_level, measure_startup=False):
         """Инициализация приложения"""
+        self.measure_startup = measure_startup
+        self.startup_marks = [("импорт модулей", time.perf_counter())]
         set_logger()
         numeric_log_level = logger.level(log_level).no if isinstance(log_level, str) else log_level
         self.logger = logger.bind(module_level=numeric_log_level)
         logger.info("Инициализация приложения")
 
         self.app = QApplication(sys.argv)
+        self.startup_marks.append(("QApplication", time.perf_counter()))
 
         # Загрузка модулей
         self.config_manager = ConfigManager("config.ini", "INFO")
         self.ui = MainUI(self.config_manager, "INFO")
-        self.animation_manager = AnimationManager(self.config_manager, "INFO")
+        self.startup_marks.append(("интерфейс", time.perf_counter()))
+        process_preview = self.config_manager.get_str("Preview", "mode") == "process"
+        # В режиме process сцену строит процесс предпросмотра, а локальная анимация нужна
+        # только для экспорта и создается при первом sync_scene
+        self.animation_manager = None
+        if not process_preview:
+            self.animation_manager = AnimationManager(self.config_manager, "INFO")
+            self.startup_marks.append(("AnimationManager", time.perf_counter()))
         self.render_manager = RenderManager(self.config_manager, self.ui.canvas, "INFO")
+        self.startup_marks.append(("RenderManager", time.perf_counter()))
+
+        # Предпросмотр в отдельном процессе: симулирует и рисует только он, а локальные менеджеры
+        # получают снимок его сцены перед экспортом
+        self.preview_engine = None
+        if process_preview:
+            from modules.preview_engine import PreviewEngine
+            self.preview_engine = PreviewEngine(self.config_manager, "config.ini", "INFO")
+            self.preview_engine.start()
+            self.preview_timer = QTimer()
+            self.preview_timer.timeout.connect(self.show_preview)
+            self.preview_timer.start(self.config_manager.get_int("Preview", "poll_interval"))
+            self.app.aboutToQuit.connect(self.preview_timer.stop)
+            self.app.aboutToQuit.connect(self.preview_engine.stop)
+            self.startup_marks.append(("процесс предпросмотра", time.perf_counter()))
 
         # Таймер для анимации
         self.animation_timer = QTimer()
         self.animation_timer.timeout.connect(self.update_animation)
         self.is_animating = False
 
+        # Адаптивное качество предпросмотра (в режиме process им управляет процесс предпросмотра)
+        from modules.quality_controller import QualityController
+        self.quality_controller = QualityController("INFO")
+        self.adaptive_quality = self.config_manager.get_bool("Preview", "adaptive_quality")
+        self.shown_quality_level = 0
+
         self.set_signals()
 
     def set_signals(self):
         """Подключение сигналов"""
         self.logger.info("Подключение сигналов")
         try:
-            self.ui.width_input.valueChanged.connect(self.animation_manager.set_width)
             self.ui.width_input.valueChanged.connect(self.ui.update_canvas_size)
-            self.ui.height_input.valueChanged.connect(self.animation_manager.set_height)
             self.ui.height_input.valueChanged.connect(self.ui.update_canvas_size)
-            self.ui.fps_input.valueChanged.connect(self.animation_manager.set_fps)
-            self.ui.duration_input.valueChanged.connect(self.animation_manager.set_duration)
-
-            # Подключение сигналов для слайдеров
-            self.ui.points_amount_slider.valueChanged.connect(self.animation_manager.set_points_amount)
-            self.ui.points_check.toggled.connect(self.render_manager.set_points_check)
-            self.ui.points_size_slider.valueChanged.connect(self.render_manager.set_points_size)
-            self.ui.lines_check.toggled.connect(self.render_manager.set_lines_check)
-            self.ui.lines_width_slider.valueChanged.connect(self.render_manager.set_lines_width)
-            self.ui.fill_check.toggled.connect(self.render_manager.set_fill_check)
-            self.ui.fill_variation_slider.valueChanged.connect(self.render_manager.set_fill_variation)
-            self.ui.hue_slider.valueChanged.connect(self.render_manager.set_hue)
-            self.ui.saturation_slider.valueChanged.connect(self.render_manager.set_saturation)
-            self.ui.brightness_slider.valueChanged.connect(self.render_manager.set_brightness)
-            self.ui.bg_hue_slider.valueChanged.connect(self.render_manager.set_bg_hue)
-            self.ui.bg_saturation_slider.valueChanged.connect(self.render_manager.set_bg_saturation)
-            self.ui.bg_brightness_slider.valueChanged.connect(self.render_manager.set_bg_brightness)
-            self.ui.animation_speed_slider.valueChanged.connect(self.animation_manager.set_animation_speed)
-            self.ui.holes_check.toggled.connect(self.animation_manager.set_holes_check)
+
+            # Изменения параметров: в режиме process сцена живет только в процессе предпросмотра,
+            # и локальные менеджеры получают ее снимок перед экспортом (см. sync_scene)
+            parameters = [
+                (self.ui.width_input.valueChanged, "animation", "set_width"),
+                (self.ui.height_input.valueChanged, "animation", "set_height"),
+                (self.ui.width_input.valueChanged, "render", "set_width"),
+                (self.ui.height_input.valueChanged, "render", "set_height"),
+                (self.ui.fps_input.valueChanged, "animation", "set_fps"),
+                (self.ui.duration_input.valueChanged, "animation", "set_duration"),
+                (self.ui.points_amount_slider.valueChanged, "animation", "set_points_amount"),
+                (self.ui.animation_speed_slider.valueChanged, "animation", "set_animation_speed"),
+                (self.ui.holes_check.toggled, "animation", "set_holes_check"),
+                (self.ui.points_check.toggled, "render", "set_points_check"),
+                (self.ui.points_size_slider.valueChanged, "render", "set_points_size"),
+                (self.ui.lines_check.toggled, "render", "set_lines_check"),
+                (self.ui.lines_width_slider.valueChanged, "render", "set_lines_width"),
+                (self.ui.fill_check.toggled, "render", "set_fill_check"),
+                (self.ui.fill_variation_slider.valueChanged, "render", "set_fill_variation"),
+                (self.ui.hue_slider.valueChanged, "render", "set_hue"),
+                (self.ui.saturation_slider.valueChanged, "render", "set_saturation"),
+                (self.ui.brightness_slider.valueChanged, "render", "set_brightness"),
+                (self.ui.bg_hue_slider.valueChanged, "render", "set_bg_hue"),
+                (self.ui.bg_saturation_slider.valueChanged, "render", "set_bg_saturation"),
+                (self.ui.bg_brightness_slider.valueChanged, "render", "set_bg_brightness"),
+            ]
+            if self.preview_engine is not None:
+                for signal, target, method in parameters:
+                    signal.connect(lambda value, target=target, method=method:
+                                   self.preview_engine.call(target, method, value))
+            else:
+                # При адаптивном качестве сеттеры стиля перерисовывают кадр с качеством предпросмотра
+                if self.adaptive_quality:
+                    self.render_manager.preview_controller = self.quality_controller
+                managers = {"animation": self.animation_manager, "render": self.render_manager}
+                for signal, target, method in parameters:
+                    signal.connect(getattr(managers[target], method))
+                self.ui.width_input.valueChanged.connect(self.show_resized_frame)
+                self.ui.height_input.valueChanged.connect(self.show_resized_frame)
 
             # Подключение кнопок
             self.ui.generate_frame_btn.clicked.connect(self.generate_frame)
             self.ui.export_frame_btn.clicked.connect(self.export_frame)
             self.ui.start_animation_btn.clicked.connect(self.start_animation)
             self.ui.export_animation_btn.clicked.connect(self.export_animation)
+            self.ui.export_sequence_btn.clicked.connect(self.export_sequence)
+            self.ui.export_outputs_btn.clicked.connect(self.export_outputs)
+            self.ui.record_trajectory_btn.clicked.connect(self.record_trajectory)
+            self.ui.export_trajectory_btn.clicked.connect(self.export_trajectory)
 
         except AttributeError as e:
             logger.error(f"Ошибка при подключении сигналов: {e}")
             raise
 
+    def sync_scene(self):
+        """Перенос сцены процесса предпросмотра в локальные менеджеры перед экспортом.
+
+        Возвращает False, если снимок получить не удалось (экспорт тогда не запускается).
+        """
+        if self.preview_engine is None:
+            return True
+        try:
+            animation_state, render_state = self.preview_engine.snapshot()
+        except RuntimeError as e:
+            self.logger.error(f"Ошибка получения сцены предпросмотра: {e}")
+            return False
+        if self.animation_manager is None:
+            self.animation_manager = AnimationManager(self.config_manager, "INFO")
+        self.animation_manager.set_state(animation_state)
+        self.render_manager.set_state(render_state)
+        # Процесс рисует кадр рендерером предпросмотра, поэтому кадр экспорта берется из анимации
+        self.render_manager.triangles = self.animation_manager.get_frame()
+        return True
+
+    def show_preview(self):
+        """Показ последнего кадра из процесса предпросмотра."""
+        if self.preview_engine.show_latest(self.render_manager):
+            self.show_quality(self.preview_engine.quality_level())
+
+    def show_quality(self, level):
+        """Обновление подписи качества предпросмотра при смене уровня."""
+        if level == self.shown_quality_level:
+            return
+        self.shown_quality_level = level
+        self.ui.quality_label.setText(f"Качество предпросмотра: {self.quality_controller.describe(level)}")
+
+    def show_frame(self, triangles):
+        """Показ кадра в режиме inline: при адаптивном качестве — с качеством предпросмотра."""
+        if not self.adaptive_quality:
+            self.render_manager.render_frame(triangles)
+            return
+        # Кадр запоминается в рендерере, чтобы сеттеры стиля и экспорт кадра брали текущий кадр
+        self.render_manager.triangles = triangles
+        self.render_manager.render_preview(triangles, self.quality_controller.quality)
+
+    def show_resized_frame(self, value):
+        """Показ кадра, заново сгенерированного под новое разрешение (только режим inline)."""
+        self.show_frame(self.animation_manager.get_frame())
+
     def generate_frame(self):
         """Генерация кадра"""
         self.logger.info("Запуск генерации кадра")
+        if self.preview_engine is not None:
+            self.preview_engine.generate()
+            return
         self.animation_manager.init_frame()
-        triangles = self.animation_manager.get_frame()
-        self.render_manager.render_frame(triangles)
+        self.show_frame(self.animation_manager.get_frame())
 
     def export_frame(self):
         self.logger.info("Экспорт кадра")
-        self.render_manager.save_image()
+        if self.sync_scene():
+            self.render_manager.save_image()
 
     def start_animation(self):
         self.logger.info("Запуск/остановка анимации")
@@ -88,12 +193,17 @@ class MainApplication:
             if fps <= 0:
                 self.logger.error("Частота кадров должна быть больше 0")
                 return
-            interval = 1000 // fps  # Интервал в миллисекундах
-            self.animation_timer.start(interval)
+            if self.preview_engine is not None:
+                self.preview_engine.set_running(True, fps)
+            else:
+                interval = 1000 // fps  # Интервал в миллисекундах
+                self.animation_timer.start(interval)
             self.is_animating = True
             self.ui.start_animation_btn.setText("Стоп анимации")
         else:
             # Останавливаем анимацию
+            if self.preview_engine is not None:
+                self.preview_engine.set_running(False, self.ui.fps_input.value())
             self.animation_timer.stop()
             self.is_animating = False
             self.ui.start_animation_btn.setText("Старт анимации")
@@ -103,9 +213,14 @@ class MainApplication:
         self.logger.debug("Обновление анимации")
 
         # Обновляем кадр анимации
+        frame_started = time.perf_counter()
         self.animation_manager.update_frame()
-        triangles = self.animation_manager.get_frame()
-        self.render_manager.render_frame(triangles)
+        self.show_frame(self.animation_manager.get_frame())
+        if not self.adaptive_quality:
+            return
+        budget = 1 / max(self.ui.fps_input.value(), 1)
+        if self.quality_controller.update(time.perf_counter() - frame_started, budget):
+            self.show_quality(self.quality_controller.level)
 
     def export_animation(self):
         self.logger.info("Запуск экспорта анимации")
@@ -114,14 +229,55 @@ class MainApplication:
             fps = self.ui.fps_input.value()
             duration = self.ui.duration_input.value()
             # Вызываем метод экспорта из RenderManager
-            self.render_manager.export_animation(self.animation_manager, fps, duration)
+            if self.sync_scene():
+                self.render_manager.export_animation(self.animation_manager, fps, duration)
         except Exception as e:
             self.logger.error(f"Ошибка при запуске экспорта анимации: {e}")
 
+    def export_sequence(self):
+        self.logger.info("Запуск экспорта последовательности кадров")
+        fps = self.ui.fps_input.value()
+        duration = self.ui.duration_input.value()
+        if self.sync_scene():
+            self.render_manager.export_sequence(self.animation_manager, fps, duration)
+
+    def export_outputs(self):
+        self.logger.info("Запуск экспорта комплекта выходов")
+        fps = self.ui.fps_input.value()
+        duration = self.ui.duration_input.value()
+        if self.sync_scene():
+            self.render_manager.export_outputs(self.animation_manager, fps, duration)
+
+    def record_trajectory(self):
+        self.logger.info("Запуск записи траектории")
+        fps = self.ui.fps_input.value()
+        duration = self.ui.duration_input.value()
+        if self.sync_scene():
+            self.render_manager.record_trajectory(self.animation_manager, fps, duration)
+
+    def export_trajectory(self):
+        self.logger.info("Запуск экспорта анимации из траектории")
+        if self.sync_scene():
+            self.render_manager.export_trajectory()
+
+    def report_startup(self):
+        """Вывод времени этапов запуска и завершение (режим замера запуска)."""
+        self.startup_marks.append(("показ окна", time.perf_counter()))
+        previous = STARTUP_STARTED
+        for stage, mark in self.startup_marks:
+            self.logger.info(f"Запуск: {stage:<18} +{(mark - previous) * 1000:7.1f} мс, всего {(mark - STARTUP_STARTED) * 1000:7.1f} мс")
+            previous = mark
+        self.app.quit()
+
     def run(self):
         self.ui.show()
+        if self.measure_startup:
+            QTimer.singleShot(0, self.report_startup)
         sys.exit(self.app.exec())
 
 if __name__ == '__main__':
-    app = MainApplication("INFO")
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--startup-time", action="store_true", help="Замерить время запуска и выйти")
+    args, _ = parser.parse_known_args()
+    app = MainApplication("INFO", measure_startup=args.startup_time)
     app.run()
\ No newline at end of file
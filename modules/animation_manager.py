@@ -1,13 +1,22 @@
-import random
+import copy
 import numpy as np
-import triangle
 from loguru import logger
+from modules.trajectory import TrajectoryWriter
+from modules.hole_mask import HoleMask, closest_points_on_polygon, points_in_polygon
+from modules.mesh_validation import MeshValidator, duplicate_points, triangle_orientations
+from modules.triangulation import Triangulator, TriangulationError
 
 class AnimationManager:
+    SAMPLER_MAX_BATCHES = 32  # Предел пакетов кандидатов при генерации точек
+    MESH_NUDGE = 0.5  # Наибольший сдвиг точки при исправлении сетки, пикселей
+    DUPLICATE_ATTEMPTS = 8  # Предел попыток развести совпадающие точки перед триангуляцией
+
     def __init__(self, config_manager, log_level="ERROR"):
         numeric_log_level = logger.level(log_level).no if isinstance(log_level, str) else log_level
         self.logger = logger.bind(module_level=numeric_log_level)
         self.config = config_manager
+        # Собственный генератор экземпляра вместо глобальных random/np.random: сцены в разных потоках независимы
+        self.rng = np.random.default_rng()
         self.frame_width = self.config.get_int("ImageParams", "width_default")
         self.frame_height = self.config.get_int("ImageParams", "height_default")
         self.fps = self.config.get_int("ImageParams", "fps_default")
@@ -17,8 +26,19 @@ class AnimationManager:
         self.min_points_speed = self.config.get_int("AnimationParams", "min_points_speed_default")
         self.max_points_speed = self.config.get_int("AnimationParams", "max_points_speed_default")
         self.holes_check = self.config.get_bool("GenerationParams", "holes_check")
-
-        self.empty_areas = self.config.get_empty_areas()  # Получаем пустые области из конфига
+        # Модель движения: ballistic — свободный полет, repulsion — с отталкиванием соседей по сетке
+        self.motion_model = self.config.get_str("AnimationParams", "motion_model")
+        self.repulsion_strength = self.config.get_int("AnimationParams", "repulsion_strength_default")
+        self.speed_damping = self.config.get_int("AnimationParams", "speed_damping_default")
+        self.triangulator = Triangulator(self.config.get_str("GenerationParams", "triangulation_backend"), log_level)
+        self.mesh_validator = MeshValidator(self.config.get_int("GenerationParams", "mesh_repair_retries"), log_level)
+
+        # Пустые области в координатах текущего размера кадра
+        self.area_geometry = self.config.get_empty_area_geometry(self.frame_width, self.frame_height)
+        self.empty_areas = self.area_geometry["polygons"]
+        self.mask_cell_size = self.config.get_int("EmptyAreas", "mask_cell_size")
+        self.hole_mask = None  # Карта занятости пустых областей, строится лениво
+        self.hole_mask_key = None
         # Инициализация параметров движения для вершин пустых областей
         self.hole_vertex_params = self._init_hole_vertex_params()
         self.init_frame()
@@ -30,15 +50,16 @@ class AnimationManager:
         for area in self.empty_areas:
             area_params = []
             for vertex in area:
-                # Случайный радиус движения (в пределах 10-30 пикселей)
-                radius = np.random.uniform(10, 30)
+                # Случайный радиус движения (в пределах 10-30 пикселей опорного кадра)
+                base_radius = self.rng.uniform(10, 30)
                 # Случайная угловая скорость (в радианах за кадр, от 0.01 до 0.05)
-                angular_speed = np.random.uniform(0.01, 0.05)
+                angular_speed = self.rng.uniform(0.01, 0.05)
                 # Случайная начальная фаза (0-2π)
-                phase = np.random.uniform(0, 2 * np.pi)
+                phase = self.rng.uniform(0, 2 * np.pi)
                 area_params.append({
                     'center': np.array(vertex, dtype=np.float64),  # Центр вращения (исходная позиция)
-                    'radius': radius,
+                    'base_radius': base_radius,
+                    'radius': base_radius * self.area_geometry["scale"],
                     'angular_speed': angular_speed,
                     'phase': phase,
                     'current_angle': phase  # Текущий угол для отслеживания
@@ -46,8 +67,95 @@ class AnimationManager:
             params.append(area_params)
         return params
 
+    def _apply_frame_size(self):
+        """Пересчет пустых областей под текущий размер кадра.
+
+        Геометрия берется из кэша конфигурации; фазы и скорости вращения вершин сохраняются.
+        """
+        self.area_geometry = self.config.get_empty_area_geometry(self.frame_width, self.frame_height)
+        self.empty_areas = self.area_geometry["polygons"]
+        for area, area_params in zip(self.empty_areas, self.hole_vertex_params):
+            for vertex, param in zip(area, area_params):
+                param['center'] = np.array(vertex, dtype=np.float64)
+                param['radius'] = param['base_radius'] * self.area_geometry["scale"]
+
+    def simulation_settings(self):
+        """Параметры, от которых зависит движение и сетка: по ним сверяются прогоны одного экспорта."""
+        return {
+            "width": self.frame_width,
+            "height": self.frame_height,
+            "points_amount": self.points_amount,
+            "animation_speed": self.animation_speed,
+            "points_speed": [self.min_points_speed, self.max_points_speed],
+            "holes_check": self.holes_check,
+            "empty_areas": [np.round(area, 6).tolist() for area in self.empty_areas] if self.holes_check else [],
+            "motion_model": self.motion_model,
+            "repulsion_strength": self.repulsion_strength,
+            "speed_damping": self.speed_damping,
+            "triangulation_backend": self.triangulator.preferred,
+            "mesh_repair_retries": self.mesh_validator.max_retries
+        }
+
+    # Состояние сцены, которое передается между процессами (см. get_state/set_state)
+    STATE_FIELDS = ("frame_width", "frame_height", "fps", "duration", "points_amount", "animation_speed",
+                    "min_points_speed", "max_points_speed", "holes_check", "motion_model", "repulsion_strength",
+                    "speed_damping", "hole_vertex_params", "frame")
+
+    def get_state(self):
+        """Снимок сцены: параметры, текущий кадр и состояние генератора случайных чисел."""
+        state = {field: copy.deepcopy(getattr(self, field)) for field in self.STATE_FIELDS}
+        state["rng"] = self.rng.bit_generator.state
+        return state
+
+    def set_state(self, state):
+        """Восстановление сцены из get_state, в том числе снятой в другом процессе.
+
+        Кадр не пересчитывается: после восстановления get_frame возвращает ту же
+        геометрию, а следующие кадры совпадают с кадрами исходной сцены.
+        """
+        for field in self.STATE_FIELDS:
+            setattr(self, field, copy.deepcopy(state[field]))
+        self.rng = np.random.default_rng()
+        self.rng.bit_generator.state = state["rng"]
+        self.area_geometry = self.config.get_empty_area_geometry(self.frame_width, self.frame_height)
+        self.empty_areas = self.area_geometry["polygons"]
+        if self.holes_check:
+            self._refresh_hole_mask()
+
+    def reset(self, seed=None):
+        """Перезапуск симуляции; при заданном зерне движение воспроизводимо."""
+        self.logger.debug(f"Перезапуск симуляции с зерном {seed}")
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.mesh_validator.reset_counters()
+        self.hole_vertex_params = self._init_hole_vertex_params()
+        self.init_frame()
+
+    def _refresh_hole_mask(self):
+        """Перестроение карты пустых областей при смене размера кадра или параметров вершин."""
+        slack = max((param['radius'] for area_params in self.hole_vertex_params for param in area_params), default=0)
+        key = (self.frame_width, self.frame_height, slack)
+        if self.hole_mask_key == key:
+            return
+        self.hole_mask = HoleMask(self.frame_width, self.frame_height, self.mask_cell_size)
+        self.hole_mask.build(self.empty_areas, slack)
+        self.hole_mask_key = key
+
+    def _hole_polygons(self):
+        """Текущие положения полигонов пустых областей."""
+        polygons = []
+        for area_params in self.hole_vertex_params:
+            polygons.append(np.array([
+                param['center'] + param['radius'] * np.array([np.cos(param['current_angle']),
+                                                              np.sin(param['current_angle'])])
+                for param in area_params
+            ]))
+        return polygons
+
     def init_frame(self):
         self.logger.debug("Инициализация кадра")
+        if self.holes_check:
+            self._refresh_hole_mask()
 
         # Генерация 4 статичных точек в углах
         corner_points = self._generate_corner_points()
@@ -81,33 +189,17 @@ class AnimationManager:
 
         # Скорости для случайных точек (свободное движение)
         hole_vertices_count = sum(len(area) for area in self.empty_areas) if self.holes_check else 0
-        for i in range(12, len(points) - hole_vertices_count):  # Начиная с индекса 12 до вершин пустых областей
-            speed = np.random.uniform(self.min_points_speed, self.max_points_speed)
-            angle = np.random.uniform(0, 2 * np.pi)
-            velocities[i] = np.array([speed * np.cos(angle), speed * np.sin(angle)])
+        free_count = len(points) - 12 - hole_vertices_count  # С индекса 12 до вершин пустых областей
+        speeds = self.rng.uniform(self.min_points_speed, self.max_points_speed, free_count)
+        angles = self.rng.uniform(0, 2 * np.pi, free_count)
+        velocities[12:12 + free_count] = np.column_stack([speeds * np.cos(angles), speeds * np.sin(angles)])
 
         # Скорости для точек на сторонах (движение только вдоль одной оси)
-        for i in [4, 5]:  # Верхняя сторона
-            velocities[i][0] = np.random.uniform(self.min_points_speed, self.max_points_speed) * np.random.choice([-1, 1])
-            velocities[i][1] = 0  # Нет движения по Y
-        for i in [6, 7]:  # Нижنوع
-            velocities[i][0] = np.random.uniform(self.min_points_speed, self.max_points_speed) * np.random.choice([-1, 1])
-            velocities[i][1] = 0  # Нет движения по Y
-        for i in [8, 9]:  # Левая сторона
-            velocities[i][0] = 0  # Нет движения по X
-            velocities[i][1] = np.random.uniform(self.min_points_speed, self.max_points_speed) * np.random.choice([-1, 1])
-        for i in [10, 11]:  # Правая сторона
-            velocities[i][0] = 0  # Нет движения по X
-            velocities[i][1] = np.random.uniform(self.min_points_speed, self.max_points_speed) * np.random.choice([-1, 1])
-
-        # Подготовка данных для триангуляции
-        triangles = self._perform_triangulation(points)
+        side_speeds = self.rng.uniform(self.min_points_speed, self.max_points_speed, 8) * self.rng.choice([-1, 1], 8)
+        velocities[4:8, 0] = side_speeds[:4]  # Верхняя и нижняя стороны, нет движения по Y
+        velocities[8:12, 1] = side_speeds[4:]  # Левая и правая стороны, нет движения по X
 
-        # Проверка, что все точки имеют связи
-        if not self._verify_points_connectivity(points, triangles):
-            self.logger.warning("Обнаружены точки без связей, повторная триангуляция")
-            points, velocities = self._adjust_points_for_connectivity(points, velocities)
-            triangles = self._perform_triangulation(points)
+        triangles = self._triangulate_validated(points)
 
         self.frame = {
             "triangles": triangles,
@@ -125,138 +217,221 @@ class AnimationManager:
         return corner_points
 
     def _generate_side_points(self):
-        """Генерация 8 точек на сторонах холста (по 2 на каждую сторону)."""
+        """Генерация 8 точек на сторонах холста (по 2 на каждую сторону).
+
+        Координата вдоль стороны берется строго между углами: точка в углу совпала бы
+        с концом обязательного ребра, а такое совпадение обрушивает triangle.
+        """
         side_points = []
         for _ in range(2):
-            x = random.randint(0, self.frame_width)
+            x = self.rng.integers(1, self.frame_width)
             side_points.append([x, self.frame_height])
         for _ in range(2):
-            x = random.randint(0, self.frame_width)
+            x = self.rng.integers(1, self.frame_width)
             side_points.append([x, 0])
         for _ in range(2):
-            y = random.randint(0, self.frame_height)
+            y = self.rng.integers(1, self.frame_height)
             side_points.append([0, y])
         for _ in range(2):
-            y = random.randint(0, self.frame_height)
+            y = self.rng.integers(1, self.frame_height)
             side_points.append([self.frame_width, y])
         return np.array(side_points)
 
     def _generate_random_points(self):
-        """Генерация случайных точек, избегая пустых областей, если включены."""
-        random_points = []
-        for _ in range(self.points_amount):
-            while True:
-                point = [random.randint(0, self.frame_width), random.randint(0, self.frame_height)]
-                if not self.holes_check or not self._is_point_in_holes(point):
-                    random_points.append(point)
-                    break
-        return np.array(random_points)
-
-    def _is_point_in_holes(self, point):
-        """Проверка, находится ли точка внутри пустых областей."""
+        """Генерация случайных точек, избегая пустых областей, если включены.
+
+        Кандидаты генерируются пакетами и фильтруются векторной проверкой по карте
+        занятости. Число пакетов ограничено; если свободной площади не осталось,
+        выбрасывается ValueError.
+        """
         if not self.holes_check:
-            return False
-        for area_idx, area in enumerate(self.empty_areas):
-            # Если frame существует (анимация), используем текущие позиции вершин
-            if hasattr(self, 'frame') and 'points' in self.frame:
-                current_area = []
-                vertex_offset = len(self.frame["points"]) - sum(len(a) for a in self.empty_areas) + sum(
-                    len(a) for a in self.empty_areas[:area_idx])
-                for i in range(len(area)):
-                    current_area.append(self.frame["points"][vertex_offset + i])
-            else:
-                # Во время инициализации используем статические координаты из empty_areas
-                current_area = area
-            if self._point_in_polygon(point, np.array(current_area)):
-                return True
-        return False
-
-    def _point_in_polygon(self, point, polygon):
-        """Проверка, находится ли точка внутри полигона (Ray Casting алгоритм)."""
-        x, y = point
-        n = len(polygon)
-        inside = False
-        j = n - 1
-        for i in range(n):
-            if ((polygon[i][1] > y) != (polygon[j][1] > y)) and \
-               (x < (polygon[j][0] - polygon[i][0]) * (y - polygon[i][1]) /
-                (polygon[j][1] - polygon[i][1]) + polygon[i][0]):
-                inside = not inside
-            j = i
-        return inside
+            return np.column_stack([
+                self.rng.integers(0, self.frame_width + 1, self.points_amount),
+                self.rng.integers(0, self.frame_height + 1, self.points_amount)
+            ])
+
+        self._refresh_hole_mask()
+        free_fraction = self.hole_mask.free_fraction()
+        boundary_fraction = np.count_nonzero(self.hole_mask.grid == HoleMask.BOUNDARY) / self.hole_mask.grid.size
+        if free_fraction == 0 and boundary_fraction == 0:
+            raise ValueError("Пустые области закрывают весь холст, нет места для точек")
+
+        polygons = self._hole_polygons()
+        # Начальная оценка доли принятых кандидатов, уточняется по факту
+        acceptance = max(free_fraction + boundary_fraction / 2, 0.01)
+        accepted = []
+        remaining = self.points_amount
+        for _ in range(self.SAMPLER_MAX_BATCHES):
+            if remaining <= 0:
+                break
+            batch_size = int(np.ceil(remaining / acceptance * 1.2)) + 8
+            candidates = np.column_stack([
+                self.rng.integers(0, self.frame_width + 1, batch_size),
+                self.rng.integers(0, self.frame_height + 1, batch_size)
+            ])
+            free = candidates[self.hole_mask.locate(candidates, polygons) == HoleMask.OUTSIDE]
+            acceptance = max(len(free) / batch_size, 0.01)
+            accepted.append(free[:remaining])
+            remaining -= len(accepted[-1])
+
+        if remaining > 0:
+            raise ValueError(f"Не удалось разместить {remaining} точек вне пустых областей")
+        return np.concatenate(accepted) if accepted else np.empty((0, 2), dtype=np.int64)
 
     def _perform_triangulation(self, points):
-        """Выполнение триангуляции."""
-        self.logger.debug("Выполняем триангуляцию с использованием triangle")
+        """Выполнение триангуляции выбранным движком с откатом на остальные."""
+        self.logger.debug(f"Выполняем триангуляцию ({self.triangulator.preferred})")
+        if len(points) < 3:
+            self.logger.warning("Недостаточно точек для триангуляции")
+            return {'vertices': points, 'triangles': np.array([])}
+        segments = [
+            [0, 1], [1, 3], [3, 2], [2, 0],  # Углы холста
+            [4, 5],  # Верхняя сторона
+            [6, 7],  # Нижняя сторона
+            [8, 9],  # Левая сторона
+            [10, 11]  # Правая сторона
+        ]
+        hole_loops = []
+        if self.holes_check and self.empty_areas:
+            # Контуры областей заранее посчитаны в конфигурации, здесь только сдвиг нумерации
+            vertex_offset = len(points) - sum(len(area) for area in self.empty_areas)
+            segments.extend((self.area_geometry["segments"] + vertex_offset).tolist())
+            hole_loops = [loop + vertex_offset for loop in self.area_geometry["loops"]]
         try:
-            tri_input = {
-                'vertices': points,
-            }
-            boundary_segments = [
-                [0, 1], [1, 3], [3, 2], [2, 0]  # Углы холста
-            ]
-            boundary_segments.extend([
-                [4, 5],  # Верхняя сторона
-                [6, 7],  # Нижняя сторона
-                [8, 9],  # Левая сторона
-                [10, 11]  # Правая сторона
-            ])
-            holes = []
-            segments = boundary_segments
-            vertex_offset = len(points) - sum(len(area) for area in self.empty_areas) if self.holes_check else len(points)
-            if self.holes_check and self.empty_areas:
-                for area_idx, area in enumerate(self.empty_areas):
-                    n_points = len(area)
-                    for i in range(n_points):
-                        segments.append([vertex_offset + i, vertex_offset + (i + 1) % n_points])
-                    centroid = np.mean([self.frame["points"][vertex_offset + i] for i in range(n_points)] if hasattr(self, 'frame') else area, axis=0)
-                    holes.append(centroid)
-                    vertex_offset += n_points
-                tri_input['holes'] = np.array(holes)
-            tri_input['segments'] = np.array(segments)
-            if len(points) >= 3:
-                tri = triangle.triangulate(tri_input, 'p')
-                return tri
-            else:
-                self.logger.warning("Недостаточно точек для триангуляции")
-                return {'vertices': points, 'triangles': np.array([])}
-        except Exception as e:
+            return self.triangulator.triangulate(np.asarray(points, dtype=np.float64), segments, hole_loops,
+                                                 edges=self.motion_model == "repulsion")
+        except TriangulationError as e:
             self.logger.error(f"Ошибка при выполнении триангуляции: {e}")
             return {'vertices': points, 'triangles': np.array([])}
 
-    def _verify_points_connectivity(self, points, triangles):
-        """Проверка, что все точки участвуют в триангуляции."""
-        if 'triangles' not in triangles or len(triangles['triangles']) == 0:
+    def _triangulate_validated(self, points):
+        """Триангуляция с проверкой сетки и ограниченным числом попыток исправления.
+
+        Число точек не меняется: совпадающие и проблемные подвижные точки сдвигаются
+        на месте (см. _repair_points), после чего сцена триангулируется заново, не больше
+        mesh_repair_retries раз. Если исправить не удалось, принимается последняя
+        триангуляция: точки без связей просто не попадают в кадр.
+
+        Совпадающие точки разводятся до первой триангуляции, пока не останется ни одной
+        пары: triangle падает на них целым процессом, и перехватить это нельзя. Если развести
+        не удалось (совпали неподвижные точки), кадр остается без треугольников.
+        """
+        duplicates = found = duplicate_points(points)
+        for _ in range(self.DUPLICATE_ATTEMPTS):
+            if len(duplicates) == 0 or not self._repair_points(points, duplicates):
+                break
+            duplicates = duplicate_points(points)
+        if len(duplicates):
+            self.logger.error(f"Не удалось развести {len(duplicates)} совпадающих точек, кадр без триангуляции")
+            triangles = {'vertices': points, 'triangles': np.array([])}
+            report = self.mesh_validator.inspect(points, triangles)
+            self.mesh_validator.record(len(found), report, report, 0)
+            return triangles
+        triangles = self._perform_triangulation(points)
+        first_report = report = self.mesh_validator.inspect(points, triangles)
+        retriangulations = 0
+        while not report["valid"] and not report["empty"] and retriangulations < self.mesh_validator.max_retries:
+            if not self._repair_points(points, self.mesh_validator.problem_points(report)):
+                break
+            triangles = self._perform_triangulation(points)
+            report = self.mesh_validator.inspect(points, triangles)
+            retriangulations += 1
+        self.mesh_validator.record(len(found), first_report, report, retriangulations)
+        return triangles
+
+    def _repair_points(self, points, candidates):
+        """Сдвиг подвижных точек из candidates на месте. Возвращает True, если что-то сдвинуто.
+
+        Точки внутри пустых областей выталкиваются за ближайшее ребро контура,
+        остальные смещаются на доли пикселя. Угловые точки и вершины пустых областей
+        не двигаются, точки на сторонах — только вдоль своей стороны. Сдвинутые точки
+        отражаются внутрь кадра с отступом MESH_NUDGE от краев, поэтому не попадают
+        ни в углы, ни на стороны (обрезка по краю вернула бы точку в угол).
+        """
+        hole_vertices_count = sum(len(area) for area in self.empty_areas) if self.holes_check else 0
+        movable_end = len(points) - hole_vertices_count
+        candidates = np.asarray(candidates, dtype=np.int64)
+        candidates = candidates[(candidates >= 4) & (candidates < movable_end)]
+        if len(candidates) == 0:
             return False
-        used_vertices = set(triangles['triangles'].flatten())
-        return all(i in used_vertices for i in range(len(points)))
-
-    def _adjust_points_for_connectivity(self, points, velocities):
-        self.logger.debug("Добавление точек для обеспечения связности")
-        additional_points = []
-        additional_velocities = []
-        max_additional = max(0, self.points_amount + 12 - len(points))
-        for _ in range(min(5, max_additional)):
-            point = [random.randint(0, self.frame_width), random.randint(0, self.frame_height)]
-            if not self.holes_check or not self._is_point_in_holes(point):
-                additional_points.append(point)
-                speed = np.random.uniform(self.min_points_speed, self.max_points_speed)
-                angle = np.random.uniform(0, 2 * np.pi)
-                additional_velocities.append([speed * np.cos(angle), speed * np.sin(angle)])
-        if additional_points:
-            points = np.vstack([points, additional_points])
-            velocities = np.vstack([velocities, additional_velocities])
-        return points, velocities
-
-    def update_frame(self):
+
+        nudged = np.ones(len(candidates), dtype=bool)
+        if self.holes_check:
+            polygons = self._hole_polygons()
+            area_indices = self.hole_mask.locate(points[candidates], polygons)
+            for area_idx, polygon in enumerate(polygons):
+                inside = np.nonzero(area_indices == area_idx)[0]
+                if len(inside):
+                    points[candidates[inside]] = self._push_out_of_polygon(points[candidates[inside]], polygon)
+                    nudged[inside] = False
+
+        idx = candidates[nudged]
+        offsets = self.rng.uniform(-self.MESH_NUDGE, self.MESH_NUDGE, (len(idx), 2))
+        # Точки на сторонах (4-11) остаются на своей стороне
+        offsets[(idx >= 4) & (idx < 8), 1] = 0
+        offsets[(idx >= 8) & (idx < 12), 0] = 0
+        points[idx] += offsets
+        low = self.MESH_NUDGE
+        high = np.array([self.frame_width, self.frame_height], dtype=np.float64) - self.MESH_NUDGE
+        moved = points[candidates]
+        # Ось, закрепленная за стороной, не меняется: точки сторон отражаются только вдоль стороны
+        free_axes = np.ones_like(moved, dtype=bool)
+        free_axes[(candidates >= 4) & (candidates < 8), 1] = False
+        free_axes[(candidates >= 8) & (candidates < 12), 0] = False
+        reflected = np.where(moved < low, 2 * low - moved, moved)
+        reflected = np.clip(np.where(reflected > high, 2 * high - reflected, reflected), low, high)
+        points[candidates] = np.where(free_axes, reflected, moved)
+        return True
+
+    def _push_out_of_polygon(self, points, polygon):
+        """Точки внутри полигона переносятся на пиксель дальше ближайшей точки его контура."""
+        nearest = closest_points_on_polygon(points, polygon)
+        outward = nearest - points
+        norms = np.linalg.norm(outward, axis=1, keepdims=True)
+        outward = np.where(norms > 0, outward / np.where(norms > 0, norms, 1), [1.0, 0.0])
+        return nearest + outward
+
+    def update_frame(self, keyframe=True):
+        """Шаг анимации.
+
+        keyframe=False разрешает переиспользовать топологию предыдущего кадра: треугольники
+        остаются прежними, меняются только координаты вершин. Если хотя бы один треугольник
+        вывернулся или выродился, кадр все равно триангулируется заново.
+        """
         self.logger.debug("Обновление кадра для анимации")
-        self._update_points()
+        # Сначала сдвигаются пустые области: столкновения точек проверяются с их новыми положениями,
+        # иначе область наезжает на уже обработанную точку и та остается без связей
         if self.holes_check:
             self._update_hole_vertices()
-        self._update_triangles()
+        self._update_points()
+        if keyframe or not self._reuse_triangles():
+            self._update_triangles()
+
+    def _reuse_triangles(self):
+        """Перенос треугольников прошлого кадра на новые позиции точек. Стоимость O(T).
+
+        Возвращает False, если топологию нельзя сохранить: сменилось число вершин
+        или ориентация какого-либо треугольника не совпадает с ориентацией в опорном кадре.
+        """
+        triangles = self.frame["triangles"]
+        points = self.frame["points"]
+        if 'triangles' not in triangles or len(triangles['triangles']) == 0 or len(triangles['vertices']) != len(points):
+            return False
+        simplices = np.asarray(triangles['triangles'])
+        if "orientation" not in self.frame:
+            self.frame["orientation"] = np.sign(triangle_orientations(np.asarray(triangles['vertices']), simplices))
+        # Порог отсекает почти вырожденные треугольники, чтобы не тянуть их до следующего опорного кадра
+        areas = triangle_orientations(points, simplices) * self.frame["orientation"]
+        if not np.all(areas > 1e-6):
+            self.logger.debug("Топология изменилась, внеочередная триангуляция")
+            return False
+        reused = dict(triangles)
+        reused['vertices'] = points.copy()
+        self.frame["triangles"] = reused
+        return True
 
     def _update_hole_vertices(self):
-        """Обновление позиций вершин пустых областей по круговой траектории."""
+        """Обновление позиций вершин пустых областей по круговой траектории. Не зависит от N."""
         self.logger.debug("Обновление позиций вершин пустых областей")
         vertex_offset = len(self.frame["points"]) - sum(len(area) for area in self.empty_areas)
         for area_idx, area_params in enumerate(self.hole_vertex_params):
@@ -271,110 +446,131 @@ class AnimationManager:
                 self.frame["points"][point_idx] = [x, y]
 
     def _update_points(self):
-        """Обновление положения точек с отталкиванием от пустых областей."""
-        proposed_points = self.frame["points"].copy().astype(np.float64)
+        """Обновление положения точек с отталкиванием от пустых областей.
+
+        Все шаги векторные, стоимость O(N); поштучно обрабатываются только точки,
+        столкнувшиеся с пустой областью в этом кадре.
+        """
+        points = self.frame["points"]
+        velocities = self.frame["velocities"]
         hole_vertices_count = sum(len(area) for area in self.empty_areas) if self.holes_check else 0
+        movable_end = len(points) - hole_vertices_count
+
+        if self.motion_model == "repulsion":
+            self._apply_neighbour_forces(12, movable_end)
 
-        # Обновление точек на сторонах (4-11) с ограничением по одной оси
-        for i in [4, 5]:  # Верхняя сторона
-            proposed_points[i][0] += self.frame["velocities"][i][0] * self.animation_speed
-            proposed_points[i][1] = self.frame_height  # Фиксируем Y
-        for i in [6, 7]:  # Нижняя сторона
-            proposed_points[i][0] += self.frame["velocities"][i][0] * self.animation_speed
-            proposed_points[i][1] = 0  # Фиксируем Y
-        for i in [8, 9]:  # Левая сторона
-            proposed_points[i][0] = 0  # Фиксируем X
-            proposed_points[i][1] += self.frame["velocities"][i][1] * self.animation_speed
-        for i in [10, 11]:  # Правая сторона
-            proposed_points[i][0] = self.frame_width  # Фиксируем X
-            proposed_points[i][1] += self.frame["velocities"][i][1] * self.animation_speed
-
-        # Обновление случайных точек
-        for i in range(12, len(proposed_points) - hole_vertices_count):
-            proposed_points[i] += self.frame["velocities"][i] * self.animation_speed
-
-            # Проверка столкновений с пустыми областями, если включены
-            if self.holes_check:
-                for area_idx, area in enumerate(self.empty_areas):
-                    current_area = []
-                    vertex_offset = len(self.frame["points"]) - sum(len(a) for a in self.empty_areas) + sum(
-                        len(a) for a in self.empty_areas[:area_idx])
-                    for j in range(len(area)):
-                        current_area.append(self.frame["points"][vertex_offset + j])
-                    if self._point_in_polygon(proposed_points[i], np.array(current_area)):
-                        closest_point = self._closest_point_on_polygon(self.frame["points"][i], np.array(current_area))
-                        normal = self._compute_normal(self.frame["points"][i], closest_point)
-                        self.frame["velocities"][i] = self._reflect_velocity(self.frame["velocities"][i], normal)
-                        proposed_points[i] = self.frame["points"][i] + self.frame["velocities"][i] * self.animation_speed
-
-        # Проверка границ холста
-        for i in range(4, len(proposed_points) - hole_vertices_count):
-            if proposed_points[i][0] < 0:
-                proposed_points[i][0] = -proposed_points[i][0]
-                self.frame["velocities"][i][0] = -self.frame["velocities"][i][0]
-            if proposed_points[i][0] > self.frame_width:
-                proposed_points[i][0] = 2 * self.frame_width - proposed_points[i][0]
-                self.frame["velocities"][i][0] = -self.frame["velocities"][i][0]
-            if proposed_points[i][1] < 0:
-                proposed_points[i][1] = -proposed_points[i][1]
-                self.frame["velocities"][i][1] = -self.frame["velocities"][i][1]
-            if proposed_points[i][1] > self.frame_height:
-                proposed_points[i][1] = 2 * self.frame_height - proposed_points[i][1]
-                self.frame["velocities"][i][1] = -self.frame["velocities"][i][1]
+        proposed_points = points.astype(np.float64)
+        proposed_points[4:movable_end] += velocities[4:movable_end] * self.animation_speed
+
+        # Точки на сторонах (4-11) движутся только вдоль своей стороны
+        proposed_points[4:6, 1] = self.frame_height  # Верхняя сторона, фиксируем Y
+        proposed_points[6:8, 1] = 0  # Нижняя сторона, фиксируем Y
+        proposed_points[8:10, 0] = 0  # Левая сторона, фиксируем X
+        proposed_points[10:12, 0] = self.frame_width  # Правая сторона, фиксируем X
+
+        # Проверка столкновений случайных точек с пустыми областями по карте занятости, если включены
+        if self.holes_check:
+            polygons = self._hole_polygons()
+            area_indices = self.hole_mask.locate(proposed_points[12:movable_end], polygons)
+            for area_idx, polygon in enumerate(polygons):
+                colliding = np.nonzero(area_indices == area_idx)[0] + 12
+                if len(colliding) == 0:
+                    continue
+                # Отражение скорости относительно нормали к ближайшей точке контура
+                normals = points[colliding] - closest_points_on_polygon(points[colliding], polygon)
+                norms = np.linalg.norm(normals, axis=1, keepdims=True)
+                normals = np.where(norms > 0, normals / np.where(norms > 0, norms, 1), [1.0, 0.0])
+                v_dot_n = np.einsum('ij,ij->i', velocities[colliding], normals)
+                velocities[colliding] -= 2 * v_dot_n[:, None] * normals
+                proposed_points[colliding] = points[colliding] + velocities[colliding] * self.animation_speed
+                # Область могла сама наехать на точку: отражение скорости ее не выводит, поэтому точка
+                # выталкивается за контур — иначе триангуляция оставит ее без связей
+                trapped = colliding[points_in_polygon(proposed_points[colliding], polygon)]
+                if len(trapped):
+                    proposed_points[trapped] = self._push_out_of_polygon(proposed_points[trapped], polygon)
+
+        # Проверка границ холста: отражение позиции и скорости
+        movable = proposed_points[4:movable_end]
+        movable_velocities = velocities[4:movable_end]
+        below = movable < 0
+        movable[below] = -movable[below]
+        movable_velocities[below] = -movable_velocities[below]
+        limits = np.array([self.frame_width, self.frame_height], dtype=np.float64)
+        above = movable > limits
+        movable[above] = (2 * limits - movable)[above]
+        movable_velocities[above] = -movable_velocities[above]
 
         self.frame["points"] = proposed_points
 
-    def _closest_point_on_polygon(self, point, polygon):
-        min_dist = float('inf')
-        closest_point = None
-        n = len(polygon)
-        for i in range(n):
-            p1 = polygon[i]
-            p2 = polygon[(i + 1) % n]
-            cp = self._closest_point_on_segment(point, p1, p2)
-            dist = np.linalg.norm(point - cp)
-            if dist < min_dist:
-                min_dist = dist
-                closest_point = cp
-        return closest_point
-
-    def _closest_point_on_segment(self, point, p1, p2):
-        p1 = np.array(p1)
-        p2 = np.array(p2)
-        point = np.array(point)
-        segment = p2 - p1
-        t = np.dot(point - p1, segment) / np.dot(segment, segment)
-        t = max(0, min(1, t))
-        projection = p1 + t * segment
-        return projection
-
-    def _compute_normal(self, point, boundary_point):
-        normal = point - boundary_point
-        norm = np.linalg.norm(normal)
-        if norm > 0:
-            normal /= norm
+    def _mesh_edges(self, triangles, points_count):
+        """Ребра текущей триангуляции (i, j) без повторов."""
+        if 'edges' in triangles:
+            edges = np.asarray(triangles['edges'], dtype=np.int64)
         else:
-            normal = np.array([1, 0])
-        return normal
-
-    def _reflect_velocity(self, velocity, normal):
-        v_dot_n = np.dot(velocity, normal)
-        return velocity - 2 * v_dot_n * normal
+            simplices = np.asarray(triangles['triangles'], dtype=np.int64).reshape(-1, 3)
+            edges = np.concatenate([simplices[:, [0, 1]], simplices[:, [1, 2]], simplices[:, [2, 0]]])
+            edges.sort(axis=1)
+            edges = np.unique(edges, axis=0)
+        # Вершины, добавленные триангуляцией сверх исходных точек, не участвуют в движении
+        return edges[np.all(edges < points_count, axis=1)]
+
+    def _apply_neighbour_forces(self, free_start, free_end):
+        """Мягкое отталкивание соседних точек и затухание скорости. Стоимость O(N).
+
+        Соседи берутся из ребер последней триангуляции, поэтому попарный перебор не нужен.
+        Ребро короче равновесной длины расталкивает свои вершины пропорционально сжатию;
+        силы суммируются по вершинам через bincount. Затухание возвращает скорость
+        в исходный диапазон [min_points_speed, max_points_speed].
+        """
+        points = self.frame["points"]
+        velocities = self.frame["velocities"]
+        triangles = self.frame["triangles"]
+        if free_end <= free_start or 'triangles' not in triangles or len(triangles['triangles']) == 0:
+            return
+        edges = self._mesh_edges(triangles, len(points))
+        if len(edges) == 0:
+            return
+
+        # Равновесная длина — средний шаг при равномерном распределении точек по кадру
+        rest_length = np.sqrt(self.frame_width * self.frame_height / len(points))
+        deltas = points[edges[:, 1]] - points[edges[:, 0]]
+        lengths = np.maximum(np.linalg.norm(deltas, axis=1), 1e-6)
+        compression = np.clip(1 - lengths / rest_length, 0, None)
+        forces = (self.repulsion_strength / 100 * self.max_points_speed * compression / lengths)[:, None] * deltas
+
+        accelerations = np.empty_like(points)
+        for axis in range(2):
+            accelerations[:, axis] = (np.bincount(edges[:, 1], forces[:, axis], minlength=len(points))
+                                      - np.bincount(edges[:, 0], forces[:, axis], minlength=len(points)))
+        free_velocities = velocities[free_start:free_end] + accelerations[free_start:free_end]
+
+        speeds = np.linalg.norm(free_velocities, axis=1)
+        target = np.clip(speeds, self.min_points_speed, self.max_points_speed)
+        damped = speeds + self.speed_damping / 100 * (target - speeds)
+        free_velocities *= (damped / np.maximum(speeds, 1e-9))[:, None]
+        velocities[free_start:free_end] = free_velocities
 
     def _update_triangles(self):
-        triangles = self._perform_triangulation(self.frame["points"])
-        if not self._verify_points_connectivity(self.frame["points"], triangles):
-            self.logger.warning("Обнаружены точки без связей, повторная триангуляция")
-            points, velocities = self._adjust_points_for_connectivity(self.frame["points"], self.frame["velocities"])
-            self.frame["points"] = points
-            self.frame["velocities"] = velocities
-            triangles = self._perform_triangulation(self.frame["points"])
-        self.frame["triangles"] = triangles
+        """Перестроение триангуляции. Стоимость O(N log N) (triangle, разделяй и властвуй)."""
+        self.frame["triangles"] = self._triangulate_validated(self.frame["points"])
+        # Ориентация треугольников опорного кадра вычисляется при первом переиспользовании
+        self.frame.pop("orientation", None)
 
     def get_frame(self):
         self.logger.debug("Получение кадра")
         return self.frame["triangles"]
 
+    def record_trajectory(self, file_path, fps, duration):
+        """Запись геометрии всего прогона анимации в файл траектории."""
+        self.logger.info(f"Запись траектории в {file_path}")
+        self.init_frame()
+        total_frames = int(fps * duration)
+        with TrajectoryWriter(file_path, self.frame_width, self.frame_height, fps) as writer:
+            for frame_idx in range(total_frames):
+                self.logger.debug(f"Запись кадра траектории {frame_idx + 1}/{total_frames}")
+                self.update_frame()
+                writer.append(self.get_frame())
+
     def set_points_amount(self, value):
         self.logger.debug(f"Установка количества точек: {value}")
         try:
@@ -397,6 +593,7 @@ class AnimationManager:
             if not (min_value <= value <= max_value):
                 raise ValueError(f"Ширина должна быть в диапазоне [{min_value}, {max_value}]")
             self.frame_width = value
+            self._apply_frame_size()
             self.init_frame()
         except (ValueError, TypeError) as e:
             self.logger.error(f"Некорректное значение ширины: {value}, ошибка: {e}")
@@ -410,6 +607,7 @@ class AnimationManager:
             if not (min_value <= value <= max_value):
                 raise ValueError(f"Высота должна быть в диапазоне [{min_value}, {max_value}]")
             self.frame_height = value
+            self._apply_frame_size()
             self.init_frame()
         except (ValueError, TypeError) as e:
             self.logger.error(f"Некорректное значение высоты: {value}, ошибка: {e}")
@@ -452,10 +650,21 @@ class AnimationManager:
         except (ValueError, TypeError) as e:
             self.logger.error(f"Некорректное значение скорости анимации: {value}, ошибка: {e}")
 
+    def set_motion_model(self, model):
+        self.logger.debug(f"Установка модели движения: {model}")
+        if model not in ("ballistic", "repulsion"):
+            self.logger.error(f"Неизвестная модель движения: {model}")
+            return
+        self.motion_model = model
+        self._update_triangles()
+
     def set_holes_check(self, flag):
         self.logger.debug(f"Установка флага пустых областей: {flag}")
         self.holes_check = flag
-        self.init_frame()
+        try:
+            self.init_frame()
+        except ValueError as e:
+            self.logger.error(f"Ошибка инициализации кадра: {e}")
 
     def set_min_speed(self, value):
         self.logger.debug(f"Установка минимальной скорости: {value}")
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import numpy as np
+from loguru import logger
+
+# Версия формата кэша: меняется при изменении алгоритма извлечения контуров
+CACHE_VERSION = 1
+# Рост допуска упрощения на каждой итерации подбора под бюджет вершин
+TOLERANCE_GROWTH = 1.5
+MAX_ITERATIONS = 40
+
+
+def _read_mask(data, threshold):
+    """Бинарная маска из байтов изображения: альфа-канал, если есть, иначе яркость выше порога."""
+    import cv2
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+    if image is None:
+        raise ValueError("Не удалось прочитать изображение маски")
+    if image.ndim == 3 and image.shape[2] == 4:
+        channel = image[:, :, 3]
+    elif image.ndim == 3:
+        channel = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    else:
+        channel = image
+    if channel.dtype != np.uint8:
+        channel = cv2.normalize(channel, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+    return (channel > threshold).astype(np.uint8)
+
+
+def extract_contours(mask, vertex_budget, tolerance=1.5, min_area=0.0):
+    """Внешние контуры маски, упрощенные до суммарного бюджета вершин.
+
+    Допуск approxPolyDP (в пикселях маски) начинается с tolerance и растет, пока
+    сумма вершин не уложится в бюджет. Контуры площадью меньше min_area (доля
+    площади маски) отбрасываются, внутренние отверстия маски не учитываются.
+    Если бюджета не хватает даже на треугольник для каждого контура, остаются крупнейшие.
+    Результат — полигоны в долях размера маски (x / ширина, y / высота).
+    """
+    import cv2
+    height, width = mask.shape
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    areas = [cv2.contourArea(contour) for contour in contours]
+    contours = [contour for contour, area in zip(contours, areas) if area > 0 and area >= min_area * width * height]
+    contours.sort(key=cv2.contourArea, reverse=True)
+    contours = contours[:max(0, vertex_budget // 3)]
+
+    epsilon = max(tolerance, 0.1)
+    for _ in range(MAX_ITERATIONS):
+        simplified = [cv2.approxPolyDP(contour, epsilon, True).reshape(-1, 2) for contour in contours]
+        simplified = [polygon for polygon in simplified if len(polygon) >= 3]
+        if sum(len(polygon) for polygon in simplified) <= vertex_budget:
+            break
+        epsilon *= TOLERANCE_GROWTH
+    else:
+        # Допуск вырос до размеров маски: сохраняются крупнейшие контуры, умещающиеся в бюджет
+        kept, total = [], 0
+        for polygon in simplified:
+            if total + len(polygon) <= vertex_budget:
+                kept.append(polygon)
+                total += len(polygon)
+        simplified = kept
+    scale = np.array([width, height], dtype=np.float64)
+    return [(polygon.astype(np.float64) + 0.5) / scale for polygon in simplified]
+
+
+def load_mask_areas(image_path, vertex_budget, tolerance=1.5, threshold=127, min_area=0.0, cache_dir=None,
+                    log_level="ERROR"):
+    """Пустые области из изображения маски (в долях кадра) с кэшем на диске.
+
+    Ключ кэша — хэш содержимого изображения и параметры упрощения, поэтому
+    измененная маска или другой бюджет вершин пересчитываются автоматически.
+    """
+    numeric_log_level = logger.level(log_level).no if isinstance(log_level, str) else log_level
+    log = logger.bind(module_level=numeric_log_level)
+    with open(image_path, "rb") as image_file:
+        data = image_file.read()
+    key = hashlib.sha1(data)
+    key.update(json.dumps([CACHE_VERSION, vertex_budget, tolerance, threshold, min_area]).encode("utf-8"))
+    cache_path = os.path.join(cache_dir, f"{key.hexdigest()}.json") if cache_dir else None
+
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, encoding="utf-8") as cache_file:
+                polygons = [np.array(polygon, dtype=np.float64) for polygon in json.load(cache_file)]
+            log.debug(f"Контуры маски {image_path} взяты из кэша {cache_path}")
+            return polygons
+        except (OSError, ValueError) as e:
+            log.warning(f"Поврежденный кэш контуров {cache_path}, пересчет: {e}")
+
+    polygons = extract_contours(_read_mask(data, threshold), vertex_budget, tolerance, min_area)
+    log.info(f"Маска {image_path}: {len(polygons)} областей, "
+             f"{sum(len(polygon) for polygon in polygons)} вершин (бюджет {vertex_budget})")
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as cache_file:
+            json.dump([polygon.tolist() for polygon in polygons], cache_file)
+        os.replace(tmp_path, cache_path)
+    return polygons
@@ -0,0 +1,212 @@
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from loguru import logger
+
+# Конфигурация, загруженная в рабочем процессе один раз при его запуске
+_worker_config = None
+# Очередь сообщений о ходе выполнения заданий (используется службой рендеринга)
+_progress_queue = None
+# Менеджеры последнего набора параметров: повторные задания с теми же параметрами их переиспользуют
+_worker_managers = None
+
+
+def _init_worker(config_path, progress_queue=None):
+    """Прогрев рабочего процесса: тяжелые импорты и загрузка конфигурации."""
+    global _worker_config, _progress_queue
+    _progress_queue = progress_queue
+    logger.remove()
+    from modules.config_manager import ConfigManager
+    import modules.animation_manager  # noqa: F401
+    import modules.render_manager  # noqa: F401
+    # Модули, которые RenderManager импортирует лениво, загружаются заранее: процесс живет долго
+    import pygame  # noqa: F401
+    import triangle  # noqa: F401
+    import modules.frame_writers  # noqa: F401
+    _worker_config = ConfigManager(config_path, "ERROR")
+
+
+def _get_managers(params):
+    """Менеджеры анимации и рендеринга для набора параметров (кэш на один набор)."""
+    global _worker_managers
+    from modules.animation_manager import AnimationManager
+    from modules.render_manager import RenderManager
+
+    key = json.dumps(params, sort_keys=True)
+    if _worker_managers is None or _worker_managers[0] != key:
+        config = _worker_config.with_overrides(params)
+        _worker_managers = (key, AnimationManager(config, "ERROR"), RenderManager(config, None, "ERROR"))
+    return _worker_managers[1], _worker_managers[2]
+
+
+def _report_progress(job, done, total):
+    if _progress_queue is not None:
+        _progress_queue.put((job.get("id", job["name"]), done, total))
+
+
+def _run_job(job, output_dir):
+    """Выполнение одного задания в рабочем процессе."""
+    started = time.perf_counter()
+    animation_manager, render_manager = _get_managers(job["params"])
+    # Зерно заливки выводится из зерна задания, поэтому результат не зависит от предыдущих заданий процесса
+    render_manager.reset(job["seed"])
+
+    outputs = []
+    mesh_stats = {}
+    _report_progress(job, 0, len(job["outputs"]))
+    for output in job["outputs"]:
+        file_path = os.path.join(output_dir, f"{job['name']}.{output}")
+        # Запись во временный файл с заменой гарантирует, что существующий файл всегда полный;
+        # id задания (или процесса) в имени разводит одновременные задания с одинаковым именем
+        tmp_path = os.path.join(output_dir, f"{job['name']}.{job.get('id') or os.getpid()}.tmp.{output}")
+        animation_manager.reset(job["seed"])
+        try:
+            if output == "mp4":
+                render_manager.render_animation(animation_manager, tmp_path, animation_manager.fps,
+                                                animation_manager.duration)
+            else:
+                render_manager.render_frame(animation_manager.get_frame())
+                render_manager.write_image(tmp_path)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        outputs.append(os.path.basename(file_path))
+        # Счетчики проверки сетки сбрасываются в reset, поэтому суммируются по выходам
+        for key, value in animation_manager.mesh_validator.stats().items():
+            mesh_stats[key] = mesh_stats.get(key, 0) + value
+        _report_progress(job, len(outputs), len(job["outputs"]))
+
+    return {
+        "name": job["name"],
+        "params": job["params"],
+        "seed": job["seed"],
+        "outputs": outputs,
+        "mesh": mesh_stats,
+        "elapsed": round(time.perf_counter() - started, 3)
+    }
+
+
+def job_name(prefix, params, seed):
+    """Имя задания зависит только от параметров и зерна, поэтому стабильно между перезапусками."""
+    key = json.dumps({"params": params, "seed": seed}, sort_keys=True)
+    return f"{prefix}_{hashlib.sha1(key.encode('utf-8')).hexdigest()[:10]}"
+
+
+class BatchManager:
+    IMAGE_OUTPUTS = ("png", "jpg")
+    VIDEO_OUTPUTS = ("mp4",)
+
+    def __init__(self, config_manager, config_path="config.ini", log_level="INFO"):
+        numeric_log_level = logger.level(log_level).no if isinstance(log_level, str) else log_level
+        self.logger = logger.bind(module_level=numeric_log_level)
+        self.config = config_manager
+        self.config_path = config_path
+
+    def build_jobs(self, spec):
+        """Развертывание описания пакета в список заданий.
+
+        spec: {
+            "name": префикс имен файлов,
+            "base": общие параметры,
+            "grid": {параметр: [значения]} — декартово произведение,
+            "variants": [{параметры}] — явный список (вместо или вместе с grid),
+            "seeds": [зерна],
+            "outputs": ["png", "mp4"]
+        }
+        """
+        prefix = spec.get("name", "variant")
+        base = spec.get("base", {})
+        grid = spec.get("grid", {})
+        variants = spec.get("variants", [{}])
+        seeds = spec.get("seeds", [0])
+        outputs = spec.get("outputs", ["png"])
+        for output in outputs:
+            if output not in self.IMAGE_OUTPUTS + self.VIDEO_OUTPUTS:
+                raise ValueError(f"Неподдерживаемый формат вывода: {output}")
+
+        grid_keys = sorted(grid)
+        combinations = [dict(zip(grid_keys, values)) for values in itertools.product(*(grid[k] for k in grid_keys))]
+
+        jobs = []
+        for variant in variants:
+            for combination in combinations:
+                params = {**base, **variant, **combination}
+                # Проверка параметров до запуска пула
+                self.config.with_overrides(params)
+                for seed in seeds:
+                    jobs.append({
+                        "name": job_name(prefix, params, seed),
+                        "params": params,
+                        "seed": seed,
+                        "outputs": outputs
+                    })
+        return jobs
+
+    def run(self, spec, output_dir, workers=None):
+        """Запуск пакета с пропуском уже готовых заданий."""
+        os.makedirs(output_dir, exist_ok=True)
+        manifest_path = os.path.join(output_dir, "manifest.jsonl")
+        manifest = self._read_manifest(manifest_path)
+        jobs = self.build_jobs(spec)
+
+        pending = []
+        for job in jobs:
+            done = all(os.path.exists(os.path.join(output_dir, f"{job['name']}.{output}"))
+                       for output in job["outputs"])
+            if done:
+                self.logger.debug(f"Задание {job['name']} уже выполнено, пропуск")
+                if job["name"] not in manifest:
+                    self._append_manifest(manifest_path, {
+                        "name": job["name"], "params": job["params"], "seed": job["seed"],
+                        "outputs": [f"{job['name']}.{output}" for output in job["outputs"]]
+                    })
+            else:
+                pending.append(job)
+
+        self.logger.info(f"Заданий в пакете: {len(jobs)}, к выполнению: {len(pending)}")
+        if not pending:
+            return
+
+        workers = workers or os.cpu_count() or 1
+        failed = 0
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.config_path,)) as executor:
+            futures = {executor.submit(_run_job, job, output_dir): job for job in pending}
+            for done_count, future in enumerate(as_completed(futures), start=1):
+                job = futures[future]
+                try:
+                    record = future.result()
+                    self._append_manifest(manifest_path, record)
+                    self.logger.info(f"[{done_count}/{len(pending)}] {job['name']} готово за {record['elapsed']} с")
+                except Exception as e:
+                    failed += 1
+                    self.logger.error(f"[{done_count}/{len(pending)}] Ошибка в задании {job['name']}: {e}")
+
+        if failed:
+            self.logger.warning(f"Не выполнено заданий: {failed}; повторный запуск продолжит с них")
+
+    def _read_manifest(self, manifest_path):
+        manifest = {}
+        if not os.path.exists(manifest_path):
+            return manifest
+        with open(manifest_path, encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                    manifest[record["name"]] = record
+                except (ValueError, KeyError) as e:
+                    # Последняя строка могла оборваться при прерывании
+                    self.logger.warning(f"Пропуск поврежденной записи манифеста: {e}")
+        return manifest
+
+    def _append_manifest(self, manifest_path, record):
+        with open(manifest_path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record, ensure_ascii=False, sort_keys=True) + "\n")
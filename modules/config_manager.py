@@ -1,6 +1,9 @@
 import configparser
+import copy
+import os
 import numpy as np
 import ast
+import re
 from loguru import logger
 
 class ConfigManager:
@@ -9,7 +12,10 @@ class ConfigManager:
         self.logger = logger.bind(module_level=numeric_log_level)
         self.config = configparser.ConfigParser()
         self.config.read(config_path)
+        # Относительные пути (маски пустых областей, кэш контуров) считаются от каталога конфигурации
+        self.config_dir = os.path.dirname(os.path.abspath(config_path))
         self.validate_config()
+        self.empty_area_cache = {}  # Геометрия пустых областей по (ширина, высота)
 
     def validate_config(self):
         self.logger.debug("Проверка конфигурации")
@@ -49,20 +55,159 @@ class ConfigManager:
             self.logger.error(f"Ошибка чтения [{section}][{key}]: {e}")
             raise
 
-    def get_empty_areas(self):
+    def with_overrides(self, params):
+        """Копия конфигурации, в которой значения по умолчанию заменены переданными параметрами.
+
+        Ключ ищется как `<key>_default` (например, `hue`, `points_amount`) или как есть
+        (флаги `points_check`, `holes_check`) во всех секциях конфигурации.
+        """
+        self.logger.debug(f"Создание конфигурации с переопределениями: {params}")
+        clone = copy.copy(self)
+        clone.config = configparser.ConfigParser()
+        clone.config.read_dict(self.config)
+        clone.empty_area_cache = {}
+        for key, value in params.items():
+            for section in clone.config.sections():
+                option = f"{key}_default" if clone.config.has_option(section, f"{key}_default") else key
+                if not clone.config.has_option(section, option):
+                    continue
+                if clone.config.has_option(section, f"{key}_min") and clone.config.has_option(section, f"{key}_max"):
+                    min_value = clone.config.getint(section, f"{key}_min")
+                    max_value = clone.config.getint(section, f"{key}_max")
+                    if not (min_value <= int(value) <= max_value):
+                        raise ValueError(f"Значение {key}={value} вне диапазона [{min_value}, {max_value}]")
+                clone.config.set(section, option, str(value))
+                break
+            else:
+                raise KeyError(f"Неизвестный параметр конфигурации: {key}")
+        return clone
+
+    def get_output_presets(self):
+        """Чтение комплекта выходов экспорта из секции [ExportOutputs].
+
+        Формат значения: `<ширина>x<высота>@<делитель fps>:<формат>`, например `1080x1920@1:mp4`.
+        """
+        self.logger.debug("Чтение комплекта выходов экспорта из конфигурации")
+        presets = []
+        if not self.config.has_section("ExportOutputs"):
+            return presets
+        for name, value in self.config.items("ExportOutputs"):
+            match = re.fullmatch(r"\s*(\d+)x(\d+)@(\d+):(\w+)\s*", value)
+            if not match:
+                self.logger.error(f"Некорректное описание выхода [ExportOutputs][{name}]: {value}")
+                raise ValueError(f"Некорректное описание выхода [ExportOutputs][{name}]")
+            width, height, fps_divisor, extension = match.groups()
+            presets.append({
+                "name": name,
+                "width": int(width),
+                "height": int(height),
+                "fps_divisor": max(1, int(fps_divisor)),
+                "format": extension.lower()
+            })
+        return presets
+
+    def get_empty_areas(self, width=None, height=None):
+        """Полигоны пустых областей.
+
+        Без размера кадра возвращаются координаты как в конфигурации; с размером —
+        полигоны, пересчитанные для кадра width x height (см. get_empty_area_geometry).
+        """
+        if width is not None and height is not None:
+            return self.get_empty_area_geometry(width, height)["polygons"]
+        return self._read_empty_areas()
+
+    def get_empty_area_geometry(self, width, height):
+        """Геометрия пустых областей для кадра width x height, кэшируется по размеру.
+
+        Координаты в [EmptyAreas] задаются в пикселях опорного кадра
+        reference_width x reference_height (units = pixels) или в долях кадра
+        (units = normalized) и масштабируются по каждой оси отдельно.
+        Результат: polygons — вершины (float64), edges — ребра (K, 2, 2) каждой области,
+        centroids — центры областей, loops — индексы вершин каждой области и segments —
+        ребра контуров в сквозной нумерации вершин всех областей, scale — общий масштаб
+        для величин в пикселях (например, радиуса движения вершин).
+        """
+        key = (int(width), int(height))
+        if key in self.empty_area_cache:
+            return self.empty_area_cache[key]
+        self.logger.debug(f"Расчет геометрии пустых областей для {width}x{height}")
+        reference_width = self.config.getint("EmptyAreas", "reference_width", fallback=width)
+        reference_height = self.config.getint("EmptyAreas", "reference_height", fallback=height)
+        if self.config.get("EmptyAreas", "units", fallback="pixels") == "normalized":
+            axis_scale = np.array([width, height], dtype=np.float64)
+        else:
+            axis_scale = np.array([width / reference_width, height / reference_height], dtype=np.float64)
+
+        polygons, edges, loops, segments = [], [], [], []
+        offset = 0
+        for area in self._read_empty_areas():
+            polygon = np.asarray(area, dtype=np.float64) * axis_scale
+            loop = np.arange(offset, offset + len(polygon))
+            polygons.append(polygon)
+            edges.append(np.stack([polygon, np.roll(polygon, -1, axis=0)], axis=1))
+            loops.append(loop)
+            segments.append(np.column_stack([loop, np.roll(loop, -1)]))
+            offset += len(polygon)
+        geometry = {
+            "polygons": polygons,
+            "edges": edges,
+            "centroids": np.array([polygon.mean(axis=0) for polygon in polygons]).reshape(-1, 2),
+            "loops": loops,
+            "segments": np.concatenate(segments) if segments else np.empty((0, 2), dtype=np.int64),
+            "scale": min(width / reference_width, height / reference_height)
+        }
+        self.empty_area_cache[key] = geometry
+        return geometry
+
+    def _read_empty_areas(self):
         self.logger.debug("Чтение пустых областей из конфигурации")
         try:
             areas = []
             for key in self.config["EmptyAreas"]:
                 if key.startswith("area_"):
                     area_str = self.config.get("EmptyAreas", key)
+                    if area_str.strip().startswith("mask:"):
+                        areas.extend(self._read_mask_areas(key, area_str.strip()[len("mask:"):].strip()))
+                        continue
                     try:
                         area_points = ast.literal_eval(area_str)
-                        areas.append(np.array(area_points, dtype=np.int32))
+                        areas.append(np.array(area_points, dtype=np.float64))
                     except (ValueError, SyntaxError) as e:
                         self.logger.error(f"Ошибка парсинга области {key}: {e}")
                         continue
             return areas
         except (configparser.NoSectionError, configparser.NoOptionError) as e:
             self.logger.error(f"Ошибка чтения пустых областей: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    def _read_mask_areas(self, key, image_path):
+        """Пустые области из изображения маски (area_N = mask:путь) в единицах [EmptyAreas].
+
+        Маска растягивается на весь кадр; контуры упрощаются до mask_vertex_budget вершин
+        и кэшируются в mask_cache_dir, поэтому детальность исходного изображения
+        не влияет на число вершин, которые двигает и триангулирует симуляция.
+        """
+        from modules.area_masks import load_mask_areas
+        image_path = os.path.join(self.config_dir, image_path)
+        cache_dir = self.config.get("EmptyAreas", "mask_cache_dir", fallback="")
+        try:
+            polygons = load_mask_areas(
+                image_path,
+                vertex_budget=self.config.getint("EmptyAreas", "mask_vertex_budget", fallback=48),
+                tolerance=self.config.getfloat("EmptyAreas", "mask_tolerance", fallback=1.5),
+                threshold=self.config.getint("EmptyAreas", "mask_threshold", fallback=127),
+                min_area=self.config.getfloat("EmptyAreas", "mask_min_area", fallback=0.0),
+                cache_dir=os.path.join(self.config_dir, cache_dir) if cache_dir else None
+            )
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Ошибка чтения маски области {key}: {e}")
+            return []
+        if self.config.get("EmptyAreas", "units", fallback="pixels") == "normalized":
+            return polygons
+        try:
+            reference = np.array([self.config.getint("EmptyAreas", "reference_width"),
+                                  self.config.getint("EmptyAreas", "reference_height")], dtype=np.float64)
+        except (configparser.NoOptionError, ValueError) as e:
+            self.logger.error(f"Для маски области {key} в пикселях нужен размер опорного кадра: {e}")
+            return []
+        return [polygon * reference for polygon in polygons]
@@ -0,0 +1,377 @@
+import os
+import struct
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+import cv2
+import numpy as np
+from loguru import logger
+
+# Формат файла кадров с отображением в память (.frames):
+#   заголовок (64 байта): сигнатура, версия, ширина, высота, число каналов, fps (x1000),
+#                         число кадров; со смещения 32 — число уже записанных кадров (uint32)
+#   кадры:                uint8 (frames, height, width, 3) RGB с постоянным шагом
+MAPPED_FRAMES_MAGIC = b"BB28RAW\x01"
+MAPPED_FRAMES_VERSION = 1
+MAPPED_HEADER_FORMAT = "<8sIIIIII"
+MAPPED_WRITTEN_OFFSET = 32
+MAPPED_HEADER_SIZE = 64
+
+
+class VideoFrameWriter:
+    """Запись кадров в MP4 (mp4v) через OpenCV."""
+    indexed = False
+    vector = False
+
+    def __init__(self, file_path, fps, size, log_level="ERROR"):
+        numeric_log_level = logger.level(log_level).no if isinstance(log_level, str) else log_level
+        self.logger = logger.bind(module_level=numeric_log_level)
+        self.file_path = file_path
+        self.size = size
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # Кодек для MP4
+        self.video_writer = cv2.VideoWriter(file_path, fourcc, fps, size)
+
+    def has_frame(self, index):
+        return False
+
+    def write(self, frame, index):
+        self.video_writer.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))  # Конвертация RGB в BGR для OpenCV
+
+    def close(self):
+        self.video_writer.release()
+
+
+class ImageSequenceWriter:
+    """Запись кадров последовательностью PNG/TIFF без потерь.
+
+    Сжатие и запись выполняются в пуле потоков (cv2.imwrite отпускает GIL),
+    очередь ограничена семафором, чтобы рендер не обгонял запись. Каждый файл
+    пишется во временный и переименовывается, поэтому существующий файл кадра
+    всегда полный — на этом основано продолжение прерванного экспорта (resume=True).
+    Без resume готовые файлы не учитываются и перезаписываются.
+    """
+    EXTENSIONS = ("png", "tif")
+    indexed = False
+    vector = False
+
+    def __init__(self, file_path, size, workers=0, queue_size=8, png_compression=3, resume=False,
+                 log_level="ERROR"):
+        numeric_log_level = logger.level(log_level).no if isinstance(log_level, str) else log_level
+        self.logger = logger.bind(module_level=numeric_log_level)
+        stem, extension = os.path.splitext(file_path)
+        self.stem = stem
+        self.extension = extension.lstrip(".").lower()
+        if self.extension == "tiff":
+            self.extension = "tif"
+        if self.extension not in self.EXTENSIONS:
+            raise ValueError(f"Неподдерживаемый формат последовательности: {extension}")
+        self.size = size
+        if self.extension == "png":
+            self.params = [cv2.IMWRITE_PNG_COMPRESSION, png_compression]
+        else:
+            self.params = [cv2.IMWRITE_TIFF_COMPRESSION, 1]  # Без сжатия
+        self.executor = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+        self.slots = threading.BoundedSemaphore(queue_size)
+        self.errors = []
+        self.resume = resume
+
+    def frame_path(self, index):
+        return f"{self.stem}_{index:06d}.{self.extension}"
+
+    def has_frame(self, index):
+        return self.resume and os.path.exists(self.frame_path(index))
+
+    def write(self, frame, index):
+        # Конвертация создает копию, поэтому буфер рендера можно сразу переиспользовать
+        bgr_frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        self.slots.acquire()
+        future = self.executor.submit(self._write_file, bgr_frame, index)
+        future.add_done_callback(lambda _: self.slots.release())
+
+    def _write_file(self, bgr_frame, index):
+        file_path = self.frame_path(index)
+        tmp_path = f"{self.stem}_{index:06d}.tmp.{self.extension}"
+        try:
+            if not cv2.imwrite(tmp_path, bgr_frame, self.params):
+                raise OSError(f"Не удалось записать {tmp_path}")
+            os.replace(tmp_path, file_path)
+        except Exception as e:
+            self.logger.error(f"Ошибка записи кадра {index}: {e}")
+            self.errors.append(e)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        if self.errors:
+            raise self.errors[0]
+
+
+class AnimatedImageWriter:
+    """Анимированный GIF/WebP из кадров с индексами палитры.
+
+    Кадры приходят уже в виде индексов (uint8), палитра задается один раз,
+    поэтому покадровое квантование цветов не требуется. GIF пишется потоково:
+    кадр сразу сжимается и уходит в файл, в памяти держится только он. WebP Pillow
+    кодирует целиком при закрытии, поэтому кадры копятся в памяти; их объем
+    ограничен max_bytes и при известном числе кадров проверяется до начала записи.
+    """
+    EXTENSIONS = ("gif", "webp")
+    indexed = True
+    vector = False
+
+    def __init__(self, file_path, fps, size, palette, total_frames=None, max_bytes=0, log_level="ERROR"):
+        numeric_log_level = logger.level(log_level).no if isinstance(log_level, str) else log_level
+        self.logger = logger.bind(module_level=numeric_log_level)
+        try:
+            from PIL import Image
+        except ImportError as e:
+            raise ValueError("Для экспорта GIF/WebP требуется пакет Pillow") from e
+        self.image_module = Image
+        self.file_path = file_path
+        self.extension = os.path.splitext(file_path)[1].lstrip(".").lower()
+        if self.extension not in self.EXTENSIONS:
+            raise ValueError(f"Неподдерживаемый формат анимации: {self.extension}")
+        self.size = size
+        self.duration = 1000 / fps
+        self.palette = bytes(palette.astype("uint8").ravel()).ljust(768, b"\0")
+        self.max_bytes = max_bytes
+        self.frame_bytes = size[0] * size[1]
+        self.frames = []
+        self.frames_written = 0
+        self.stream = None
+        if self.extension == "webp" and total_frames and max_bytes and total_frames * self.frame_bytes > max_bytes:
+            raise ValueError(self._memory_error(total_frames))
+        if self.extension == "gif":
+            self.stream = open(file_path, "wb")
+
+    def _memory_error(self, frames):
+        return (f"Анимация WebP из {frames} кадров {self.size[0]}x{self.size[1]} займет в памяти "
+                f"{frames * self.frame_bytes / 2 ** 20:.0f} МБ при пределе {self.max_bytes / 2 ** 20:.0f} МБ; "
+                f"уменьшите размер или длительность либо сохраните GIF")
+
+    def has_frame(self, index):
+        return False
+
+    def write(self, frame, index):
+        # frombytes копирует данные, поэтому буфер индексов можно переиспользовать
+        image = self.image_module.frombytes("P", self.size, frame.tobytes())
+        image.putpalette(self.palette)
+        if self.stream is not None:
+            self._write_gif_frame(image)
+            return
+        if self.max_bytes and (len(self.frames) + 1) * self.frame_bytes > self.max_bytes:
+            raise ValueError(self._memory_error(len(self.frames) + 1))
+        self.frames.append(image)
+
+    def _write_gif_frame(self, image):
+        from PIL import GifImagePlugin
+        if self.frames_written == 0:
+            # Заголовок с общей палитрой и бесконечным повтором; кадры пишутся без своих палитр
+            header, _ = GifImagePlugin.getheader(image, None, {"loop": 0, "duration": self.duration})
+            self.stream.write(b"".join(header))
+        for fragment in GifImagePlugin.getdata(image, duration=self.duration):
+            self.stream.write(fragment)
+        self.frames_written += 1
+
+    def close(self):
+        if self.stream is not None:
+            if self.frames_written:
+                self.stream.write(b";")
+            self.stream.close()
+            self.stream = None
+            if not self.frames_written:
+                os.remove(self.file_path)
+            self.logger.debug(f"Записано {self.frames_written} кадров в {self.file_path}")
+            return
+        if not self.frames:
+            return
+        self.frames[0].save(self.file_path, save_all=True, append_images=self.frames[1:], duration=self.duration,
+                            loop=0, lossless=True, method=1)
+        self.logger.debug(f"Записано {len(self.frames)} кадров в {self.file_path}")
+        self.frames = []
+
+
+class VectorSequenceWriter:
+    """Последовательность кадров SVG/PDF.
+
+    Вместо растра принимает векторную сцену кадра (см. modules.vector_export),
+    имена файлов и продолжение прерванного экспорта — как у ImageSequenceWriter.
+    """
+    indexed = False
+    vector = True
+
+    def __init__(self, file_path, size, resume=False, log_level="ERROR"):
+        from modules.vector_export import VECTOR_EXTENSIONS
+        numeric_log_level = logger.level(log_level).no if isinstance(log_level, str) else log_level
+        self.logger = logger.bind(module_level=numeric_log_level)
+        stem, extension = os.path.splitext(file_path)
+        self.stem = stem
+        self.extension = extension.lstrip(".").lower()
+        if self.extension not in VECTOR_EXTENSIONS:
+            raise ValueError(f"Неподдерживаемый векторный формат: {extension}")
+        self.size = size
+        self.resume = resume
+
+    def frame_path(self, index):
+        return f"{self.stem}_{index:06d}.{self.extension}"
+
+    def has_frame(self, index):
+        return self.resume and os.path.exists(self.frame_path(index))
+
+    def write(self, scene, index):
+        from modules.vector_export import write_vector
+        write_vector(self.frame_path(index), scene)
+
+    def close(self):
+        pass
+
+
+class RawStreamWriter:
+    """Поток кадров без кодека: YUV4MPEG2 (.y4m) или упакованные RGB/BGR (.rgb, .bgr).
+
+    Путь может указывать на обычный файл или на именованный канал (FIFO), из которого
+    читает внешний кодировщик. Кадры RGB пишутся прямо из буфера рендера без копирования.
+    """
+    EXTENSIONS = ("y4m", "rgb", "bgr")
+    indexed = False
+    vector = False
+
+    def __init__(self, file_path, fps, size, log_level="ERROR"):
+        numeric_log_level = logger.level(log_level).no if isinstance(log_level, str) else log_level
+        self.logger = logger.bind(module_level=numeric_log_level)
+        self.file_path = file_path
+        self.extension = os.path.splitext(file_path)[1].lstrip(".").lower()
+        if self.extension not in self.EXTENSIONS:
+            raise ValueError(f"Неподдерживаемый формат потока: {self.extension}")
+        self.size = size
+        width, height = size
+        if self.extension == "y4m" and (width % 2 or height % 2):
+            raise ValueError("Для YUV 4:2:0 ширина и высота кадра должны быть четными")
+        # Открытие FIFO блокируется до подключения читателя
+        self.stream = open(file_path, "wb")
+        if self.extension == "y4m":
+            rate = Fraction(fps).limit_denominator(1001)
+            self.stream.write(f"YUV4MPEG2 W{width} H{height} F{rate.numerator}:{rate.denominator} "
+                              f"Ip A1:1 C420jpeg\n".encode("ascii"))
+
+    def has_frame(self, index):
+        return False
+
+    def write(self, frame, index):
+        if self.extension == "rgb":
+            self.stream.write(memoryview(np.ascontiguousarray(frame)).cast("B"))
+        elif self.extension == "bgr":
+            self.stream.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR).data)
+        else:
+            self.stream.write(b"FRAME\n")
+            self.stream.write(cv2.cvtColor(frame, cv2.COLOR_RGB2YUV_I420).data)
+
+    def close(self):
+        self.stream.close()
+
+
+class MappedFrameWriter:
+    """Кадры RGB в заранее выделенном файле с отображением в память (.frames).
+
+    Файл создается сразу на все кадры, кадр копируется в свой слот одним memcpy,
+    после чего в заголовке увеличивается счетчик записанных кадров — читатель
+    в другом процессе может отображать тот же файл и забирать кадры по мере готовности.
+    """
+    EXTENSIONS = ("frames",)
+    indexed = False
+    vector = False
+
+    def __init__(self, file_path, fps, size, total_frames, log_level="ERROR"):
+        numeric_log_level = logger.level(log_level).no if isinstance(log_level, str) else log_level
+        self.logger = logger.bind(module_level=numeric_log_level)
+        if total_frames is None:
+            raise ValueError("Для файла кадров в памяти нужно заранее знать число кадров")
+        if total_frames <= 0:
+            raise ValueError(f"Файл кадров в памяти должен содержать хотя бы один кадр, запрошено {total_frames}")
+        self.file_path = file_path
+        self.size = size
+        width, height = size
+        header = struct.pack(MAPPED_HEADER_FORMAT, MAPPED_FRAMES_MAGIC, MAPPED_FRAMES_VERSION,
+                             width, height, 3, int(round(fps * 1000)), total_frames)
+        with open(file_path, "wb") as file:
+            file.write(header.ljust(MAPPED_HEADER_SIZE, b"\0"))
+            file.truncate(MAPPED_HEADER_SIZE + total_frames * height * width * 3)
+        self.written = np.memmap(file_path, dtype=np.uint32, mode="r+", offset=MAPPED_WRITTEN_OFFSET, shape=(1,))
+        self.frames = np.memmap(file_path, dtype=np.uint8, mode="r+", offset=MAPPED_HEADER_SIZE,
+                                shape=(total_frames, height, width, 3))
+        self.logger.debug(f"Выделен файл кадров {file_path}: {total_frames} кадров {width}x{height}")
+
+    def has_frame(self, index):
+        return False
+
+    def write(self, frame, index):
+        self.frames[index] = frame
+        self.written[0] = index + 1
+
+    def close(self):
+        self.frames.flush()
+        self.written.flush()
+        del self.frames, self.written
+
+
+class PngRowWriter:
+    """Потоковая запись PNG по строкам: в памяти держится только очередная полоса строк.
+
+    Строки сжимаются zlib по мере поступления и сразу уходят в файл блоками IDAT,
+    поэтому размер изображения ограничен только диском. Файл пишется во временный
+    и переименовывается после записи последней строки.
+    """
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, file_path, width, height, compression=6, log_level="ERROR"):
+        numeric_log_level = logger.level(log_level).no if isinstance(log_level, str) else log_level
+        self.logger = logger.bind(module_level=numeric_log_level)
+        self.file_path = file_path
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self.tmp_path = f"{file_path}.tmp"
+        self.file = open(self.tmp_path, "wb")
+        self.compressor = zlib.compressobj(compression)
+        self.pending = bytearray()
+        self.file.write(b"\x89PNG\r\n\x1a\n")
+        # 8 бит на канал, RGB, без чередования строк
+        self._write_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def _write_chunk(self, chunk_type, data):
+        self.file.write(struct.pack(">I", len(data)))
+        self.file.write(chunk_type)
+        self.file.write(data)
+        self.file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(chunk_type)) & 0xFFFFFFFF))
+
+    def write_rows(self, rows):
+        """Запись полосы строк uint8 (n, width, 3) сверху вниз."""
+        rows = np.ascontiguousarray(rows, dtype=np.uint8)
+        if rows.shape[1:] != (self.width, 3):
+            raise ValueError(f"Ожидались строки шириной {self.width}, получено {rows.shape}")
+        if self.rows_written + len(rows) > self.height:
+            raise ValueError("Строк больше, чем высота изображения")
+        # Каждой строке предшествует байт фильтра 0 (без фильтрации)
+        filtered = np.zeros((len(rows), self.width * 3 + 1), dtype=np.uint8)
+        filtered[:, 1:] = rows.reshape(len(rows), -1)
+        self.pending += self.compressor.compress(filtered.data)
+        self.rows_written += len(rows)
+        while len(self.pending) >= self.CHUNK_SIZE:
+            self._write_chunk(b"IDAT", bytes(self.pending[:self.CHUNK_SIZE]))
+            del self.pending[:self.CHUNK_SIZE]
+
+    def abort(self):
+        """Отказ от записи: временный файл удаляется, целевой файл не меняется."""
+        self.file.close()
+        os.remove(self.tmp_path)
+
+    def close(self):
+        if self.rows_written != self.height:
+            self.abort()
+            raise ValueError(f"Записано {self.rows_written} строк из {self.height}")
+        self.pending += self.compressor.flush()
+        self._write_chunk(b"IDAT", bytes(self.pending))
+        self._write_chunk(b"IEND", b"")
+        self.file.close()
+        os.replace(self.tmp_path, self.file_path)
+        self.logger.debug(f"Записан PNG {self.width}x{self.height} в {self.file_path}")
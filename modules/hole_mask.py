@@ -0,0 +1,140 @@
+import numpy as np
+from loguru import logger
+
+
+def points_in_polygon(points, polygon):
+    """Векторная проверка принадлежности точек полигону (Ray Casting для массива точек)."""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    polygon = np.asarray(polygon, dtype=np.float64)
+    x = points[:, 0:1]
+    y = points[:, 1:2]
+    xi, yi = polygon[:, 0], polygon[:, 1]
+    xj, yj = np.roll(xi, 1), np.roll(yi, 1)
+    crosses = (yi > y) != (yj > y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_cross = (xj - xi) * (y - yi) / (yj - yi) + xi
+    return np.count_nonzero(crosses & (x < x_cross), axis=1) % 2 == 1
+
+
+def closest_points_on_polygon(points, polygon):
+    """Ближайшая точка контура полигона для каждой точки."""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    a = np.asarray(polygon, dtype=np.float64)
+    ab = np.roll(a, -1, axis=0) - a
+    ap = points[:, None, :] - a[None, :, :]
+    ab_len = np.maximum(np.einsum('ij,ij->i', ab, ab), 1e-12)
+    t = np.clip(np.einsum('nij,ij->ni', ap, ab) / ab_len, 0, 1)
+    projections = a[None, :, :] + t[..., None] * ab[None, :, :]
+    nearest = np.argmin(np.linalg.norm(points[:, None, :] - projections, axis=2), axis=1)
+    return projections[np.arange(len(points)), nearest]
+
+
+def distance_to_polygon(points, polygon):
+    """Расстояние от каждой точки до ближайшего ребра полигона."""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    return np.linalg.norm(points - closest_points_on_polygon(points, polygon), axis=1)
+
+
+def interior_point(polygon):
+    """Точка строго внутри полигона (в том числе невыпуклого).
+
+    Центр вершин подходит для выпуклых областей; иначе берется середина самого
+    широкого внутреннего отрезка горизонтали, проходящей между вершинами по высоте.
+    """
+    polygon = np.asarray(polygon, dtype=np.float64)
+    center = polygon.mean(axis=0)
+    if points_in_polygon(center, polygon)[0]:
+        return center
+    ys = np.unique(polygon[:, 1])
+    # Горизонталь между соседними уровнями вершин не проходит через вершины
+    levels = (ys[:-1] + ys[1:]) / 2 if len(ys) > 1 else ys
+    best, best_width = center, -1.0
+    xi, yi = polygon[:, 0], polygon[:, 1]
+    xj, yj = np.roll(xi, 1), np.roll(yi, 1)
+    for y in levels:
+        crosses = (yi > y) != (yj > y)
+        xs = np.sort((xj[crosses] - xi[crosses]) * (y - yi[crosses]) / (yj[crosses] - yi[crosses]) + xi[crosses])
+        # Пары пересечений ограничивают внутренние отрезки
+        widths = xs[1::2] - xs[0::2]
+        if len(widths) and widths.max() > best_width:
+            widest = int(np.argmax(widths))
+            best, best_width = np.array([(xs[2 * widest] + xs[2 * widest + 1]) / 2, y]), widths.max()
+    return best
+
+
+class HoleMask:
+    """Грубая карта занятости пустых областей.
+
+    Каждая ячейка сетки хранит индекс области, если целиком лежит внутри нее,
+    OUTSIDE, если целиком снаружи всех областей, или BOUNDARY для пограничной полосы.
+    Точная геометрия проверяется только для точек, попавших в пограничные ячейки.
+    """
+    OUTSIDE = -1
+    BOUNDARY = -2
+
+    def __init__(self, width, height, cell_size=16, log_level="ERROR"):
+        numeric_log_level = logger.level(log_level).no if isinstance(log_level, str) else log_level
+        self.logger = logger.bind(module_level=numeric_log_level)
+        self.width = width
+        self.height = height
+        self.cell_size = max(1, int(cell_size))
+        self.cols = self.width // self.cell_size + 1
+        self.rows = self.height // self.cell_size + 1
+        self.grid = np.full((self.rows, self.cols), self.OUTSIDE, dtype=np.int16)
+
+    def build(self, polygons, slack=0.0):
+        """Построение карты по исходным полигонам.
+
+        slack — максимальное смещение вершин от исходных позиций. Каждая точка ребра
+        сдвигается не больше своих вершин, поэтому при расширении пограничной полосы
+        на slack карта остается верной все время, пока вершины движутся в этих пределах.
+        """
+        self.logger.debug(f"Построение карты пустых областей {self.cols}x{self.rows}, запас {slack:.1f} px")
+        xs = (np.arange(self.cols) + 0.5) * self.cell_size
+        ys = (np.arange(self.rows) + 0.5) * self.cell_size
+        centers = np.stack(np.meshgrid(xs, ys), axis=-1).reshape(-1, 2)
+        band = self.cell_size * np.sqrt(2) / 2 + slack
+
+        grid = np.full(len(centers), self.OUTSIDE, dtype=np.int16)
+        boundary = np.zeros(len(centers), dtype=bool)
+        for area_idx, polygon in enumerate(polygons):
+            # Точная геометрия считается только для ячеек в окрестности габарита полигона
+            polygon = np.asarray(polygon, dtype=np.float64)
+            low = polygon.min(axis=0) - band
+            high = polygon.max(axis=0) + band
+            candidates = np.nonzero(np.all((centers >= low) & (centers <= high), axis=1))[0]
+            inside = points_in_polygon(centers[candidates], polygon)
+            near = distance_to_polygon(centers[candidates], polygon) <= band
+            deep = candidates[inside & ~near]
+            grid[deep[grid[deep] == self.OUTSIDE]] = area_idx
+            boundary[candidates[near]] = True
+        grid[boundary] = self.BOUNDARY
+        self.grid = grid.reshape(self.rows, self.cols)
+
+    def free_fraction(self):
+        """Доля ячеек, которые гарантированно вне пустых областей."""
+        return np.count_nonzero(self.grid == self.OUTSIDE) / self.grid.size
+
+    def locate(self, points, polygons):
+        """Индекс пустой области для каждой точки или OUTSIDE.
+
+        polygons — текущие положения полигонов для точной проверки в пограничных ячейках.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        cols = np.floor(points[:, 0] / self.cell_size).astype(np.int64)
+        rows = np.floor(points[:, 1] / self.cell_size).astype(np.int64)
+        in_canvas = (cols >= 0) & (cols < self.cols) & (rows >= 0) & (rows < self.rows)
+        result = np.full(len(points), self.BOUNDARY, dtype=np.int16)
+        result[in_canvas] = self.grid[rows[in_canvas], cols[in_canvas]]
+
+        exact = np.nonzero(result == self.BOUNDARY)[0]
+        if len(exact):
+            resolved = np.full(len(exact), self.OUTSIDE, dtype=np.int16)
+            for area_idx, polygon in enumerate(polygons):
+                undecided = resolved == self.OUTSIDE
+                if not undecided.any():
+                    break
+                hit = points_in_polygon(points[exact[undecided]], polygon)
+                resolved[np.nonzero(undecided)[0][hit]] = area_idx
+            result[exact] = resolved
+        return result
@@ -0,0 +1,93 @@
+import numpy as np
+from loguru import logger
+
+
+def triangle_orientations(vertices, simplices):
+    """Удвоенная ориентированная площадь каждого треугольника."""
+    vertices = np.asarray(vertices, dtype=np.float64)
+    simplices = np.asarray(simplices, dtype=np.int64).reshape(-1, 3)
+    a, b, c = vertices[simplices[:, 0]], vertices[simplices[:, 1]], vertices[simplices[:, 2]]
+    return (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+
+
+def duplicate_points(points):
+    """Индексы всех точек, совпадающих хотя бы с одной другой точкой. Стоимость O(N log N)."""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    order = np.lexsort((points[:, 1], points[:, 0]))
+    ordered = points[order]
+    same = np.all(ordered[1:] == ordered[:-1], axis=1)
+    coincident = np.zeros(len(points), dtype=bool)
+    coincident[1:] |= same
+    coincident[:-1] |= same
+    return np.sort(order[coincident])
+
+
+class MeshValidator:
+    """Проверка сетки кадра и учет исправлений.
+
+    До триангуляции ищутся совпадающие точки (O(N log N)): движок сливает их,
+    а совпадение с концом обязательного ребра может его обрушить. После триангуляции
+    проверки стоят O(N + T): покрытие точек треугольниками (bincount), вырожденные
+    треугольники и треугольники с ориентацией, противоположной большинству.
+    Счетчики копятся до reset_counters.
+    """
+    DEGENERATE_AREA = 1e-9  # Удвоенная площадь, ниже которой треугольник считается вырожденным
+    COUNTERS = ("frames", "invalid", "repaired", "unresolved", "retriangulations",
+                "unused_points", "duplicate_points", "degenerate_triangles", "flipped_triangles")
+
+    def __init__(self, max_retries=2, log_level="ERROR"):
+        numeric_log_level = logger.level(log_level).no if isinstance(log_level, str) else log_level
+        self.logger = logger.bind(module_level=numeric_log_level)
+        self.max_retries = max(0, int(max_retries))
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+
+    def reset_counters(self):
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+
+    def stats(self):
+        return dict(self.counters)
+
+    def inspect(self, points, triangles):
+        """Отчет о триангуляции: индексы проблемных вершин и признак valid."""
+        simplices = np.asarray(triangles.get('triangles', ()), dtype=np.int64).reshape(-1, 3)
+        if len(simplices) == 0:
+            return {"valid": False, "empty": True, "unused": np.arange(len(points)),
+                    "degenerate": np.empty((0, 3), dtype=np.int64), "flipped": np.empty((0, 3), dtype=np.int64)}
+        counts = np.bincount(simplices.ravel(), minlength=len(points))[:len(points)]
+        unused = np.nonzero(counts == 0)[0]
+        areas = triangle_orientations(triangles['vertices'], simplices)
+        degenerate = np.nonzero(np.abs(areas) <= self.DEGENERATE_AREA)[0]
+        # Все треугольники одной триангуляции обходятся в одном направлении
+        majority = np.sign(np.sum(np.sign(areas))) or 1.0
+        flipped = np.nonzero(np.sign(areas) == -majority)[0]
+        return {"valid": not (len(unused) or len(degenerate) or len(flipped)), "empty": False,
+                "unused": unused, "degenerate": simplices[degenerate], "flipped": simplices[flipped]}
+
+    def problem_points(self, report):
+        """Вершины, которые стоит сдвинуть, чтобы исправить сетку из отчета inspect."""
+        return np.unique(np.concatenate([
+            report["unused"], report["degenerate"].ravel(), report["flipped"].ravel()
+        ]).astype(np.int64))
+
+    def record(self, duplicates, first_report, final_report, retriangulations):
+        """Учет результата проверки кадра после всех попыток исправления.
+
+        duplicates — число совпадающих точек, найденных до триангуляции.
+        """
+        counters = self.counters
+        counters["frames"] += 1
+        counters["retriangulations"] += retriangulations
+        counters["duplicate_points"] += duplicates
+        if first_report["valid"] and not duplicates:
+            return
+        counters["invalid"] += 1
+        counters["unused_points"] += len(first_report["unused"])
+        counters["degenerate_triangles"] += len(first_report["degenerate"])
+        counters["flipped_triangles"] += len(first_report["flipped"])
+        if final_report["valid"]:
+            counters["repaired"] += 1
+        else:
+            counters["unresolved"] += 1
+            self.logger.debug(f"Триангуляция принята с дефектами после {retriangulations} попыток: "
+                              f"{len(final_report['unused'])} точек без связей, "
+                              f"{len(final_report['degenerate'])} вырожденных треугольников")
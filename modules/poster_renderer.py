@@ -0,0 +1,164 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from loguru import logger
+
+
+class PosterRenderer:
+    """Рендеринг кадра любого размера по плиткам с потоковой записью в PNG.
+
+    Геометрия кадра масштабируется до размера постера и один раз раскладывается
+    по слоям в том же порядке, что и при обычной отрисовке. Холст обходится полосами
+    высотой не больше плитки: для полосы отбираются примитивы, пересекающие ее по
+    габаритам, полоса делится на плитки, плитки растеризуются независимо
+    (параллельно в потоках — OpenCV отпускает GIL) и полоса сразу уходит в файл.
+    Полоса занимает всю ширину постера, поэтому ее высота подбирается под band_memory;
+    холст плитки не больше (плитка + 2 * max_margin) по каждой стороне.
+
+    Плитка совпадает с отрисовкой за один проход попиксельно, если все ее примитивы
+    умещаются в поле max_margin вокруг нее. Более длинные ребра обрезаются по краю
+    холста и могут отличаться на 1 px вдоль обрезанной части; число таких плиток
+    сохраняется в clipped_tiles и выводится предупреждением.
+    """
+    def __init__(self, render_manager, width, height, tile_size=1024, workers=0, max_margin=1024,
+                 band_memory=256 * 2 ** 20, log_level="ERROR"):
+        numeric_log_level = logger.level(log_level).no if isinstance(log_level, str) else log_level
+        self.logger = logger.bind(module_level=numeric_log_level)
+        self.source = render_manager
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.workers = workers or os.cpu_count() or 1
+        self.max_margin = max(0, int(max_margin))
+        # Полоса занимает всю ширину постера: ее высота уменьшается, чтобы уложиться в band_memory
+        self.band_height = max(1, min(tile_size, int(band_memory) // (3 * width)))
+        self.clipped_tiles = 0
+        # Стиль постера: размер точек и толщина линий масштабируются вместе с кадром
+        self.style = render_manager.clone(width, height)
+        self.sprite = None
+        # Поверхности Pygame не рассчитаны на одновременный blit одного спрайта из нескольких потоков
+        self.sprite_lock = threading.Lock()
+
+    def _layers(self, triangles):
+        """Слои постера: целочисленная геометрия и габариты каждого примитива."""
+        scale = np.array([self.width / self.source.frame_width, self.height / self.source.frame_height])
+        scene = self.style.vector_scene(
+            {'vertices': np.asarray(triangles['vertices'], dtype=np.float64) * scale,
+             'triangles': triangles['triangles']})
+        layers = []
+        for layer in scene["layers"]:
+            if layer["kind"] == "points":
+                radius = self.style.points_size // 2
+                # Левые верхние углы спрайтов, как в RenderManager.draw_points
+                corners = layer["points"].astype(np.int32) - radius
+                side = 2 * radius + 1
+                layers.append({"kind": "points", "items": corners,
+                               "low": corners, "high": corners + side})
+            elif layer["kind"] == "lines":
+                segments = layer["segments"].astype(np.int32)
+                pad = layer["width"] // 2 + 1
+                layers.append({"kind": "lines", "items": segments, "color": layer["color"],
+                               "width": layer["width"],
+                               "low": segments.min(axis=1) - pad, "high": segments.max(axis=1) + pad + 1})
+            else:
+                polygons = layer["polygons"].astype(np.int32)
+                layers.append({"kind": "fill", "items": polygons, "color": layer["color"],
+                               "low": polygons.min(axis=1), "high": polygons.max(axis=1) + 1})
+        return layers
+
+    @staticmethod
+    def _cull(layers, x0, y0, x1, y1):
+        """Примитивы слоев, габариты которых пересекают прямоугольник [x0, x1) x [y0, y1)."""
+        culled = []
+        for layer in layers:
+            low, high = layer["low"], layer["high"]
+            visible = (low[:, 0] < x1) & (high[:, 0] > x0) & (low[:, 1] < y1) & (high[:, 1] > y0)
+            culled.append(dict(layer, items=layer["items"][visible], low=low[visible], high=high[visible]))
+        return culled
+
+    def _canvas(self, layers, x0, y0, x1, y1):
+        """Холст плитки [x0, x1) x [y0, y1): габариты всех ее примитивов в пределах постера.
+
+        OpenCV обрезает ребра по краю изображения и рисует обрезанный отрезок заново,
+        из-за чего его пиксели смещаются на 1 px по всей длине. Пока холст вмещает
+        примитивы целиком, обрезка происходит только по краю постера — там же, где
+        и при отрисовке за один проход, — и плитка совпадает с ним попиксельно.
+        Холст не выходит за плитку больше чем на max_margin; второй результат
+        сообщает, уместились ли примитивы.
+        """
+        low, high = [x0, y0], [x1, y1]
+        for layer in layers:
+            if len(layer["items"]):
+                low = np.minimum(low, layer["low"].min(axis=0))
+                high = np.maximum(high, layer["high"].max(axis=0))
+        needed = (max(low[0], 0), max(low[1], 0), min(high[0], self.width), min(high[1], self.height))
+        margin = self.max_margin
+        canvas = (max(needed[0], x0 - margin), max(needed[1], y0 - margin),
+                  min(needed[2], x1 + margin), min(needed[3], y1 + margin))
+        return tuple(int(value) for value in canvas), canvas == needed
+
+    def _render_tile(self, layers, x0, y0, tile_width, tile_height):
+        """Растеризация одной плитки; координаты примитивов сдвигаются в начало ее холста.
+
+        Возвращает плитку и признак попиксельного совпадения с отрисовкой за один проход.
+        """
+        import cv2
+        import pygame
+        layers = self._cull(layers, x0, y0, x0 + tile_width, y0 + tile_height)
+        (cx0, cy0, cx1, cy1), exact = self._canvas(layers, x0, y0, x0 + tile_width, y0 + tile_height)
+        tile = np.empty((cy1 - cy0, cx1 - cx0, 3), dtype=np.uint8)
+        tile[:] = self.style.rgb_bg_color
+        offset = np.array([cx0, cy0], dtype=np.int32)
+        for layer in layers:
+            if len(layer["items"]) == 0:
+                continue
+            if layer["kind"] == "points":
+                surface = pygame.image.frombuffer(tile, tile.shape[1::-1], "RGB")
+                with self.sprite_lock:
+                    surface.blits([(self.sprite, corner) for corner in (layer["items"] - offset).tolist()],
+                                  doreturn=False)
+            elif layer["kind"] == "lines":
+                cv2.polylines(tile, layer["items"] - offset, False, layer["color"], layer["width"])
+            else:
+                cv2.fillPoly(tile, layer["items"] - offset, layer["color"])
+        return tile[y0 - cy0:y0 - cy0 + tile_height, x0 - cx0:x0 - cx0 + tile_width], exact
+
+    def render(self, triangles, file_path):
+        """Рендеринг кадра в PNG размера width x height."""
+        from modules.frame_writers import PngRowWriter
+        if not triangles or len(triangles.get('triangles', ())) == 0:
+            raise ValueError("Нет кадра для рендеринга постера")
+        self.logger.info(f"Рендеринг постера {self.width}x{self.height} плитками {self.tile_size} "
+                         f"в {self.workers} потоков")
+        layers = self._layers(triangles)
+        if self.style.points_check:
+            self.sprite = self.style._point_sprite()
+        writer = PngRowWriter(file_path, self.width, self.height,
+                              self.source.config.get_int("Export", "png_compression"))
+        bands = -(-self.height // self.band_height)
+        self.clipped_tiles = 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for y0 in range(0, self.height, self.band_height):
+                    band_height = min(self.band_height, self.height - y0)
+                    band_layers = self._cull(layers, 0, y0, self.width, y0 + band_height)
+                    band = np.empty((band_height, self.width, 3), dtype=np.uint8)
+                    origins = list(range(0, self.width, self.tile_size))
+                    tiles = executor.map(
+                        lambda x0: self._render_tile(band_layers, x0, y0, min(self.tile_size, self.width - x0),
+                                                     band_height),
+                        origins)
+                    for x0, (tile, exact) in zip(origins, tiles):
+                        band[:, x0:x0 + tile.shape[1]] = tile
+                        self.clipped_tiles += not exact
+                    writer.write_rows(band)
+                    self.logger.debug(f"Полоса {y0 // self.band_height + 1} из {bands} записана")
+        except BaseException:
+            writer.abort()
+            raise
+        if self.clipped_tiles:
+            self.logger.warning(f"{self.clipped_tiles} плиток обрезали примитивы длиннее поля {self.max_margin} px: "
+                                f"ребра в них могут отличаться от отрисовки за один проход на 1 px")
+        writer.close()
+        self.logger.info(f"Постер сохранен в {file_path}")
@@ -0,0 +1,253 @@
+import multiprocessing
+import queue
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from loguru import logger
+
+# Заголовок общей памяти (int64): последний готовый слот, счетчик кадров,
+# ширина и высота кадра в этом слоте, слот, который сейчас читает интерфейс
+HEADER_LATEST = 0
+HEADER_COUNTER = 1
+HEADER_WIDTH = 2
+HEADER_HEIGHT = 3
+HEADER_READING = 4
+HEADER_QUALITY = 5
+HEADER_FIELDS = 8
+HEADER_SIZE = HEADER_FIELDS * 8
+SLOTS = 2
+
+
+def _views(shm, slot_size):
+    """Представления заголовка и слотов кадра поверх общей памяти."""
+    header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+    slots = [np.ndarray((slot_size,), dtype=np.uint8, buffer=shm.buf, offset=HEADER_SIZE + slot * slot_size)
+             for slot in range(SLOTS)]
+    return header, slots
+
+
+def _preview_worker(config_path, shm_name, slot_size, lock, commands, replies, log_level):
+    """Процесс предпросмотра: симуляция, триангуляция и растеризация вне потока интерфейса.
+
+    Это единственная симуляция приложения: интерфейс только пересылает сюда изменения
+    параметров, а для экспорта забирает снимок сцены командой snapshot.
+    """
+    from modules.config_manager import ConfigManager
+    from modules.animation_manager import AnimationManager
+    from modules.render_manager import RenderManager
+    from modules.quality_controller import QualityController
+    from modules.utils import set_logger
+
+    set_logger()
+    config = ConfigManager(config_path, log_level)
+    animation_manager = AnimationManager(config, log_level)
+    render_manager = RenderManager(config, None, log_level)
+    targets = {"animation": animation_manager, "render": render_manager}
+    # Кадры рисует рендерер предпросмотра, поэтому сеттеры основного рендерера не растеризуют полный кадр
+    controller = QualityController(log_level) if config.get_bool("Preview", "adaptive_quality") else None
+    full_quality = QualityController.LEVELS[0]
+    shm = shared_memory.SharedMemory(name=shm_name)
+    header, slots = _views(shm, slot_size)
+
+    def publish(buffer):
+        """Копирование кадра в свободный слот и его публикация."""
+        height, width = buffer.shape[:2]
+        if buffer.size > slot_size:
+            logger.error(f"Кадр {width}x{height} не помещается в буфер предпросмотра")
+            return
+        while True:
+            with lock:
+                slot = 1 - int(header[HEADER_LATEST])
+                if header[HEADER_READING] != slot:
+                    break
+            # Интерфейс еще читает этот слот — кадр подождет, а не перезапишет его
+            time.sleep(0.001)
+        slots[slot][:buffer.size] = buffer.reshape(-1)
+        with lock:
+            header[HEADER_LATEST] = slot
+            header[HEADER_WIDTH] = width
+            header[HEADER_HEIGHT] = height
+            header[HEADER_COUNTER] += 1
+
+    running = False
+    interval = 1 / 60
+    next_tick = time.perf_counter()
+    dirty = True
+    try:
+        while True:
+            timeout = max(0.0, next_tick - time.perf_counter()) if running else None
+            if dirty:
+                timeout = 0
+            pending = []
+            try:
+                # Без анимации процесс спит до следующей команды
+                pending.append(commands.get(timeout=timeout))
+                while True:
+                    pending.append(commands.get_nowait())
+            except queue.Empty:
+                pass
+
+            # Из серии вызовов одного сеттера (перетаскивание слайдера) выполняется только последний
+            last_call = {command[1:3]: index for index, command in enumerate(pending) if command[0] == "call"}
+            for index, command in enumerate(pending):
+                kind = command[0]
+                if kind == "stop":
+                    return
+                if kind == "call":
+                    _, target, method, args = command
+                    if last_call[(target, method)] != index:
+                        continue
+                    getattr(targets[target], method)(*args)
+                    dirty = True
+                elif kind == "generate":
+                    animation_manager.init_frame()
+                    dirty = True
+                elif kind == "snapshot":
+                    replies.put((command[1], animation_manager.get_state(), render_manager.get_state()))
+                elif kind == "running":
+                    running, fps = command[1], command[2]
+                    interval = 1 / max(fps, 1)
+                    next_tick = time.perf_counter()
+
+            frame_started = None
+            if running and time.perf_counter() >= next_tick:
+                frame_started = time.perf_counter()
+                animation_manager.update_frame()
+                next_tick += interval
+                dirty = True
+            if dirty:
+                quality = controller.quality if controller is not None else full_quality
+                buffer = render_manager.render_preview(animation_manager.get_frame(), quality)
+                if buffer is not None:
+                    publish(buffer)
+                dirty = False
+            if frame_started is not None:
+                if controller is not None and controller.update(time.perf_counter() - frame_started, interval):
+                    with lock:
+                        header[HEADER_QUALITY] = controller.level
+                # После долгого кадра отсчет начинается заново, а не догоняет пропущенные кадры
+                next_tick = max(next_tick, time.perf_counter())
+    finally:
+        del header, slots
+        shm.close()
+
+
+class PreviewEngine:
+    """Предпросмотр анимации в отдельном процессе.
+
+    Процесс пишет готовые кадры в двойной буфер общей памяти, интерфейс только
+    показывает последний полный кадр и отправляет изменения параметров через очередь команд.
+    Сцена существует только в процессе предпросмотра; snapshot возвращает ее состояние
+    (параметры, кадр, генераторы случайных чисел), чтобы экспорт совпадал с предпросмотром.
+    """
+    SNAPSHOT_TIMEOUT = 30  # Секунд на ответ процесса (он может дорисовывать тяжелый кадр)
+
+    def __init__(self, config_manager, config_path="config.ini", log_level="INFO"):
+        numeric_log_level = logger.level(log_level).no if isinstance(log_level, str) else log_level
+        self.logger = logger.bind(module_level=numeric_log_level)
+        self.config_path = config_path
+        self.log_level = log_level
+        max_width = config_manager.get_int("ImageParams", "width_max")
+        max_height = config_manager.get_int("ImageParams", "height_max")
+        self.slot_size = max_width * max_height * 3
+        self.context = multiprocessing.get_context("spawn")  # Без fork: родитель уже держит потоки Qt
+        self.lock = self.context.Lock()
+        self.commands = self.context.Queue()
+        self.replies = self.context.Queue()
+        self.snapshot_counter = 0
+        self.shm = None
+        self.header = None
+        self.slots = None
+        self.process = None
+        self.shown_counter = 0
+
+    def start(self):
+        self.logger.info("Запуск процесса предпросмотра")
+        self.shm = shared_memory.SharedMemory(create=True, size=HEADER_SIZE + SLOTS * self.slot_size)
+        self.header, self.slots = _views(self.shm, self.slot_size)
+        self.header[:] = 0
+        self.header[HEADER_READING] = -1
+        self.process = self.context.Process(
+            target=_preview_worker,
+            args=(self.config_path, self.shm.name, self.slot_size, self.lock, self.commands, self.replies,
+                  self.log_level),
+            daemon=True
+        )
+        self.process.start()
+
+    def call(self, target, method, *args):
+        """Вызов метода менеджера (animation или render) в процессе предпросмотра."""
+        self.commands.put(("call", target, method, args))
+
+    def generate(self):
+        self.commands.put(("generate",))
+
+    def set_running(self, flag, fps):
+        self.commands.put(("running", flag, fps))
+
+    def snapshot(self):
+        """Состояние сцены процесса предпросмотра: (состояние анимации, состояние рендера).
+
+        Команда встает в очередь после уже отправленных изменений параметров, поэтому
+        снимок их учитывает. RuntimeError, если процесс не ответил.
+        """
+        if self.process is None or not self.process.is_alive():
+            raise RuntimeError("Процесс предпросмотра не запущен")
+        self.snapshot_counter += 1
+        request = self.snapshot_counter
+        self.commands.put(("snapshot", request))
+        deadline = time.perf_counter() + self.SNAPSHOT_TIMEOUT
+        while True:
+            try:
+                reply = self.replies.get(timeout=0.5)
+            except queue.Empty:
+                if not self.process.is_alive():
+                    raise RuntimeError("Процесс предпросмотра завершился") from None
+                if time.perf_counter() > deadline:
+                    raise RuntimeError("Процесс предпросмотра не вернул состояние сцены") from None
+                continue
+            # Ответ на прежний запрос, оставшийся после истекшего ожидания, пропускается
+            if reply[0] == request:
+                return reply[1], reply[2]
+
+    def show_latest(self, render_manager):
+        """Показ последнего готового кадра, если он новее показанного. Возвращает True при показе."""
+        if self.header is None:
+            return False
+        with self.lock:
+            counter = int(self.header[HEADER_COUNTER])
+            if counter == self.shown_counter:
+                return False
+            slot = int(self.header[HEADER_LATEST])
+            width = int(self.header[HEADER_WIDTH])
+            height = int(self.header[HEADER_HEIGHT])
+            self.header[HEADER_READING] = slot
+        try:
+            frame = self.slots[slot][:width * height * 3].reshape(height, width, 3)
+            render_manager.display_buffer(frame)
+        finally:
+            with self.lock:
+                self.header[HEADER_READING] = -1
+        self.shown_counter = counter
+        return True
+
+    def quality_level(self):
+        """Текущий уровень качества предпросмотра (индекс в QualityController.LEVELS)."""
+        if self.header is None:
+            return 0
+        with self.lock:
+            return int(self.header[HEADER_QUALITY])
+
+    def stop(self):
+        if self.process is None:
+            return
+        self.logger.info("Остановка процесса предпросмотра")
+        self.commands.put(("stop",))
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process = None
+        self.header = None
+        self.slots = None
+        self.shm.close()
+        self.shm.unlink()
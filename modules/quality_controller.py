@@ -0,0 +1,82 @@
+from loguru import logger
+
+
+class QualityController:
+    """Адаптивное качество предпросмотра под заданную частоту кадров.
+
+    Время кадра сглаживается и сравнивается с бюджетом 1/fps. Если кадр несколько раз
+    подряд выходит за бюджет, качество понижается на уровень; если долго укладывается
+    с запасом — повышается обратно. Экспорт этим механизмом не затрагивается.
+    """
+    # Уровни от полного качества к самому легкому: масштаб кадра, заливка, множитель толщины линий
+    LEVELS = [
+        {"scale": 1.0, "fill": True, "lines": 1.0},
+        {"scale": 0.75, "fill": True, "lines": 1.0},
+        {"scale": 0.5, "fill": True, "lines": 1.0},
+        {"scale": 0.5, "fill": False, "lines": 1.0},
+        {"scale": 0.35, "fill": False, "lines": 0.5},
+        {"scale": 0.25, "fill": False, "lines": 0.5},
+    ]
+    SMOOTHING = 0.3  # Вес нового замера в скользящем среднем
+    DEGRADE_AFTER = 3  # Кадров подряд сверх бюджета до понижения
+    RESTORE_AFTER = 30  # Кадров подряд с запасом до повышения
+    HEADROOM = 0.6  # Запас: повышение, если кадр занимает меньше этой доли бюджета
+
+    def __init__(self, log_level="ERROR"):
+        numeric_log_level = logger.level(log_level).no if isinstance(log_level, str) else log_level
+        self.logger = logger.bind(module_level=numeric_log_level)
+        self.level = 0
+        self.average = None
+        self.over_budget = 0
+        self.under_budget = 0
+
+    @property
+    def quality(self):
+        return self.LEVELS[self.level]
+
+    def reset(self):
+        """Возврат к полному качеству (например, после смены параметров сцены)."""
+        self.level = 0
+        self.average = None
+        self.over_budget = 0
+        self.under_budget = 0
+
+    def update(self, frame_time, budget):
+        """Учет времени кадра. Возвращает True, если уровень качества изменился."""
+        if self.average is None:
+            self.average = frame_time
+        else:
+            self.average += self.SMOOTHING * (frame_time - self.average)
+
+        if self.average > budget:
+            self.over_budget += 1
+            self.under_budget = 0
+        elif self.average < budget * self.HEADROOM:
+            self.under_budget += 1
+            self.over_budget = 0
+        else:
+            self.over_budget = 0
+            self.under_budget = 0
+
+        if self.over_budget >= self.DEGRADE_AFTER and self.level < len(self.LEVELS) - 1:
+            self.level += 1
+        elif self.under_budget >= self.RESTORE_AFTER and self.level > 0:
+            self.level -= 1
+        else:
+            return False
+        # После смены уровня замеры начинаются заново: прежнее время относится к другому качеству
+        self.over_budget = 0
+        self.under_budget = 0
+        self.average = None
+        self.logger.debug(f"Качество предпросмотра: {self.describe()} (бюджет {budget * 1000:.1f} мс)")
+        return True
+
+    def describe(self, level=None):
+        """Текстовое описание уровня для интерфейса."""
+        quality = self.LEVELS[self.level if level is None else level]
+        parts = [f"{round(quality['scale'] * 100)}%"]
+        if not quality["fill"]:
+            parts.append("без заливки")
+        if quality["lines"] < 1:
+            parts.append("тонкие линии")
+        return ", ".join(parts)
@@ -1,17 +1,28 @@
-import pygame
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QFileDialog
-from PySide6.QtGui import QImage, QPixmap
-from PySide6.QtCore import Qt, QSize
-from modules.utils import hsv_to_rgb
+from modules.utils import hsv_to_rgb, hsv_to_rgb_array, hash_to_unit
+from modules.trajectory import TrajectoryReader
+from modules.render_targets import RenderTargetPool
 from loguru import logger
-import random
+import hashlib
+import json
+import os
+import queue
+import threading
 import numpy as np
-import cv2
+
+# Тяжелые модули (pygame, cv2, PySide6) импортируются при первом использовании,
+# чтобы не замедлять запуск приложения и фоновых рабочих процессов
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
 
 class RenderManager:
-    def __init__(self, config_manager, canvas, log_level="INFO"):
+    # Индексы палитры для режима индексированной отрисовки
+    PALETTE_BACKGROUND = 0
+    PALETTE_FOREGROUND = 1
+    PALETTE_FILL_OFFSET = 2  # Далее 101 оттенок заливки для яркости 0-100
+
+    def __init__(self, config_manager, canvas=None, log_level="INFO"):
         numeric_log_level = logger.level(log_level).no if isinstance(log_level, str) else log_level
         self.logger = logger.bind(module_level=numeric_log_level)
+        self.log_level = numeric_log_level
         self.logger.debug("Инициализация холста")
 
         self.config = config_manager
@@ -20,6 +31,10 @@ class RenderManager:
         # Инициализация параметров из конфига
         self.points_check = self.config.get_bool("GenerationParams", "points_check")
         self.points_size = self.config.get_int("GenerationParams", "points_size_default")
+        self.points_antialias = self.config.get_bool("GenerationParams", "points_antialias")
+        # Спрайт точки и ключ (размер, цвет, сглаживание), по которому он построен
+        self.point_sprite = None
+        self.point_sprite_key = None
         self.lines_check = self.config.get_bool("GenerationParams", "lines_check")
         self.lines_width = self.config.get_int("GenerationParams", "lines_width_default")
         self.fill_check = self.config.get_bool("GenerationParams", "fill_check")
@@ -34,38 +49,121 @@ class RenderManager:
             "s": self.config.get_int("ColorParams", "bg_saturation_default"),
             "v": self.config.get_int("ColorParams", "bg_brightness_default")
         }
-        self.rgb_color = hsv_to_rgb(
-            self.hsv_color["h"], self.hsv_color["s"], self.hsv_color["v"]
-        )
+        # Таблица цветов заливки: оттенок и насыщенность основного цвета при яркости 0-100
+        self.shade_lut = None
+        self._update_shade_lut()
         self.rgb_bg_color = hsv_to_rgb(
             self.hsv_bg_color["h"], self.hsv_bg_color["s"], self.hsv_bg_color["v"]
         )
         self.frame_width = self.config.get_int("ImageParams", "width_default")
         self.frame_height = self.config.get_int("ImageParams", "height_default")
         self.triangles = None
-        self.triangle_brightness = {}  # Словарь для хранения яркости треугольников
+        # Собственный генератор экземпляра: несколько сцен в потоках одного процесса не делят случайное состояние
+        self.rng = np.random.default_rng()
+        # Зерно яркости заливки: яркость треугольника — детерминированная функция его вершин и зерна
+        self.fill_salt = self._random_seed()
+        # Начиная с этого числа вершин примитивы рисуются пакетно через OpenCV
+        self.large_mode_threshold = self.config.get_int("GenerationParams", "large_mode_threshold")
+
+        # Буфер кадра RGB, общий для Pygame Surface и OpenCV; берется из пула при первой отрисовке
+        # и при смене разрешения. Pygame не инициализируется: рисование на Surface не требует подсистем SDL
+        self.targets = RenderTargetPool(self.config.get_int("ImageParams", "target_pool_size"), log_level)
+        self.buffer = None
+        self.screen = None
+        self.index_buffer = None  # Буфер индексов палитры (uint8) для GIF/WebP
+        # Рендерер предпросмотра пониженного качества, ключ его настроек и пул буферов
+        # для всех уровней качества (рендерер предпросмотра в каждый момент один)
+        self.preview_renderer = None
+        self.preview_renderer_key = None
+        self.preview_targets = None
+        # QualityController живого предпросмотра: если задан, сеттеры перерисовывают кадр
+        # рендерером предпросмотра с его текущим качеством, а не в полном разрешении
+        self.preview_controller = None
+
+        # Настройка PySide6 для отображения Pygame Surface (без холста — фоновый режим для пакетной обработки)
+        self.canvas_widget = None
+        if self.canvas is not None:
+            from PySide6.QtWidgets import QVBoxLayout, QLabel
+            self.canvas_widget = QLabel()
+            self.canvas_layout = QVBoxLayout()
+            self.canvas_layout.addWidget(self.canvas_widget)
+            self.canvas.setLayout(self.canvas_layout)
+
+    def _update_shade_lut(self):
+        """Пересборка таблицы цветов; вызывается только при смене оттенка или насыщенности."""
+        self.shade_lut = hsv_to_rgb_array(self.hsv_color["h"], self.hsv_color["s"], np.arange(101))
+        self.rgb_color = self._shade_color(self.hsv_color["v"])
+
+    def _shade_color(self, shade):
+        """Цвет из таблицы для яркости shade в виде кортежа для Pygame/OpenCV."""
+        return tuple(self.shade_lut[shade].tolist())
+
+    def _random_seed(self):
+        return int(self.rng.integers(1 << 32))
+
+    def reset(self, seed=None):
+        """Новый генератор экземпляра; при заданном зерне яркость заливки воспроизводима."""
+        self.rng = np.random.default_rng(seed)
+        self.fill_salt = self._random_seed()
+
+    def render_settings(self):
+        """Параметры стиля, от которых зависит растр кадра (кроме зерна заливки)."""
+        return {
+            "points": [self.points_check, self.points_size, self.points_antialias],
+            "lines": [self.lines_check, self.lines_width],
+            "fill": [self.fill_check, self.fill_variation],
+            "color": [self.hsv_color["h"], self.hsv_color["s"], self.hsv_color["v"]],
+            "bg_color": [self.hsv_bg_color["h"], self.hsv_bg_color["s"], self.hsv_bg_color["v"]],
+            "large_mode_threshold": self.large_mode_threshold
+        }
 
-        # Инициализация Pygame
-        pygame.init()
-        self.screen = pygame.Surface((self.frame_width, self.frame_height))
-        self.screen.fill(self.rgb_bg_color)
+    # Стиль и кадр, которые передаются между процессами (см. get_state/set_state)
+    STATE_FIELDS = ("points_check", "points_size", "points_antialias", "lines_check", "lines_width", "fill_check",
+                    "fill_variation", "hsv_color", "hsv_bg_color", "fill_salt", "frame_width", "frame_height",
+                    "triangles")
+
+    def get_state(self):
+        """Снимок стиля, разрешения, последнего кадра и генератора случайных чисел."""
+        state = {field: getattr(self, field) for field in self.STATE_FIELDS}
+        state["hsv_color"] = dict(self.hsv_color)
+        state["hsv_bg_color"] = dict(self.hsv_bg_color)
+        state["rng"] = self.rng.bit_generator.state
+        return state
+
+    def set_state(self, state):
+        """Восстановление из get_state; кадр не перерисовывается и не показывается."""
+        for field in self.STATE_FIELDS:
+            setattr(self, field, state[field])
+        self.hsv_color = dict(state["hsv_color"])
+        self.hsv_bg_color = dict(state["hsv_bg_color"])
+        self.rng = np.random.default_rng()
+        self.rng.bit_generator.state = state["rng"]
+        self._update_shade_lut()
+        self.rgb_bg_color = hsv_to_rgb(self.hsv_bg_color["h"], self.hsv_bg_color["s"], self.hsv_bg_color["v"])
 
-        # Настройка PySide6 для отображения Pygame Surface
-        self.canvas_widget = QLabel()
-        self.canvas_layout = QVBoxLayout()
-        self.canvas_layout.addWidget(self.canvas_widget)
-        self.canvas.setLayout(self.canvas_layout)
+    def _ensure_target(self):
+        """Буфер кадра текущего разрешения; при смене разрешения берется из пула."""
+        if self.buffer is not None and self.buffer.shape[:2] == (self.frame_height, self.frame_width):
+            return
+        self.buffer, self.screen = self.targets.acquire(self.frame_width, self.frame_height)
+        self.screen.fill(self.rgb_bg_color)
 
     def render_frame(self, triangles):
         """Отрисовка кадра."""
         self.logger.debug("Отрисовка кадра")
+        if triangles is None:
+            self.logger.debug("Кадр еще не сгенерирован")
+            return
         if not triangles or 'triangles' not in triangles or len(triangles['triangles']) == 0:
             self.logger.warning("Получен пустой кадр или отсутствуют треугольники")
             return
-        self.triangles = triangles
+        self._draw(triangles)
+        self.display_buffer(self.buffer)
 
-        # Очистка словаря яркости при новом кадре
-        self.triangle_brightness.clear()
+    def _draw(self, triangles):
+        """Растеризация кадра в буфер без показа на холсте."""
+        self.triangles = triangles
+        self._ensure_target()
 
         # Очистка поверхности
         self.screen.fill(self.rgb_bg_color)
@@ -78,116 +176,273 @@ class RenderManager:
         if self.fill_check:
             self.draw_fill()
 
-        # Преобразование Pygame Surface в QImage для отображения в PySide6
-        pygame_image = pygame.image.tostring(self.screen, "RGB")
-        qimage = QImage(pygame_image, self.frame_width, self.frame_height, QImage.Format.Format_RGB888)
+    def render_preview(self, triangles, quality):
+        """Отрисовка кадра предпросмотра с пониженным качеством.
+
+        quality — уровень QualityController: масштаб кадра, заливка и толщина линий.
+        Рисует отдельный рендерер, поэтому состояние и качество экспорта не меняются.
+        Возвращает буфер кадра предпросмотра.
+        """
+        if triangles is None or len(triangles.get('triangles', ())) == 0:
+            return None
+        width = max(16, round(self.frame_width * quality["scale"]))
+        height = max(16, round(self.frame_height * quality["scale"]))
+        key = (width, height, quality["fill"], quality["lines"], self.points_check, self.points_size,
+               self.points_antialias, self.lines_check, self.lines_width, self.fill_check, self.fill_variation,
+               tuple(self.hsv_color.values()), self.rgb_bg_color, self.fill_salt, self.frame_width, self.frame_height)
+        if self.preview_renderer_key != key:
+            if self.preview_targets is None:
+                from modules.quality_controller import QualityController
+                # По буферу на каждый масштаб уровней качества: смена уровня не выделяет память заново
+                scales = {level["scale"] for level in QualityController.LEVELS}
+                self.preview_targets = RenderTargetPool(len(scales), "ERROR")
+            renderer = self.clone(width, height)
+            renderer.targets = self.preview_targets
+            renderer.fill_check = self.fill_check and quality["fill"]
+            renderer.lines_width = max(1, round(renderer.lines_width * quality["lines"]))
+            self.preview_renderer = renderer
+            self.preview_renderer_key = key
+        scale = np.array([width / self.frame_width, height / self.frame_height])
+        self.preview_renderer.render_frame(
+            {'vertices': np.asarray(triangles['vertices']) * scale, 'triangles': triangles['triangles']})
+        self.display_buffer(self.preview_renderer.buffer)
+        return self.preview_renderer.buffer
+
+    def _redraw(self):
+        """Перерисовка текущего кадра после смены параметра стиля."""
+        if self.preview_controller is None:
+            self.render_frame(self.triangles)
+        else:
+            self.render_preview(self.triangles, self.preview_controller.quality)
+
+    def display_buffer(self, buffer):
+        """Показ кадра RGB (height, width, 3) на холсте; без холста ничего не делает."""
+        if self.canvas_widget is None:
+            return
+
+        from PySide6.QtGui import QImage, QPixmap
+        from PySide6.QtCore import Qt
+
+        # Буфер кадра напрямую оборачивается в QImage для отображения в PySide6
+        height, width = buffer.shape[:2]
+        qimage = QImage(buffer.data, width, height, width * 3, QImage.Format.Format_RGB888)
         pixmap = QPixmap.fromImage(qimage)
         self.canvas_widget.setPixmap(pixmap.scaled(self.canvas_widget.size(), Qt.AspectRatioMode.KeepAspectRatio))
 
+    def build_palette(self):
+        """Палитра индексированного режима: фон, основной цвет и оттенки заливки."""
+        return np.vstack([np.array([self.rgb_bg_color, self.rgb_color], dtype=np.uint8), self.shade_lut])
+
+    def render_indexed(self, triangles):
+        """Отрисовка кадра в буфер индексов палитры (один байт на пиксель вместо трех)."""
+        self.logger.debug("Отрисовка индексированного кадра")
+        if not triangles or 'triangles' not in triangles or len(triangles['triangles']) == 0:
+            self.logger.warning("Получен пустой кадр или отсутствуют треугольники")
+            return
+        import cv2
+        self.triangles = triangles
+        if self.index_buffer is None or self.index_buffer.shape != (self.frame_height, self.frame_width):
+            self.index_buffer, _ = self.targets.acquire(self.frame_width, self.frame_height, channels=1)
+        self.index_buffer.fill(self.PALETTE_BACKGROUND)
+
+        vertices = np.asarray(triangles['vertices']).astype(np.int32)
+        simplices = np.asarray(triangles['triangles'])
+        if self.points_check:
+            radius = self.points_size // 2
+            for x, y in vertices.tolist():
+                cv2.circle(self.index_buffer, (x, y), radius, self.PALETTE_FOREGROUND, -1)
+        if self.lines_check:
+            cv2.polylines(self.index_buffer, vertices[self._unique_edges(simplices)], False,
+                          self.PALETTE_FOREGROUND, self.lines_width)
+        if self.fill_check:
+            polygons = vertices[simplices]
+            shades = self._triangle_shades(simplices)
+            for shade in np.unique(shades).tolist():
+                cv2.fillPoly(self.index_buffer, polygons[shades == shade], self.PALETTE_FILL_OFFSET + shade)
+
+    def vector_scene(self, triangles):
+        """Векторное описание кадра для SVG/PDF в том же порядке слоев, что и растр."""
+        vertices = np.asarray(triangles['vertices'], dtype=np.float64)
+        simplices = np.asarray(triangles['triangles'])
+        layers = []
+        if self.points_check:
+            layers.append({"kind": "points", "color": self.rgb_color, "size": max(1, self.points_size),
+                           "points": vertices})
+        if self.lines_check:
+            layers.append({"kind": "lines", "color": self.rgb_color, "width": self.lines_width,
+                           "segments": vertices[self._unique_edges(simplices)]})
+        if self.fill_check:
+            polygons = vertices[simplices]
+            shades = self._triangle_shades(simplices)
+            for shade in np.unique(shades).tolist():
+                layers.append({"kind": "fill",
+                               "color": self._shade_color(shade),
+                               "polygons": polygons[shades == shade]})
+        return {"width": self.frame_width, "height": self.frame_height,
+                "background": self.rgb_bg_color, "layers": layers}
+
+    def _is_large_frame(self):
+        """Режим большого числа точек: пакетная отрисовка вместо поштучных вызовов Pygame."""
+        return len(self.triangles['vertices']) > self.large_mode_threshold
+
+    def _point_sprite(self):
+        """Спрайт точки; пересобирается только при смене размера, цвета или сглаживания."""
+        key = (self.points_size, self.rgb_color, self.points_antialias)
+        if self.point_sprite_key == key:
+            return self.point_sprite
+        import pygame
+        radius = self.points_size // 2
+        side = 2 * radius + 1
+        self.logger.debug(f"Построение спрайта точки {side}x{side}")
+        if self.points_antialias:
+            # Сглаженный край: диск рисуется с четырехкратным запасом и уменьшается с усреднением
+            scale = 4
+            large = pygame.Surface((side * scale, side * scale), pygame.SRCALPHA)
+            pygame.draw.circle(large, (*self.rgb_color, 255), (side * scale // 2, side * scale // 2),
+                               side * scale // 2)
+            sprite = pygame.transform.smoothscale(large, (side, side))
+        else:
+            # Тот же набор пикселей, что и у pygame.draw.circle; прозрачность — по цветовому ключу
+            colorkey = (0, 0, 0) if self.rgb_color != (0, 0, 0) else (255, 255, 255)
+            sprite = pygame.Surface((side, side))
+            sprite.fill(colorkey)
+            if radius > 0:
+                pygame.draw.circle(sprite, self.rgb_color, (radius, radius), radius)
+            else:
+                sprite.fill(self.rgb_color)
+            sprite.set_colorkey(colorkey)
+        self.point_sprite = sprite
+        self.point_sprite_key = key
+        return sprite
+
     def draw_points(self):
-        """Отрисовка точек."""
+        """Отрисовка точек одним пакетным вызовом blits с кэшированным спрайтом. Стоимость O(N)."""
         self.logger.debug(f"Отрисовка {len(self.triangles['vertices'])} точек с размером {self.points_size}")
-        for point in self.triangles['vertices']:
-            try:
-                x, y = int(point[0]), int(point[1])
-                pygame.draw.circle(self.screen, self.rgb_color, (x, y), self.points_size // 2)
-            except (IndexError, TypeError) as e:
-                self.logger.error(f"Ошибка при отрисовке точки {point}: {e}")
+        sprite = self._point_sprite()
+        radius = self.points_size // 2
+        corners = (np.asarray(self.triangles['vertices']).astype(np.int32) - radius).tolist()
+        self.screen.blits([(sprite, corner) for corner in corners], doreturn=False)
+
+    def _unique_edges(self, simplices):
+        """Уникальные ребра триангуляции (общие ребра соседних треугольников рисуются один раз)."""
+        edges = np.concatenate([simplices[:, [0, 1]], simplices[:, [1, 2]], simplices[:, [2, 0]]]).astype(np.int64)
+        edges.sort(axis=1)
+        keys = np.unique(edges[:, 0] << 32 | edges[:, 1])
+        return np.column_stack([keys >> 32, keys & 0xFFFFFFFF])
 
     def draw_lines(self):
-        """Отрисовка линий."""
+        """Отрисовка линий. Стоимость O(T log T) из-за дедупликации ребер."""
         self.logger.debug(f"Отрисовка линий с толщиной {self.lines_width}")
         if not self.triangles or 'triangles' not in self.triangles:
             self.logger.debug("Нет линий для отрисовки")
             return
 
-        for simplex in self.triangles['triangles']:
-            try:
-                # Получаем точки треугольника по индексам из simplex
-                p1 = self.triangles['vertices'][simplex[0]]
-                p2 = self.triangles['vertices'][simplex[1]]
-                p3 = self.triangles['vertices'][simplex[2]]
-
-                # Отрисовка линий между вершинами треугольника
-                pygame.draw.line(self.screen, self.rgb_color, (int(p1[0]), int(p1[1])), (int(p2[0]), int(p2[1])),
-                                 self.lines_width)
-                pygame.draw.line(self.screen, self.rgb_color, (int(p2[0]), int(p2[1])), (int(p3[0]), int(p3[1])),
-                                 self.lines_width)
-                pygame.draw.line(self.screen, self.rgb_color, (int(p3[0]), int(p3[1])), (int(p1[0]), int(p1[1])),
-                                 self.lines_width)
-            except (IndexError, TypeError) as e:
-                self.logger.error(f"Ошибка при отрисовке треугольника {simplex}: {e}")
+        vertices = np.asarray(self.triangles['vertices']).astype(np.int32)
+        segments = vertices[self._unique_edges(np.asarray(self.triangles['triangles']))]
+        if self._is_large_frame():
+            import cv2
+            # Все ребра одним вызовом
+            cv2.polylines(self.buffer, segments, False, self.rgb_color, self.lines_width)
+        else:
+            import pygame
+            for p1, p2 in segments.tolist():
+                pygame.draw.line(self.screen, self.rgb_color, p1, p2, self.lines_width)
+
+    def _triangle_shades(self, simplices):
+        """Целая яркость (0-100) каждого треугольника с учетом разброса.
+
+        Яркость определяется набором вершин треугольника и зерном fill_salt,
+        поэтому один и тот же треугольник сохраняет оттенок между кадрами.
+        """
+        ordered = np.sort(simplices, axis=1).astype(np.uint64)
+        keys = ordered[:, 0] << np.uint64(42) | ordered[:, 1] << np.uint64(21) | ordered[:, 2]
+        base_brightness = self.hsv_color["v"]
+        low = max(0, base_brightness - self.fill_variation)
+        high = min(100, base_brightness + self.fill_variation)
+        return np.rint(low + hash_to_unit(keys, self.fill_salt) * (high - low)).astype(np.int32)
 
     def draw_fill(self):
-        """Отрисовка заливки треугольников из триангуляции Делоне."""
+        """Отрисовка заливки треугольников, сгруппированной по цвету. Стоимость O(T)."""
         self.logger.debug("Отрисовка заливки")
         if not self.triangles or 'triangles' not in self.triangles:
             self.logger.debug("Нет треугольников для заливки")
             return
 
-        for simplex in self.triangles['triangles']:
-            try:
-                # Получаем точки треугольника
-                p1 = self.triangles['vertices'][simplex[0]]
-                p2 = self.triangles['vertices'][simplex[1]]
-                p3 = self.triangles['vertices'][simplex[2]]
-
-                # Создаем ключ для треугольника на основе индексов вершин
-                triangle_key = tuple(sorted(simplex))
-
-                # Получаем яркость для треугольника
-                if triangle_key not in self.triangle_brightness:
-                    # Генерируем новую яркость с учетом разброса
-                    base_brightness = self.hsv_color["v"]
-                    variation = self.fill_variation
-                    brightness = random.uniform(
-                        max(0, base_brightness - variation),
-                        min(100, base_brightness + variation)
-                    )
-                    self.triangle_brightness[triangle_key] = brightness
-                else:
-                    # Используем сохраненную яркость
-                    brightness = self.triangle_brightness[triangle_key]
-
-                # Преобразуем цвет с учетом оттенка основного цвета
-                fill_color = hsv_to_rgb(
-                    self.hsv_color["h"],
-                    self.hsv_color["s"],
-                    brightness
-                )
-
-                # Отрисовка треугольника
-                pygame.draw.polygon(
-                    self.screen,
-                    fill_color,
-                    [(int(p1[0]), int(p1[1])),
-                     (int(p2[0]), int(p2[1])),
-                     (int(p3[0]), int(p3[1]))]
-                )
-            except (IndexError, TypeError) as e:
-                self.logger.error(f"Ошибка при заливке треугольника {simplex}: {e}")
+        simplices = np.asarray(self.triangles['triangles'])
+        polygons = np.asarray(self.triangles['vertices']).astype(np.int32)[simplices]
+        shades = self._triangle_shades(simplices)
+        large_frame = self._is_large_frame()
+        if large_frame:
+            import cv2
+        else:
+            import pygame
+        for shade in np.unique(shades).tolist():
+            fill_color = self._shade_color(shade)
+            group = polygons[shades == shade]
+            if large_frame:
+                cv2.fillPoly(self.buffer, group, fill_color)
+            else:
+                for polygon in group.tolist():
+                    pygame.draw.polygon(self.screen, fill_color, polygon)
 
     def save_image(self):
         """Сохранение изображения с использованием диалогового окна."""
         self.logger.debug("Открытие диалогового окна для сохранения изображения")
         try:
+            from PySide6.QtWidgets import QFileDialog
             # Открываем диалоговое окно для выбора пути сохранения
             file_dialog = QFileDialog(self.canvas)
             file_dialog.setAcceptMode(QFileDialog.AcceptMode.AcceptSave)
-            file_dialog.setNameFilters(["PNG Image (*.png)", "JPEG Image (*.jpg *.jpeg)"])
+            file_dialog.setNameFilters(["PNG Image (*.png)", "JPEG Image (*.jpg *.jpeg)",
+                                        "SVG Vector (*.svg)", "PDF Vector (*.pdf)"])
             file_dialog.setDefaultSuffix("png")
             file_dialog.setWindowTitle("Сохранить кадр")
 
             if file_dialog.exec():
                 file_path = file_dialog.selectedFiles()[0]
-                self.logger.debug(f"Сохранение изображения в {file_path}")
-                pygame.image.save(self.screen, file_path)
-                self.logger.info(f"Изображение успешно сохранено в {file_path}")
+                self.write_image(file_path)
             else:
                 self.logger.debug("Сохранение изображения отменено")
         except Exception as e:
             self.logger.error(f"Ошибка при сохранении изображения: {e}")
 
+    def write_image(self, file_path):
+        """Запись текущего кадра в файл (формат определяется расширением).
+
+        SVG и PDF строятся из геометрии кадра без растеризации, поэтому годятся для печати любого размера.
+        """
+        from modules.vector_export import VECTOR_EXTENSIONS, write_vector
+        self.logger.debug(f"Сохранение изображения в {file_path}")
+        if os.path.splitext(file_path)[1].lstrip(".").lower() in VECTOR_EXTENSIONS:
+            if not self.triangles:
+                raise ValueError("Нет кадра для векторного экспорта")
+            write_vector(file_path, self.vector_scene(self.triangles))
+            self.logger.info(f"Изображение успешно сохранено в {file_path}")
+            return
+        import pygame
+        # Кадр перерисовывается: буфер мог остаться от другого разрешения или стиля,
+        # а в режиме предпросмотра в процессе его рисует только процесс предпросмотра
+        if self.triangles is not None and len(self.triangles.get('triangles', ())):
+            self._draw(self.triangles)
+        else:
+            self._ensure_target()
+        pygame.image.save(self.screen, file_path)
+        self.logger.info(f"Изображение успешно сохранено в {file_path}")
+
+    def render_poster(self, triangles, file_path, width, height):
+        """Рендеринг кадра в PNG произвольного размера (без ограничения width_max/height_max).
+
+        Кадр растеризуется плитками и пишется в файл полосами, память ограничена
+        poster_band_memory_mb и полем плиток poster_max_margin.
+        """
+        from modules.poster_renderer import PosterRenderer
+        PosterRenderer(self, width, height,
+                       tile_size=self.config.get_int("Export", "poster_tile_size"),
+                       workers=self.config.get_int("Export", "poster_workers"),
+                       max_margin=self.config.get_int("Export", "poster_max_margin"),
+                       band_memory=self.config.get_int("Export", "poster_band_memory_mb") * 2 ** 20,
+                       log_level=self.log_level).render(triangles, file_path)
+
     def export_animation(self, animation_manager, fps, duration):
         """Экспорт анимации в видеофайл."""
         self.logger.info("Экспорт анимации")
@@ -196,150 +451,478 @@ class RenderManager:
                 self.logger.error("Частота кадров и длительность должны быть больше 0")
                 return
 
-            # Открываем диалоговое окно для выбора пути сохранения
-            file_dialog = QFileDialog(self.canvas)
-            file_dialog.setAcceptMode(QFileDialog.AcceptMode.AcceptSave)
-            file_dialog.setNameFilters(["MP4 Video (*.mp4)"])
-            file_dialog.setDefaultSuffix("mp4")
-            file_dialog.setWindowTitle("Сохранить анимацию")
-
-            if not file_dialog.exec():
+            file_path = self._ask_save_path(
+                "Сохранить анимацию", ["MP4 Video (*.mp4)", "Animated GIF (*.gif)", "Animated WebP (*.webp)",
+                                       "YUV4MPEG2 Stream (*.y4m)", "Raw RGB Stream (*.rgb)", "Raw BGR Stream (*.bgr)",
+                                       "Mapped Frames (*.frames)"], "mp4")
+            if not file_path:
                 self.logger.debug("Сохранение анимации отменено")
                 return
-
-            file_path = file_dialog.selectedFiles()[0]
             self.logger.debug(f"Сохранение анимации в {file_path}")
 
-            # Инициализация видеозаписи с OpenCV
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # Кодек для MP4
-            video_writer = cv2.VideoWriter(file_path, fourcc, fps, (self.frame_width, self.frame_height))
+            self.render_animation(animation_manager, file_path, fps, duration)
+            self.logger.info(f"Анимация успешно сохранена в {file_path}")
 
-            # Инициализируем кадр
-            animation_manager.init_frame()
+        except Exception as e:
+            self.logger.error(f"Ошибка при экспорте анимации: {e}")
 
-            # Генерация и запись кадров
-            total_frames = int(fps * duration)
-            for frame_idx in range(total_frames):
-                self.logger.debug(f"Генерация кадра {frame_idx + 1}/{total_frames}")
-                animation_manager.update_frame()
-                triangles = animation_manager.get_frame()
-                self.render_frame(triangles)
+    def render_animation(self, animation_manager, file_path, fps, duration):
+        """Симуляция и запись анимации в файл без диалогов (формат по расширению)."""
+        self._match_animation_size(animation_manager)
+        # Инициализируем кадр
+        animation_manager.init_frame()
+        total_frames = int(fps * duration)
+        writer = self._open_writer(file_path, fps, total_frames)
+        self._write_frames(self._simulate(animation_manager, total_frames), writer, total_frames)
+
+    def clone(self, width, height):
+        """Фоновый рендерер того же стиля для другого разрешения.
+
+        Размер точек и толщина линий масштабируются вместе с кадром, чтобы
+        уменьшенные выходы выглядели так же, как основной.
+        """
+        renderer = RenderManager(self.config, None, "ERROR")
+        scale = min(width / self.frame_width, height / self.frame_height)
+        renderer.frame_width = width
+        renderer.frame_height = height
+        renderer.points_check = self.points_check
+        renderer.points_size = max(1, round(self.points_size * scale))
+        renderer.points_antialias = self.points_antialias
+        renderer.lines_check = self.lines_check
+        renderer.lines_width = max(1, round(self.lines_width * scale))
+        renderer.fill_check = self.fill_check
+        renderer.fill_variation = self.fill_variation
+        renderer.hsv_color = dict(self.hsv_color)
+        renderer.hsv_bg_color = dict(self.hsv_bg_color)
+        renderer.shade_lut = self.shade_lut
+        renderer.rgb_color = self.rgb_color
+        renderer.rgb_bg_color = self.rgb_bg_color
+        renderer.fill_salt = self.fill_salt
+        renderer.large_mode_threshold = self.large_mode_threshold
+        return renderer
+
+    def _open_writer(self, file_path, fps, total_frames=None, resume=False):
+        """Выбор записи кадров по расширению файла.
+
+        resume=True — последовательности кадров пропускают уже записанные файлы.
+        """
+        extension = os.path.splitext(file_path)[1].lstrip(".").lower()
+        size = (self.frame_width, self.frame_height)
+        if extension == "mp4":
+            from modules.frame_writers import VideoFrameWriter
+            return VideoFrameWriter(file_path, fps, size)
+        if extension in ("png", "tif", "tiff"):
+            from modules.frame_writers import ImageSequenceWriter
+            return ImageSequenceWriter(
+                file_path, size,
+                workers=self.config.get_int("Export", "sequence_workers"),
+                queue_size=self.config.get_int("Export", "sequence_queue_size"),
+                png_compression=self.config.get_int("Export", "png_compression"),
+                resume=resume
+            )
+        if extension in ("gif", "webp"):
+            from modules.frame_writers import AnimatedImageWriter
+            return AnimatedImageWriter(file_path, fps, size, self.build_palette(), total_frames,
+                                       self.config.get_int("Export", "webp_max_memory_mb") * 2 ** 20)
+        if extension in ("svg", "pdf"):
+            from modules.frame_writers import VectorSequenceWriter
+            return VectorSequenceWriter(file_path, size, resume=resume)
+        if extension in ("y4m", "rgb", "bgr"):
+            from modules.frame_writers import RawStreamWriter
+            return RawStreamWriter(file_path, fps, size)
+        if extension == "frames":
+            from modules.frame_writers import MappedFrameWriter
+            return MappedFrameWriter(file_path, fps, size, total_frames)
+        raise ValueError(f"Неподдерживаемый формат вывода: {extension}")
+
+    def export_outputs(self, animation_manager, fps, duration):
+        """Экспорт комплекта выходов из [ExportOutputs] за один прогон симуляции."""
+        self.logger.info("Экспорт комплекта выходов")
+        try:
+            if fps <= 0 or duration <= 0:
+                self.logger.error("Частота кадров и длительность должны быть больше 0")
+                return
+
+            base_path = self._ask_save_path("Сохранить комплект", ["Базовое имя (*)"], "")
+            if not base_path:
+                self.logger.debug("Экспорт комплекта отменен")
+                return
+            base_path = os.path.splitext(base_path)[0]
+
+            outputs = [
+                dict(preset, path=f"{base_path}_{preset['name']}.{preset['format']}")
+                for preset in self.config.get_output_presets()
+            ]
+            if not outputs:
+                self.logger.error("Секция [ExportOutputs] пуста")
+                return
+            self.render_outputs(animation_manager, outputs, fps, duration)
+            self.logger.info(f"Комплект из {len(outputs)} выходов сохранен рядом с {base_path}")
+        except Exception as e:
+            self.logger.error(f"Ошибка при экспорте комплекта: {e}")
+
+    def render_outputs(self, animation_manager, outputs, fps, duration, seed=None):
+        """Запись нескольких выходов из одного потока симуляции и триангуляции.
+
+        outputs — список словарей {path, width, height, fps_divisor}. Каждый выход
+        растеризуется и кодируется своим рендерером в отдельном потоке, поэтому
+        движение во всех выходах совпадает, а симуляция выполняется один раз.
+        """
+        total_frames = int(fps * duration)
+        consumers = []
+        errors = []
+        for output in outputs:
+            width = output.get("width", self.frame_width)
+            height = output.get("height", self.frame_height)
+            fps_divisor = max(1, output.get("fps_divisor", 1))
+            renderer = self.clone(width, height)
+            output_frames = len(range(0, total_frames, fps_divisor))
+            writer = renderer._open_writer(output["path"], fps / fps_divisor, output_frames)
+            frames_queue = queue.Queue(maxsize=4)
+            scale = np.array([width / animation_manager.frame_width, height / animation_manager.frame_height])
+            thread = threading.Thread(
+                target=renderer._consume_frames,
+                args=(frames_queue, writer, scale, output_frames, errors),
+                daemon=True
+            )
+            thread.start()
+            consumers.append((fps_divisor, frames_queue, thread))
 
-                # Преобразуем Pygame Surface в массив NumPy для OpenCV
-                pygame_image = pygame.image.tostring(self.screen, "RGB")
-                frame = np.frombuffer(pygame_image, dtype=np.uint8).reshape((self.frame_height, self.frame_width, 3))
-                frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)  # Конвертация RGB в BGR для OpenCV
-                video_writer.write(frame)
+        try:
+            animation_manager.reset(seed)
+            for frame_idx, triangles in enumerate(self._simulate(animation_manager, total_frames)):
+                self.logger.debug(f"Симуляция кадра {frame_idx + 1}/{total_frames}")
+                for fps_divisor, frames_queue, _ in consumers:
+                    if frame_idx % fps_divisor == 0:
+                        frames_queue.put(triangles)
+        finally:
+            for _, frames_queue, thread in consumers:
+                frames_queue.put(None)
+            for _, _, thread in consumers:
+                thread.join()
+        if errors:
+            raise errors[0]
+
+    def _consume_frames(self, frames_queue, writer, scale, total_frames, errors):
+        """Поток выхода: масштабирование геометрии, растеризация и запись."""
+        def frames():
+            while True:
+                triangles = frames_queue.get()
+                if triangles is None:
+                    return
+                yield {'vertices': np.asarray(triangles['vertices']) * scale, 'triangles': triangles['triangles']}
 
-            # Освобождаем ресурсы
-            video_writer.release()
-            self.logger.info(f"Анимация успешно сохранена в {file_path}")
+        try:
+            self._write_frames(frames(), writer, total_frames)
+        except Exception as e:
+            self.logger.error(f"Ошибка записи выхода: {e}")
+            errors.append(e)
+            # Очередь дочитывается, чтобы не блокировать симуляцию
+            while frames_queue.get() is not None:
+                pass
+
+    def export_sequence(self, animation_manager, fps, duration):
+        """Экспорт анимации последовательностью изображений без потерь."""
+        self.logger.info("Экспорт последовательности кадров")
+        try:
+            if fps <= 0 or duration <= 0:
+                self.logger.error("Частота кадров и длительность должны быть больше 0")
+                return
 
+            file_path = self._ask_save_path("Сохранить последовательность кадров",
+                                            ["PNG Sequence (*.png)", "TIFF Sequence (*.tif)",
+                                             "SVG Sequence (*.svg)", "PDF Sequence (*.pdf)"], "png")
+            if not file_path:
+                self.logger.debug("Сохранение последовательности отменено")
+                return
+
+            self.render_sequence(animation_manager, file_path, fps, duration)
+            self.logger.info(f"Последовательность кадров успешно сохранена в {os.path.dirname(file_path)}")
         except Exception as e:
-            self.logger.error(f"Ошибка при экспорте анимации: {e}")
+            self.logger.error(f"Ошибка при экспорте последовательности: {e}")
+
+    def render_sequence(self, animation_manager, file_path, fps, duration):
+        """Запись последовательности кадров с продолжением прерванного экспорта.
+
+        Рядом с кадрами сохраняется файл .sequence.json с зерном симуляции и заливки
+        и хэшем всех параметров рендера и симуляции. При повторном запуске с теми же
+        параметрами движение воспроизводится заново, а растеризация и запись уже
+        готовых кадров пропускаются; если изменился хоть один параметр, экспорт
+        начинается сначала и готовые кадры перезаписываются.
+        """
+        self._match_animation_size(animation_manager)
+        sidecar_path = os.path.splitext(file_path)[0] + ".sequence.json"
+        settings = {
+            "fps": fps,
+            "duration": duration,
+            "format": os.path.splitext(file_path)[1].lstrip(".").lower(),
+            "keyframe_interval": self.config.get_int("Export", "keyframe_interval"),
+            "render": self.render_settings(),
+            "simulation": animation_manager.simulation_settings()
+        }
+        state = {
+            "fps": fps,
+            "duration": duration,
+            "width": self.frame_width,
+            "height": self.frame_height,
+            "points_amount": animation_manager.points_amount,
+            "settings_hash": hashlib.sha1(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()
+        }
+        previous = None
+        if os.path.exists(sidecar_path):
+            with open(sidecar_path, encoding="utf-8") as sidecar:
+                previous = json.load(sidecar)
+        resume = bool(previous) and all(previous.get(key) == value for key, value in state.items())
+        if resume:
+            self.logger.info("Продолжение прерванного экспорта последовательности")
+            state.update(seed=previous["seed"], fill_salt=previous["fill_salt"])
+        else:
+            if previous:
+                self.logger.info("Параметры экспорта изменились, последовательность записывается заново")
+            state.update(seed=self._random_seed(), fill_salt=self.fill_salt)
+            tmp_path = sidecar_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as sidecar:
+                json.dump(state, sidecar, indent=2)
+            os.replace(tmp_path, sidecar_path)
+
+        self.fill_salt = state["fill_salt"]
+        animation_manager.reset(state["seed"])
+        total_frames = int(fps * duration)
+        writer = self._open_writer(file_path, fps, total_frames, resume=resume)
+        self._write_frames(self._simulate(animation_manager, total_frames), writer, total_frames)
+
+    def _simulate(self, animation_manager, total_frames):
+        """Генератор геометрии кадров анимации.
+
+        По умолчанию (keyframe_interval = 1) каждый кадр триангулируется заново. При
+        keyframe_interval > 1 полная триангуляция выполняется на опорных кадрах, а
+        промежуточные переиспользуют треугольники, пока те не вывернутся.
+        """
+        keyframe_interval = max(1, self.config.get_int("Export", "keyframe_interval"))
+        for frame_idx in range(total_frames):
+            animation_manager.update_frame(keyframe=frame_idx % keyframe_interval == 0)
+            yield animation_manager.get_frame()
+
+    def record_trajectory(self, animation_manager, fps, duration):
+        """Запись траектории анимации в файл без растеризации."""
+        self.logger.info("Запись траектории")
+        try:
+            if fps <= 0 or duration <= 0:
+                self.logger.error("Частота кадров и длительность должны быть больше 0")
+                return
+
+            file_path = self._ask_save_path("Сохранить траекторию", ["BB28 Trajectory (*.bbtraj)"], "bbtraj")
+            if not file_path:
+                self.logger.debug("Запись траектории отменена")
+                return
+            animation_manager.record_trajectory(file_path, fps, duration)
+        except Exception as e:
+            self.logger.error(f"Ошибка при записи траектории: {e}")
+
+    def export_trajectory(self):
+        """Экспорт видео по ранее записанной траектории (только растеризация)."""
+        self.logger.info("Экспорт анимации из траектории")
+        try:
+            from PySide6.QtWidgets import QFileDialog
+            file_dialog = QFileDialog(self.canvas)
+            file_dialog.setFileMode(QFileDialog.FileMode.ExistingFile)
+            file_dialog.setNameFilters(["BB28 Trajectory (*.bbtraj)"])
+            file_dialog.setWindowTitle("Открыть траекторию")
+            if not file_dialog.exec():
+                self.logger.debug("Выбор траектории отменен")
+                return
+            trajectory_path = file_dialog.selectedFiles()[0]
+
+            file_path = self._ask_save_path("Сохранить анимацию", ["MP4 Video (*.mp4)"], "mp4")
+            if not file_path:
+                self.logger.debug("Сохранение анимации отменено")
+                return
+
+            self.render_trajectory(trajectory_path, file_path)
+        except Exception as e:
+            self.logger.error(f"Ошибка при экспорте траектории: {e}")
+
+    def render_trajectory(self, trajectory_path, file_path, start=0, stop=None):
+        """Растеризация диапазона кадров траектории в видеофайл."""
+        trajectory = TrajectoryReader(trajectory_path)
+        stop = len(trajectory) if stop is None else min(stop, len(trajectory))
+        # Траектория может быть записана в другом разрешении
+        scale = np.array([self.frame_width / trajectory.width, self.frame_height / trajectory.height],
+                         dtype=np.float32)
+
+        def frames():
+            for triangles in trajectory.iter_frames(start, stop):
+                yield {'vertices': triangles['vertices'] * scale, 'triangles': triangles['triangles']}
+
+        writer = self._open_writer(file_path, trajectory.fps, stop - start)
+        self._write_frames(frames(), writer, stop - start)
+        self.logger.info(f"Анимация из траектории {trajectory_path} сохранена в {file_path}")
+
+    def _ask_save_path(self, title, name_filters, default_suffix):
+        """Диалог выбора пути сохранения. Возвращает None при отмене."""
+        from PySide6.QtWidgets import QFileDialog
+        file_dialog = QFileDialog(self.canvas)
+        file_dialog.setAcceptMode(QFileDialog.AcceptMode.AcceptSave)
+        file_dialog.setNameFilters(name_filters)
+        file_dialog.setDefaultSuffix(default_suffix)
+        file_dialog.setWindowTitle(title)
+        if not file_dialog.exec():
+            return None
+        return file_dialog.selectedFiles()[0]
+
+    def _check_frame_size(self, writer, frame):
+        """Кадр должен совпадать по размеру с тем, под который открыт writer: иначе кодировщик испортит вывод."""
+        if (frame.shape[1], frame.shape[0]) != tuple(writer.size):
+            raise ValueError(f"Размер кадра {frame.shape[1]}x{frame.shape[0]} не совпадает "
+                             f"с размером вывода {writer.size[0]}x{writer.size[1]}")
+
+    def _match_animation_size(self, animation_manager):
+        """Разрешение рендера по симуляции: геометрия и вывод одного размера."""
+        if (self.frame_width, self.frame_height) != (animation_manager.frame_width, animation_manager.frame_height):
+            self.logger.warning(f"Разрешение рендера {self.frame_width}x{self.frame_height} приведено к разрешению "
+                                f"симуляции {animation_manager.frame_width}x{animation_manager.frame_height}")
+            self.set_frame_size(animation_manager.frame_width, animation_manager.frame_height)
+
+    def _write_frames(self, frames, writer, total_frames):
+        """Растеризация последовательности кадров и передача их в writer."""
+        try:
+            for frame_idx, triangles in enumerate(frames):
+                if writer.has_frame(frame_idx):
+                    self.logger.debug(f"Кадр {frame_idx + 1}/{total_frames} уже записан, пропуск")
+                    continue
+                self.logger.debug(f"Генерация кадра {frame_idx + 1}/{total_frames}")
+                if writer.vector:
+                    self.triangles = triangles
+                    writer.write(self.vector_scene(triangles), frame_idx)
+                elif writer.indexed:
+                    self.render_indexed(triangles)
+                    self._check_frame_size(writer, self.index_buffer)
+                    writer.write(self.index_buffer, frame_idx)
+                else:
+                    self.render_frame(triangles)
+                    self._check_frame_size(writer, self.buffer)
+                    writer.write(self.buffer, frame_idx)
+        finally:
+            # Освобождаем ресурсы
+            writer.close()
+
+    def set_frame_size(self, width, height):
+        """Смена разрешения кадра. Буфер нового размера берется из пула при следующей отрисовке.
+
+        Текущий кадр не перерисовывается: его геометрия построена для прежнего размера.
+        """
+        if (width, height) == (self.frame_width, self.frame_height):
+            return
+        self.logger.debug(f"Смена разрешения кадра: {self.frame_width}x{self.frame_height} -> {width}x{height}")
+        self.frame_width = width
+        self.frame_height = height
+        self.triangles = None
+
+    def set_width(self, value):
+        self.logger.debug(f"Установка ширины: {value}")
+        try:
+            value = int(value)
+            min_value = self.config.get_int("ImageParams", "width_min")
+            max_value = self.config.get_int("ImageParams", "width_max")
+            if not (min_value <= value <= max_value):
+                raise ValueError(f"Ширина должна быть в диапазоне [{min_value}, {max_value}]")
+            self.set_frame_size(value, self.frame_height)
+        except (ValueError, TypeError) as e:
+            self.logger.error(f"Некорректное значение ширины: {value}, ошибка: {e}")
+
+    def set_height(self, value):
+        self.logger.debug(f"Установка высоты: {value}")
+        try:
+            value = int(value)
+            min_value = self.config.get_int("ImageParams", "height_min")
+            max_value = self.config.get_int("ImageParams", "height_max")
+            if not (min_value <= value <= max_value):
+                raise ValueError(f"Высота должна быть в диапазоне [{min_value}, {max_value}]")
+            self.set_frame_size(self.frame_width, value)
+        except (ValueError, TypeError) as e:
+            self.logger.error(f"Некорректное значение высоты: {value}, ошибка: {e}")
 
     def set_points_check(self, flag):
         self.logger.debug(f"Установка флага отображения точек {flag}")
         self.points_check = flag
-        self.render_frame(self.triangles)
+        self._redraw()
 
     def set_points_size(self, value):
         self.logger.debug(f"Установка размера точек: {value}")
         self.points_size = value
-        self.render_frame(self.triangles)
+        self._redraw()
 
     def set_lines_check(self, flag):
         self.logger.debug(f"Установка флага отображения линий {flag}")
         self.lines_check = flag
-        self.render_frame(self.triangles)
+        self._redraw()
 
     def set_lines_width(self, value):
         self.logger.debug(f"Установка ширины линий: {value}")
         self.lines_width = value
-        self.render_frame(self.triangles)
+        self._redraw()
 
     def set_fill_check(self, flag):
         self.logger.debug(f"Установка флага отображения заливки {flag}")
         self.fill_check = flag
-        self.render_frame(self.triangles)
+        self._redraw()
 
     def set_fill_variation(self, value):
         self.logger.debug(f"Установка разброса яркости заливки: {value}")
         self.fill_variation = value
-        # Перегенерируем яркость для всех треугольников при изменении разброса
-        for triangle_key in self.triangle_brightness:
-            base_brightness = self.hsv_color["v"]
-            variation = self.fill_variation
-            self.triangle_brightness[triangle_key] = random.uniform(
-                max(0, base_brightness - variation),
-                min(100, base_brightness + variation)
-            )
-        self.render_frame(self.triangles)
+        # Перегенерируем яркость треугольников новым зерном
+        self.fill_salt = self._random_seed()
+        self._redraw()
 
     def set_hue(self, value):
         self.logger.debug(f"Установка оттенка основного цвета: {value}")
         self.hsv_color["h"] = value
-        self.rgb_color = hsv_to_rgb(self.hsv_color["h"], self.hsv_color["s"], self.hsv_color["v"])
-        self.render_frame(self.triangles)
+        self._update_shade_lut()
+        self._redraw()
 
     def set_saturation(self, value):
         self.logger.debug(f"Установка насыщенности основного цвета: {value}")
         self.hsv_color["s"] = value
-        self.rgb_color = hsv_to_rgb(self.hsv_color["h"], self.hsv_color["s"], self.hsv_color["v"])
-        self.render_frame(self.triangles)
+        self._update_shade_lut()
+        self._redraw()
 
     def set_brightness(self, value):
         self.logger.debug(f"Установка яркости основного цвета: {value}")
         self.hsv_color["v"] = value
-        self.rgb_color = hsv_to_rgb(self.hsv_color["h"], self.hsv_color["s"], self.hsv_color["v"])
-        # Обновляем яркость треугольников с учетом нового базового значения
-        for triangle_key in self.triangle_brightness:
-            base_brightness = self.hsv_color["v"]
-            variation = self.fill_variation
-            self.triangle_brightness[triangle_key] = random.uniform(
-                max(0, base_brightness - variation),
-                min(100, base_brightness + variation)
-            )
-        self.render_frame(self.triangles)
+        # Таблица не зависит от яркости: основной цвет берется из нее же
+        self.rgb_color = self._shade_color(value)
+        # Перегенерируем яркость треугольников новым зерном
+        self.fill_salt = self._random_seed()
+        self._redraw()
 
     def set_bg_hue(self, value):
         self.logger.debug(f"Установка оттенка цвета фона: {value}")
         self.hsv_bg_color["h"] = value
         self.rgb_bg_color = hsv_to_rgb(self.hsv_bg_color["h"], self.hsv_bg_color["s"], self.hsv_bg_color["v"])
-        self.render_frame(self.triangles)
+        self._redraw()
 
     def set_bg_saturation(self, value):
         self.logger.debug(f"Установка насыщенности цвета фона: {value}")
         self.hsv_bg_color["s"] = value
         self.rgb_bg_color = hsv_to_rgb(self.hsv_bg_color["h"], self.hsv_bg_color["s"], self.hsv_bg_color["v"])
-        self.render_frame(self.triangles)
+        self._redraw()
 
     def set_bg_brightness(self, value):
         self.logger.debug(f"Установка яркости цвета фона: {value}")
         self.hsv_bg_color["v"] = value
         self.rgb_bg_color = hsv_to_rgb(self.hsv_bg_color["h"], self.hsv_bg_color["s"], self.hsv_bg_color["v"])
-        self.render_frame(self.triangles)
+        self._redraw()
 
     def set_color(self, h, s, v):
         self.logger.debug(f"Установка основного цвета: {h=} {s=} {v=}")
         self.hsv_color = {"h": h, "s": s, "v": v}
-        self.rgb_color = hsv_to_rgb(h, s, v)
-        # Обновляем яркость треугольников с учетом нового базового значения
-        for triangle_key in self.triangle_brightness:
-            base_brightness = self.hsv_color["v"]
-            variation = self.fill_variation
-            self.triangle_brightness[triangle_key] = random.uniform(
-                max(0, base_brightness - variation),
-                min(100, base_brightness + variation)
-            )
-        self.render_frame(self.triangles)
+        self._update_shade_lut()
+        # Перегенерируем яркость треугольников новым зерном
+        self.fill_salt = self._random_seed()
+        self._redraw()
 
     def set_bg_color(self, h, s, v):
         self.logger.debug(f"Установка цвета фона: {h=} {s=} {v=}")
         self.hsv_bg_color = {"h": h, "s": s, "v": v}
         self.rgb_bg_color = hsv_to_rgb(h, s, v)
-        self.render_frame(self.triangles)
-
-    def __del__(self):
-        """Очистка Pygame при уничтожении объекта."""
-        pygame.quit()
\ No newline at end of file
+        self._redraw()
@@ -0,0 +1,272 @@
+import heapq
+import itertools
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from loguru import logger
+from modules.batch_manager import BatchManager, _init_worker, _run_job, job_name
+
+
+class RenderService:
+    """Очередь заданий рендеринга на пуле заранее прогретых рабочих процессов.
+
+    Задание: {"params": {...}, "seed": 0, "outputs": ["png"], "priority": 0, "name": "..."}.
+    Задания с большим priority запускаются раньше, при равном приоритете — в порядке поступления.
+    Повторная постановка задания, совпадающего с ожидающим или выполняющимся (те же параметры,
+    зерно и форматы), не создает нового: возвращается состояние уже существующего.
+    Рабочие процессы живут все время работы службы и переиспользуют менеджеры
+    анимации и рендеринга, поэтому задание не платит за импорты и инициализацию.
+    """
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CANCELLED = "cancelled"
+
+    def __init__(self, config_manager, config_path="config.ini", output_dir="render_output", workers=None,
+                 log_level="INFO"):
+        numeric_log_level = logger.level(log_level).no if isinstance(log_level, str) else log_level
+        self.logger = logger.bind(module_level=numeric_log_level)
+        self.config = config_manager
+        self.config_path = config_path
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.jobs = {}
+        self.pending = []  # Куча (-priority, номер, id)
+        self.counter = itertools.count()
+        self.lock = threading.Condition()
+        self.slots = threading.Semaphore(self.workers)
+        self.executor = None
+        self.progress_queue = None
+        self.running = False
+
+    def start(self):
+        """Запуск пула рабочих процессов и потоков диспетчеризации."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.progress_queue = multiprocessing.Queue()
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                            initargs=(self.config_path, self.progress_queue))
+        # Прогрев: каждый процесс пула запускается и импортирует модули до первого задания
+        for future in [self.executor.submit(time.sleep, 0.1) for _ in range(self.workers)]:
+            future.result()
+        self.running = True
+        threading.Thread(target=self._dispatch, daemon=True).start()
+        threading.Thread(target=self._track_progress, daemon=True).start()
+        self.logger.info(f"Служба рендеринга запущена: {self.workers} рабочих процессов, вывод в {self.output_dir}")
+
+    def stop(self):
+        """Остановка службы: задания в очереди и еще не начатые в пуле отменяются."""
+        with self.lock:
+            self.running = False
+            for job in self.jobs.values():
+                if job["status"] == self.STATUS_QUEUED:
+                    job["status"] = self.STATUS_CANCELLED
+            self.lock.notify_all()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+        if self.progress_queue is not None:
+            self.progress_queue.put(None)
+        self.logger.info("Служба рендеринга остановлена")
+
+    def submit(self, description):
+        """Постановка задания в очередь. Возвращает его состояние."""
+        params = description.get("params", {})
+        seed = description.get("seed", 0)
+        outputs = description.get("outputs", ["png"])
+        priority = int(description.get("priority", 0))
+        for output in outputs:
+            if output not in BatchManager.IMAGE_OUTPUTS + BatchManager.VIDEO_OUTPUTS:
+                raise ValueError(f"Неподдерживаемый формат вывода: {output}")
+        # Проверка параметров до постановки в очередь
+        self.config.with_overrides(params)
+
+        name = job_name(description.get("name", "job"), params, seed)
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            "id": job_id,
+            "name": name,
+            "params": params,
+            "seed": seed,
+            "outputs": outputs,
+            "priority": priority,
+            "status": self.STATUS_QUEUED,
+            "progress": 0.0,
+            "submitted": time.time(),
+            "files": [],
+            "error": None
+        }
+        with self.lock:
+            active = self._find_active(name, outputs)
+            if active is not None:
+                if active["status"] == self.STATUS_QUEUED and priority > active["priority"]:
+                    # Прежняя запись в куче будет пропущена: к ее очереди задание уже запущено
+                    active["priority"] = priority
+                    heapq.heappush(self.pending, (-priority, next(self.counter), active["id"]))
+                    self.lock.notify()
+                self.logger.debug(f"Задание {name} уже в работе ({active['id']}), повтор не ставится")
+                return dict(active)
+            self.jobs[job_id] = job
+            heapq.heappush(self.pending, (-priority, next(self.counter), job_id))
+            self.lock.notify()
+        self.logger.debug(f"Задание {job_id} ({job['name']}) в очереди, приоритет {priority}")
+        return self.get(job_id)
+
+    def _find_active(self, name, outputs):
+        """Ожидающее или выполняющееся задание с тем же именем и форматами (вызывать под lock)."""
+        for job in self.jobs.values():
+            if job["name"] == name and job["outputs"] == outputs and \
+                    job["status"] in (self.STATUS_QUEUED, self.STATUS_RUNNING):
+                return job
+        return None
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def list_jobs(self):
+        with self.lock:
+            return [dict(job) for job in self.jobs.values()]
+
+    def cancel(self, job_id):
+        """Отмена задания, которое еще не запущено."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job["status"] != self.STATUS_QUEUED:
+                return False
+            job["status"] = self.STATUS_CANCELLED
+            return True
+
+    def _dispatch(self):
+        """Передача заданий в пул по приоритету, не больше одного задания на процесс.
+
+        Задания держатся в своей очереди до освобождения процесса, поэтому
+        позднее поступившее срочное задание обгоняет уже ожидающие. Передача в пул
+        идет под lock: stop() снимает флаг running под тем же lock до закрытия пула,
+        поэтому после остановки задание в пул не попадет.
+        """
+        while True:
+            self.slots.acquire()
+            with self.lock:
+                while self.running and not self.pending:
+                    self.lock.wait()
+                if not self.running:
+                    return
+                _, _, job_id = heapq.heappop(self.pending)
+                job = self.jobs[job_id]
+                if job["status"] != self.STATUS_QUEUED:
+                    self.slots.release()
+                    continue
+                task = {key: job[key] for key in ("id", "name", "params", "seed", "outputs")}
+                try:
+                    future = self.executor.submit(_run_job, task, self.output_dir)
+                except RuntimeError as e:
+                    # Пул закрыт в обход stop() (например, упал рабочий процесс)
+                    self.slots.release()
+                    job.update(status=self.STATUS_CANCELLED, error=str(e))
+                    self.logger.error(f"Задание {job_id} ({job['name']}) не передано в пул: {e}")
+                    continue
+                job["status"] = self.STATUS_RUNNING
+                job["started"] = time.time()
+            future.add_done_callback(lambda future, job_id=job_id: self._finish(job_id, future))
+
+    def _finish(self, job_id, future):
+        self.slots.release()
+        with self.lock:
+            job = self.jobs[job_id]
+            job["finished"] = time.time()
+            try:
+                record = future.result()
+                job.update(status=self.STATUS_DONE, progress=1.0, files=record["outputs"],
+                           elapsed=record["elapsed"], mesh=record["mesh"])
+                self.logger.info(f"Задание {job_id} ({job['name']}) готово за {record['elapsed']} с")
+            except CancelledError:
+                # Отменено при остановке службы до начала выполнения
+                job["status"] = self.STATUS_CANCELLED
+                self.logger.debug(f"Задание {job_id} ({job['name']}) отменено при остановке")
+            except Exception as e:
+                job.update(status=self.STATUS_FAILED, error=str(e))
+                self.logger.error(f"Ошибка в задании {job_id} ({job['name']}): {e}")
+
+    def _track_progress(self):
+        """Прием сообщений о ходе выполнения от рабочих процессов."""
+        while True:
+            message = self.progress_queue.get()
+            if message is None:
+                return
+            job_id, done, total = message
+            with self.lock:
+                job = self.jobs.get(job_id)
+                if job is not None and job["status"] == self.STATUS_RUNNING:
+                    job["progress"] = round(done / total, 3) if total else 1.0
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """HTTP API службы:
+        POST   /jobs       — постановка задания (тело — JSON описания задания)
+        GET    /jobs       — состояние всех заданий
+        GET    /jobs/<id>  — состояние задания
+        DELETE /jobs/<id>  — отмена задания в очереди
+    """
+    service = None
+
+    def log_message(self, format, *args):
+        self.service.logger.debug(f"{self.address_string()} {format % args}")
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _job_id(self):
+        parts = self.path.strip("/").split("/")
+        if parts[0] != "jobs" or len(parts) > 2:
+            return None, False
+        return (parts[1] if len(parts) == 2 else None), True
+
+    def do_GET(self):
+        job_id, valid = self._job_id()
+        if not valid:
+            self._send(404, {"error": "not found"})
+        elif job_id is None:
+            self._send(200, self.service.list_jobs())
+        else:
+            job = self.service.get(job_id)
+            self._send(200, job) if job is not None else self._send(404, {"error": "unknown job"})
+
+    def do_POST(self):
+        job_id, valid = self._job_id()
+        if not valid or job_id is not None:
+            self._send(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            description = json.loads(self.rfile.read(length) or b"{}")
+            self._send(202, self.service.submit(description))
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(400, {"error": str(e)})
+
+    def do_DELETE(self):
+        job_id, valid = self._job_id()
+        if not valid or job_id is None:
+            self._send(404, {"error": "not found"})
+        elif self.service.cancel(job_id):
+            self._send(200, self.service.get(job_id))
+        else:
+            self._send(409, {"error": "job is not queued"})
+
+
+def serve(service, host="127.0.0.1", port=8765):
+    """HTTP-сервер службы рендеринга (только локальный интерфейс по умолчанию)."""
+    handler = type("RequestHandler", (_RequestHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    service.logger.info(f"Прием заданий на http://{host}:{server.server_address[1]}/jobs")
+    return server
@@ -0,0 +1,48 @@
+from collections import OrderedDict
+import numpy as np
+from loguru import logger
+
+
+class RenderTargetPool:
+    """Небольшой LRU-пул буферов кадра по разрешениям.
+
+    Буфер RGB выдается вместе с Pygame Surface поверх той же памяти, буфер
+    индексов палитры — без поверхности. При переключении между недавними
+    разрешениями (предпросмотр и экспорт) буферы не выделяются заново; сверх
+    capacity вытесняется давно не использованный. Пул принадлежит одному
+    рендереру: буфер одного размера выдается повторно, а не копируется.
+    """
+
+    def __init__(self, capacity=3, log_level="ERROR"):
+        numeric_log_level = logger.level(log_level).no if isinstance(log_level, str) else log_level
+        self.logger = logger.bind(module_level=numeric_log_level)
+        self.capacity = max(1, int(capacity))
+        self.targets = OrderedDict()  # (ширина, высота, каналы) -> (буфер, поверхность)
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self, width, height, channels=3):
+        """Буфер (height, width, 3) и Surface для channels=3 или буфер (height, width) и None для channels=1."""
+        key = (int(width), int(height), channels)
+        target = self.targets.get(key)
+        if target is not None:
+            self.targets.move_to_end(key)
+            self.hits += 1
+            return target
+        self.misses += 1
+        self.logger.debug(f"Выделение буфера кадра {width}x{height}x{channels}")
+        if channels == 3:
+            import pygame
+            buffer = np.zeros((key[1], key[0], 3), dtype=np.uint8)
+            target = (buffer, pygame.image.frombuffer(buffer, (key[0], key[1]), "RGB"))
+        else:
+            target = (np.zeros((key[1], key[0]), dtype=np.uint8), None)
+        self.targets[key] = target
+        while len(self.targets) > self.capacity:
+            evicted, _ = self.targets.popitem(last=False)
+            self.logger.debug(f"Освобождение буфера кадра {evicted[0]}x{evicted[1]}x{evicted[2]}")
+        return target
+
+    def nbytes(self):
+        """Память всех буферов пула."""
+        return sum(buffer.nbytes for buffer, _ in self.targets.values())
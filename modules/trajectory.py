@@ -0,0 +1,140 @@
+import os
+import shutil
+import struct
+import numpy as np
+from loguru import logger
+
+# Формат файла траектории:
+#   заголовок (64 байта): сигнатура, версия, число кадров, ширина, высота, fps,
+#                         общее число вершин и треугольников
+#   таблица смещений: int64 (frames + 1, 2) — начало вершин и треугольников каждого кадра
+#   вершины:          float32 (vertices_total, 2)
+#   треугольники:     int32 (triangles_total, 3), индексы локальны для кадра
+TRAJECTORY_MAGIC = b"BB28TRJ\x01"
+TRAJECTORY_VERSION = 1
+HEADER_FORMAT = "<8sIIIIIQQ"
+HEADER_SIZE = 64
+
+
+class TrajectoryWriter:
+    def __init__(self, file_path, width, height, fps, log_level="ERROR"):
+        numeric_log_level = logger.level(log_level).no if isinstance(log_level, str) else log_level
+        self.logger = logger.bind(module_level=numeric_log_level)
+        self.file_path = file_path
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.offsets = [(0, 0)]
+        self.vertices_path = file_path + ".vtx.tmp"
+        self.triangles_path = file_path + ".tri.tmp"
+        self.vertices_file = open(self.vertices_path, "wb")
+        self.triangles_file = open(self.triangles_path, "wb")
+
+    def append(self, triangles):
+        """Запись геометрии одного кадра."""
+        vertices = np.ascontiguousarray(triangles['vertices'], dtype=np.float32).reshape(-1, 2)
+        indices = np.ascontiguousarray(triangles['triangles'], dtype=np.int32).reshape(-1, 3)
+        self.vertices_file.write(vertices.tobytes())
+        self.triangles_file.write(indices.tobytes())
+        vertex_start, triangle_start = self.offsets[-1]
+        self.offsets.append((vertex_start + len(vertices), triangle_start + len(indices)))
+
+    def abort(self):
+        """Отказ от записи: временные блоки удаляются, итоговый файл не создается."""
+        self.vertices_file.close()
+        self.triangles_file.close()
+        for block_path in (self.vertices_path, self.triangles_path):
+            if os.path.exists(block_path):
+                os.remove(block_path)
+        self.logger.warning(f"Запись траектории {self.file_path} прервана")
+
+    def close(self):
+        """Сборка итогового файла из заголовка, таблицы смещений и блоков геометрии."""
+        self.vertices_file.close()
+        self.triangles_file.close()
+        frames = len(self.offsets) - 1
+        vertices_total, triangles_total = self.offsets[-1]
+        header = struct.pack(HEADER_FORMAT, TRAJECTORY_MAGIC, TRAJECTORY_VERSION, frames,
+                             self.width, self.height, self.fps, vertices_total, triangles_total)
+        try:
+            with open(self.file_path, "wb") as output:
+                output.write(header.ljust(HEADER_SIZE, b"\0"))
+                output.write(np.array(self.offsets, dtype=np.int64).tobytes())
+                for block_path in (self.vertices_path, self.triangles_path):
+                    with open(block_path, "rb") as block:
+                        shutil.copyfileobj(block, output)
+        finally:
+            os.remove(self.vertices_path)
+            os.remove(self.triangles_path)
+        self.logger.info(f"Траектория из {frames} кадров записана в {self.file_path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Прерванный прогон не собирается: усеченный файл выглядел бы как полноценная траектория
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+class TrajectoryReader:
+    def __init__(self, file_path, log_level="ERROR"):
+        numeric_log_level = logger.level(log_level).no if isinstance(log_level, str) else log_level
+        self.logger = logger.bind(module_level=numeric_log_level)
+        self.file_path = file_path
+        with open(file_path, "rb") as file:
+            header = file.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise ValueError(f"Файл {file_path} слишком короткий для траектории")
+        magic, version, frames, width, height, fps, vertices_total, triangles_total = struct.unpack(
+            HEADER_FORMAT, header[:struct.calcsize(HEADER_FORMAT)])
+        if magic != TRAJECTORY_MAGIC or version != TRAJECTORY_VERSION:
+            raise ValueError(f"Файл {file_path} не является траекторией поддерживаемой версии")
+        self.frames = frames
+        self.width = width
+        self.height = height
+        self.fps = fps
+
+        if frames == 0:
+            # Пустую траекторию нечего отображать: memmap нулевой длины не создается
+            self.offsets = np.zeros((1, 2), dtype=np.int64)
+            self.vertices = np.empty((0, 2), dtype=np.float32)
+            self.triangles = np.empty((0, 3), dtype=np.int32)
+            self.logger.debug(f"Открыта пустая траектория {file_path}")
+            return
+
+        # Все блоки открываются через memmap, поэтому файл можно читать из нескольких процессов
+        offset = HEADER_SIZE
+        self.offsets = np.memmap(file_path, dtype=np.int64, mode="r", offset=offset, shape=(frames + 1, 2))
+        offset += self.offsets.nbytes
+        self.vertices = np.memmap(file_path, dtype=np.float32, mode="r", offset=offset,
+                                  shape=(max(vertices_total, 1), 2))
+        offset += vertices_total * 2 * 4
+        self.triangles = np.memmap(file_path, dtype=np.int32, mode="r", offset=offset,
+                                   shape=(max(triangles_total, 1), 3))
+        self.logger.debug(f"Открыта траектория {file_path}: {frames} кадров {width}x{height}")
+
+    def __len__(self):
+        return self.frames
+
+    def get_frame(self, index):
+        """Геометрия кадра в формате AnimationManager.get_frame()."""
+        if not 0 <= index < self.frames:
+            raise IndexError(f"Кадр {index} вне диапазона [0, {self.frames})")
+        vertex_start, triangle_start = self.offsets[index]
+        vertex_end, triangle_end = self.offsets[index + 1]
+        return {
+            'vertices': self.vertices[vertex_start:vertex_end],
+            'triangles': self.triangles[triangle_start:triangle_end]
+        }
+
+    def iter_frames(self, start=0, stop=None):
+        """Итерация по диапазону кадров (для распределения рендера между процессами)."""
+        stop = self.frames if stop is None else min(stop, self.frames)
+        for index in range(start, stop):
+            yield self.get_frame(index)
+
+    def __iter__(self):
+        return self.iter_frames()
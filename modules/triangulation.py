@@ -0,0 +1,195 @@
+import time
+import numpy as np
+from loguru import logger
+from modules.hole_mask import interior_point, points_in_polygon
+
+
+class TriangulationError(RuntimeError):
+    """Движок не смог построить триангуляцию сцены."""
+
+
+class TriangulationBackend:
+    """Движок триангуляции.
+
+    Сцена: points (N, 2), segments (S, 2) — обязательные ребра границ,
+    hole_loops — список массивов индексов вершин контуров пустых областей.
+    Результат — словарь в формате triangle: 'vertices', 'triangles' и, по запросу, 'edges'.
+    constrained — движок соблюдает обязательные ребра (контуры пустых областей).
+    """
+    name = None
+    constrained = True
+
+    @classmethod
+    def available(cls):
+        return True
+
+    def triangulate(self, points, segments, hole_loops, edges=False):
+        raise NotImplementedError
+
+
+class TriangleBackend(TriangulationBackend):
+    """Ограниченная триангуляция Делоне (Shewchuk's triangle) с ребрами границ и дырами."""
+    name = "triangle"
+
+    @classmethod
+    def available(cls):
+        try:
+            import triangle  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def triangulate(self, points, segments, hole_loops, edges=False):
+        import triangle
+        tri_input = {'vertices': points, 'segments': np.asarray(segments)}
+        if hole_loops:
+            # Затравка дыры должна лежать внутри контура, в том числе невыпуклого (области из масок)
+            tri_input['holes'] = np.array([interior_point(points[loop]) for loop in hole_loops])
+        result = triangle.triangulate(tri_input, 'pe' if edges else 'p')
+        if len(result.get('triangles', ())) == 0:
+            raise TriangulationError("triangle вернул пустую триангуляцию")
+        return result
+
+
+class ScipyDelaunayBackend(TriangulationBackend):
+    """Неограниченная триангуляция Делоне (Qhull) с отбрасыванием треугольников в дырах.
+
+    Ребра контуров пустых областей не гарантируются: треугольник удаляется,
+    если его центр тяжести попал внутрь области. Ребра сетки по запросу
+    строятся из треугольников.
+    """
+    name = "scipy"
+    constrained = False
+
+    @classmethod
+    def available(cls):
+        try:
+            from scipy.spatial import Delaunay  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def triangulate(self, points, segments, hole_loops, edges=False):
+        from scipy.spatial import Delaunay, QhullError
+        try:
+            simplices = Delaunay(points).simplices
+        except QhullError as e:
+            raise TriangulationError(f"Qhull: {e}") from e
+        if hole_loops:
+            centroids = points[simplices].mean(axis=1)
+            inside = np.zeros(len(simplices), dtype=bool)
+            for loop in hole_loops:
+                inside |= points_in_polygon(centroids, points[loop])
+            simplices = simplices[~inside]
+        if len(simplices) == 0:
+            raise TriangulationError("Qhull вернул пустую триангуляцию")
+        # Копия, как у triangle: симуляция меняет свои точки на месте, а кадр уже мог уйти в отрисовку
+        result = {'vertices': np.array(points, dtype=np.float64, copy=True),
+                  'triangles': simplices.astype(np.int32)}
+        if edges:
+            pairs = np.concatenate([simplices[:, [0, 1]], simplices[:, [1, 2]], simplices[:, [2, 0]]])
+            pairs.sort(axis=1)
+            result['edges'] = np.unique(pairs, axis=0).astype(np.int32)
+        return result
+
+
+# Реестр движков в порядке предпочтения при откате; свой движок добавляется сюда же
+BACKENDS = {backend.name: backend for backend in (TriangleBackend, ScipyDelaunayBackend)}
+
+
+class Triangulator:
+    """Выбор движка для сцены и откат на другой движок при ошибке.
+
+    Движок, заданный по имени, пробуется первым, остальные — в порядке BACKENDS,
+    поэтому при одном зерне сетка одинакова на любой машине. Только в режиме auto
+    движок выбирается микробенчмарком на первой сцене данного класса (порядок
+    числа точек и наличие дыр); выбор зависит от скорости машины, поэтому он
+    пишется в журнал и доступен в selected. Для сцен с пустыми областями
+    в замер попадают только движки, соблюдающие контуры, а остальные идут в откате
+    последними: кадр без точных контуров лучше пустого кадра.
+    """
+    BENCHMARK_RUNS = 2
+
+    def __init__(self, preferred="triangle", log_level="ERROR"):
+        numeric_log_level = logger.level(log_level).no if isinstance(log_level, str) else log_level
+        self.logger = logger.bind(module_level=numeric_log_level)
+        if preferred != "auto" and preferred not in BACKENDS:
+            raise ValueError(f"Неизвестный движок триангуляции: {preferred}")
+        self.preferred = preferred
+        self.backends = {name: backend() for name, backend in BACKENDS.items() if backend.available()}
+        if not self.backends:
+            raise RuntimeError("Не найден ни один движок триангуляции")
+        self.selected = {}  # Класс сцены -> имя движка (режим auto)
+        self.warned = set()  # Движки, о неточности которых уже предупредили
+
+    def _scene_class(self, points, hole_loops):
+        return int(np.log2(max(len(points), 1))), bool(hole_loops)
+
+    def _candidates(self, hole_loops):
+        """Движки в порядке отката: при наличии дыр соблюдающие контуры идут первыми."""
+        if not hole_loops:
+            return list(self.backends)
+        return sorted(self.backends, key=lambda name: not self.backends[name].constrained)
+
+    def _benchmark_candidates(self, hole_loops):
+        """Движки для замера: при наличии дыр — только соблюдающие контуры, если такие есть."""
+        candidates = self._candidates(hole_loops)
+        if not hole_loops:
+            return candidates
+        return [name for name in candidates if self.backends[name].constrained] or candidates
+
+    def _benchmark(self, points, segments, hole_loops):
+        """Самый быстрый из движков, справившихся со сценой."""
+        timings = {}
+        for name in self._benchmark_candidates(hole_loops):
+            backend = self.backends[name]
+            try:
+                started = time.perf_counter()
+                for _ in range(self.BENCHMARK_RUNS):
+                    backend.triangulate(points, segments, hole_loops)
+                timings[name] = (time.perf_counter() - started) / self.BENCHMARK_RUNS
+            except Exception as e:
+                self.logger.warning(f"Движок {name} не справился со сценой при замере: {e}")
+        if not timings:
+            return self._benchmark_candidates(hole_loops)[0]
+        self.logger.debug("Замер движков триангуляции: " + ", ".join(
+            f"{name} {timing * 1000:.2f} мс" for name, timing in timings.items()))
+        return min(timings, key=timings.get)
+
+    def _order(self, points, segments, hole_loops):
+        """Движки в порядке попыток для сцены."""
+        candidates = self._candidates(hole_loops)
+        if self.preferred != "auto":
+            first = self.preferred
+            backend = self.backends.get(first)
+            if hole_loops and backend is not None and not backend.constrained and first not in self.warned:
+                self.warned.add(first)
+                self.logger.warning(f"Движок {first} не соблюдает контуры пустых областей")
+        else:
+            scene_class = self._scene_class(points, hole_loops)
+            if scene_class not in self.selected:
+                self.selected[scene_class] = self._benchmark(points, segments, hole_loops)
+                # Выбор по замеру зависит от машины: одно зерно может дать разные сетки
+                self.logger.info(f"Для сцены из {len(points)} точек по замеру выбран движок "
+                                 f"{self.selected[scene_class]}")
+            first = self.selected[scene_class]
+        return [first] + [name for name in candidates if name != first]
+
+    def triangulate(self, points, segments, hole_loops, edges=False):
+        """Триангуляция первым подходящим движком; TriangulationError, если не справился ни один."""
+        errors = []
+        for name in self._order(points, segments, hole_loops):
+            backend = self.backends.get(name)
+            if backend is None:
+                continue
+            try:
+                result = backend.triangulate(points, segments, hole_loops, edges)
+            except Exception as e:
+                self.logger.warning(f"Движок {name} не справился, переход к следующему: {e}")
+                errors.append(f"{name}: {e}")
+                continue
+            if errors and hole_loops and not backend.constrained:
+                self.logger.warning(f"Кадр построен запасным движком {name}: треугольники в пустых областях "
+                                    f"отброшены, но ребра контуров не гарантируются")
+            return result
+        raise TriangulationError("; ".join(errors) or "нет доступных движков")
@@ -275,11 +275,22 @@ class MainUI(QWidget):
         self.export_frame_btn = QPushButton("Экспорт кадра")
         self.start_animation_btn = QPushButton("Старт анимации")
         self.export_animation_btn = QPushButton("Экспорт анимации")
+        self.export_sequence_btn = QPushButton("Экспорт кадров")
+        self.export_outputs_btn = QPushButton("Экспорт комплекта")
+        self.record_trajectory_btn = QPushButton("Запись траектории")
+        self.export_trajectory_btn = QPushButton("Экспорт траектории")
 
         actions_layout.addWidget(self.generate_frame_btn, 0, 0)
         actions_layout.addWidget(self.export_frame_btn, 0, 1)
         actions_layout.addWidget(self.start_animation_btn, 1, 0)
         actions_layout.addWidget(self.export_animation_btn, 1, 1)
+        actions_layout.addWidget(self.export_sequence_btn, 2, 0)
+        actions_layout.addWidget(self.export_outputs_btn, 2, 1)
+        actions_layout.addWidget(self.record_trajectory_btn, 3, 0)
+        actions_layout.addWidget(self.export_trajectory_btn, 3, 1)
+
+        self.quality_label = QLabel("Качество предпросмотра: 100%")
+        actions_layout.addWidget(self.quality_label, 4, 0, 1, 2)
 
         actions_group.setLayout(actions_layout)
         control_layout.addWidget(actions_group)
@@ -1,4 +1,5 @@
 from loguru import logger
+import numpy as np
 import sys
 
 
@@ -55,4 +56,52 @@ def hsv_to_rgb(h, s, v):
 	g = int((g + m) * 255)
 	b = int((b + m) * 255)
 
-	return (r, g, b)
\ No newline at end of file
+	return (r, g, b)
+
+
+def hsv_to_rgb_array(h, s, v):
+	"""
+	Vectorized HSV to RGB conversion, same rounding as hsv_to_rgb.
+
+	Parameters:
+	h (float or array-like): Hue (0-360)
+	s (float or array-like): Saturation (0-100)
+	v (float or array-like): Value/Brightness (0-100)
+
+	Returns:
+	np.ndarray: uint8 array of shape (..., 3) in broadcast shape of the inputs
+	"""
+	h, s, v = np.broadcast_arrays(np.asarray(h, dtype=np.float64) % 360,
+	                              np.asarray(s, dtype=np.float64) / 100,
+	                              np.asarray(v, dtype=np.float64) / 100)
+	c = v * s
+	x = c * (1 - np.abs((h / 60) % 2 - 1))
+	m = v - c
+	zero = np.zeros_like(c)
+
+	sector = np.clip((h // 60).astype(np.int64), 0, 5)
+	r = np.choose(sector, [c, x, zero, zero, x, c])
+	g = np.choose(sector, [x, c, c, x, zero, zero])
+	b = np.choose(sector, [zero, zero, x, c, c, x])
+
+	# Scale to 0-255 range and truncate like int()
+	return ((np.stack([r, g, b], axis=-1) + m[..., None]) * 255).astype(np.uint8)
+
+
+def hash_to_unit(keys, salt=0):
+	"""
+	Deterministic pseudo-random values for integer keys (splitmix64 finalizer).
+
+	Parameters:
+	keys (array-like): Non-negative integer keys
+	salt (int): Seed mixed into every key
+
+	Returns:
+	np.ndarray: float64 values in range [0, 1), one per key
+	"""
+	with np.errstate(over='ignore'):
+		x = np.asarray(keys, dtype=np.uint64) + np.uint64(salt) * np.uint64(0x9E3779B97F4A7C15)
+		x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+		x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+		x = x ^ (x >> np.uint64(31))
+	return (x >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
@@ -0,0 +1,125 @@
+import io
+import os
+import zlib
+import numpy as np
+
+# Векторная сцена кадра:
+#   {"width", "height", "background": (r, g, b),
+#    "layers": [
+#        {"kind": "points", "color": (r, g, b), "size": диаметр, "points": (N, 2)},
+#        {"kind": "lines", "color": (r, g, b), "width": толщина, "segments": (E, 2, 2)},
+#        {"kind": "fill", "color": (r, g, b), "polygons": (T, 3, 2)}
+#    ]}
+# Слои идут в порядке отрисовки. Ребра уже дедуплицированы, заливка сгруппирована
+# по цвету, поэтому каждый слой записывается одним путем SVG или одной группой операторов PDF.
+VECTOR_EXTENSIONS = ("svg", "pdf")
+
+
+def _format_rows(rows, row_format):
+    """Форматирование строк массива координат одним вызовом (координаты с точностью 0.1)."""
+    if len(rows) == 0:
+        return ""
+    rows = np.round(np.asarray(rows, dtype=np.float64).reshape(len(rows), -1), 1) + 0.0  # + 0.0 убирает "-0"
+    buffer = io.StringIO()
+    np.savetxt(buffer, rows, fmt=row_format, delimiter="", newline="")
+    return buffer.getvalue()
+
+
+def _svg_color(color):
+    return "#{:02x}{:02x}{:02x}".format(*(int(c) for c in color))
+
+
+def svg_document(scene):
+    """Текст SVG для векторной сцены."""
+    width, height = scene["width"], scene["height"]
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">\n',
+        f'<rect width="{width}" height="{height}" fill="{_svg_color(scene["background"])}"/>\n'
+    ]
+    for layer in scene["layers"]:
+        color = _svg_color(layer["color"])
+        if layer["kind"] == "points":
+            # Точка — штрих нулевой длины со скругленными концами, диаметр равен толщине штриха
+            data = _format_rows(layer["points"], "M%g %gh0")
+            parts.append(f'<path fill="none" stroke="{color}" stroke-width="{layer["size"]}" '
+                         f'stroke-linecap="round" d="{data}"/>\n')
+        elif layer["kind"] == "lines":
+            data = _format_rows(layer["segments"], "M%g %gL%g %g")
+            parts.append(f'<path fill="none" stroke="{color}" stroke-width="{layer["width"]}" d="{data}"/>\n')
+        elif layer["kind"] == "fill":
+            data = _format_rows(layer["polygons"], "M%g %gL%g %gL%g %gZ")
+            parts.append(f'<path fill="{color}" d="{data}"/>\n')
+    parts.append("</svg>\n")
+    return "".join(parts)
+
+
+def _pdf_color(color, operator):
+    r, g, b = (int(c) / 255 for c in color)
+    return f"{r:.4g} {g:.4g} {b:.4g} {operator}\n"
+
+
+def pdf_document(scene):
+    """Одностраничный PDF для векторной сцены.
+
+    Содержимое страницы сжимается Flate. Ось Y в PDF направлена вверх,
+    поэтому координаты кадра переворачиваются матрицей преобразования.
+    """
+    width, height = scene["width"], scene["height"]
+    content = [
+        f"1 0 0 -1 0 {height} cm\n",
+        _pdf_color(scene["background"], "rg"),
+        f"0 0 {width} {height} re f\n"
+    ]
+    for layer in scene["layers"]:
+        if layer["kind"] == "points":
+            content.append(_pdf_color(layer["color"], "RG"))
+            content.append(f"{layer['size']} w 1 J\n")
+            content.append(_format_rows(np.repeat(layer["points"], 2, axis=0).reshape(-1, 4), "%g %g m %g %g l\n"))
+            content.append("S\n")
+        elif layer["kind"] == "lines":
+            content.append(_pdf_color(layer["color"], "RG"))
+            content.append(f"{layer['width']} w 0 J\n")
+            content.append(_format_rows(layer["segments"], "%g %g m %g %g l\n"))
+            content.append("S\n")
+        elif layer["kind"] == "fill":
+            content.append(_pdf_color(layer["color"], "rg"))
+            content.append(_format_rows(layer["polygons"], "%g %g m %g %g l %g %g l h\n"))
+            content.append("f\n")
+    stream = zlib.compress("".join(content).encode("ascii"), 6)
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] "
+        f"/Contents 4 0 R /Resources << >> >>".encode("ascii"),
+        f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode("ascii") + stream + b"\nendstream"
+    ]
+    document = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(document))
+        document += f"{number} 0 obj\n".encode("ascii") + body + b"\nendobj\n"
+    xref_offset = len(document)
+    document += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii")
+    for offset in offsets:
+        document += f"{offset:010d} 00000 n \n".encode("ascii")
+    document += (f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+                 f"startxref\n{xref_offset}\n%%EOF\n").encode("ascii")
+    return bytes(document)
+
+
+def write_vector(file_path, scene):
+    """Запись сцены в SVG или PDF (формат по расширению) через временный файл."""
+    extension = os.path.splitext(file_path)[1].lstrip(".").lower()
+    if extension == "svg":
+        data = svg_document(scene).encode("utf-8")
+    elif extension == "pdf":
+        data = pdf_document(scene)
+    else:
+        raise ValueError(f"Неподдерживаемый векторный формат: {extension}")
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(data)
+    os.replace(tmp_path, file_path)
@@ -0,0 +1,35 @@
+import argparse
+import json
+from loguru import logger
+from modules.config_manager import ConfigManager
+from modules.animation_manager import AnimationManager
+from modules.render_manager import RenderManager
+from modules.utils import set_logger
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Рендеринг постера большого размера плитками")
+    parser.add_argument("output", help="Путь к PNG")
+    parser.add_argument("--width", type=int, required=True, help="Ширина постера в пикселях")
+    parser.add_argument("--height", type=int, required=True, help="Высота постера в пикселях")
+    parser.add_argument("--seed", type=int, default=0, help="Зерно генерации кадра")
+    parser.add_argument("--params", default=None, help="JSON-файл с переопределениями параметров (например, {'hue': 200})")
+    parser.add_argument("-c", "--config", default="config.ini", help="Путь к конфигурации")
+    parser.add_argument("--log-level", default="INFO")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    set_logger()
+    logger.info("Запуск рендеринга постера")
+    config_manager = ConfigManager(args.config, args.log_level)
+    if args.params:
+        with open(args.params, encoding="utf-8") as params_file:
+            config_manager = config_manager.with_overrides(json.load(params_file))
+    animation_manager = AnimationManager(config_manager, args.log_level)
+    render_manager = RenderManager(config_manager, None, args.log_level)
+    # Кадр и заливка зависят только от зерна, как в пакетной генерации
+    animation_manager.reset(args.seed)
+    render_manager.reset(args.seed)
+    render_manager.render_poster(animation_manager.get_frame(), args.output, args.width, args.height)
@@ -0,0 +1,33 @@
+import argparse
+from loguru import logger
+from modules.config_manager import ConfigManager
+from modules.render_service import RenderService, serve
+from modules.utils import set_logger
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Локальная служба рендеринга с прогретыми рабочими процессами")
+    parser.add_argument("-o", "--output-dir", default="render_output", help="Каталог для результатов")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Число рабочих процессов (по умолчанию — все ядра)")
+    parser.add_argument("--host", default="127.0.0.1", help="Адрес для приема заданий")
+    parser.add_argument("--port", type=int, default=8765, help="Порт для приема заданий")
+    parser.add_argument("-c", "--config", default="config.ini", help="Путь к конфигурации")
+    parser.add_argument("--log-level", default="INFO")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    set_logger()
+    logger.info("Запуск службы рендеринга")
+    config_manager = ConfigManager(args.config, args.log_level)
+    service = RenderService(config_manager, args.config, args.output_dir, args.workers, args.log_level)
+    service.start()
+    server = serve(service, args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Остановка по запросу пользователя")
+    finally:
+        server.server_close()
+        service.stop()
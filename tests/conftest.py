@@ -0,0 +1,11 @@
+import os
+import pytest
+from modules.config_manager import ConfigManager
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.ini")
+
+
+@pytest.fixture
+def config():
+    """Конфигурация проекта с уменьшенным кадром, чтобы тесты шли быстро."""
+    return ConfigManager(CONFIG_PATH, "ERROR").with_overrides({"width": 270, "height": 480})
@@ -0,0 +1,57 @@
+import os
+import numpy as np
+from modules.area_masks import extract_contours, load_mask_areas
+
+
+def _mask():
+    import cv2
+    mask = np.zeros((200, 300), dtype=np.uint8)
+    cv2.circle(mask, (80, 90), 50, 255, -1)
+    cv2.rectangle(mask, (170, 40), (280, 160), 255, -1)
+    cv2.circle(mask, (250, 185), 3, 255, -1)
+    return mask
+
+
+def test_contours_fit_vertex_budget():
+    for budget in (6, 12, 40):
+        polygons = extract_contours((_mask() > 0).astype(np.uint8), budget)
+        assert sum(len(polygon) for polygon in polygons) <= budget
+        assert all(len(polygon) >= 3 for polygon in polygons)
+        assert all(np.all((polygon >= 0) & (polygon <= 1)) for polygon in polygons)
+
+
+def test_small_contours_are_dropped():
+    polygons = extract_contours((_mask() > 0).astype(np.uint8), 100, min_area=0.005)
+    assert len(polygons) == 2
+
+
+def test_mask_areas_are_cached(tmp_path):
+    import cv2
+    image_path = str(tmp_path / "mask.png")
+    cv2.imwrite(image_path, _mask())
+    cache_dir = str(tmp_path / "cache")
+    polygons = load_mask_areas(image_path, 24, cache_dir=cache_dir)
+    cache_files = os.listdir(cache_dir)
+    assert len(cache_files) == 1
+
+    os.remove(image_path)
+    cv2.imwrite(image_path, _mask())
+    cached = load_mask_areas(image_path, 24, cache_dir=cache_dir)
+    assert os.listdir(cache_dir) == cache_files
+    for polygon, restored in zip(polygons, cached):
+        np.testing.assert_array_equal(polygon, restored)
+    # Другой бюджет — другой ключ кэша
+    load_mask_areas(image_path, 12, cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_mask_area_in_config_scales_to_frame(config, tmp_path):
+    import cv2
+    image_path = str(tmp_path / "mask.png")
+    cv2.imwrite(image_path, _mask())
+    config = config.with_overrides({"area_1": f"mask:{image_path}", "mask_cache_dir": str(tmp_path / "cache")})
+    polygons = config.get_empty_area_geometry(600, 400)["polygons"]
+    # Две крупные области маски (мелкая отброшена по mask_min_area) и area_2..area_5
+    assert len(polygons) == 6
+    for polygon in polygons[:2]:
+        assert np.all((polygon >= 0) & (polygon <= [600, 400]))
@@ -0,0 +1,44 @@
+import json
+import os
+import pytest
+from modules import batch_manager
+from modules.batch_manager import BatchManager, job_name
+
+
+def test_grid_expands_with_stable_names(config):
+    spec = {"name": "v", "base": {"points_amount": 30}, "grid": {"fps": [30, 60], "points_size": [4, 6]},
+            "seeds": [1, 2], "outputs": ["png"]}
+    jobs = BatchManager(config, log_level="ERROR").build_jobs(spec)
+    assert len(jobs) == 8
+    assert len({job["name"] for job in jobs}) == 8
+    assert all(job["params"]["points_amount"] == 30 for job in jobs)
+    # Имя не зависит от порядка ключей и совпадает между запусками
+    assert jobs == BatchManager(config, log_level="ERROR").build_jobs(spec)
+    assert job_name("v", {"a": 1, "b": 2}, 3) == job_name("v", {"b": 2, "a": 1}, 3)
+    assert job_name("v", {"a": 1}, 3) != job_name("v", {"a": 1}, 4)
+
+
+def test_unknown_output_is_rejected(config):
+    with pytest.raises(ValueError):
+        BatchManager(config, log_level="ERROR").build_jobs({"outputs": ["gif"]})
+
+
+def test_finished_jobs_are_skipped_and_recorded(config, tmp_path):
+    manager = BatchManager(config, log_level="ERROR")
+    spec = {"name": "v", "seeds": [1, 2], "outputs": ["png"]}
+    for job in manager.build_jobs(spec):
+        (tmp_path / f"{job['name']}.png").write_bytes(b"")
+    manager.run(spec, str(tmp_path), workers=1)
+    with open(tmp_path / "manifest.jsonl", encoding="utf-8") as file:
+        records = [json.loads(line) for line in file]
+    assert sorted(record["seed"] for record in records) == [1, 2]
+
+
+def test_job_writes_output_without_temporary_files(config, tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_manager, "_worker_config", config)
+    monkeypatch.setattr(batch_manager, "_worker_managers", None)
+    job = {"id": 7, "name": "v_job", "params": {"points_amount": 20}, "seed": 3, "outputs": ["png"]}
+    record = batch_manager._run_job(job, str(tmp_path))
+    assert record["outputs"] == ["v_job.png"]
+    assert os.listdir(tmp_path) == ["v_job.png"]
+    assert record["mesh"]["frames"] >= 1
@@ -0,0 +1,32 @@
+import numpy as np
+from modules.animation_manager import AnimationManager
+
+
+def test_geometry_scales_per_axis_and_is_cached(config):
+    reference = config.get_empty_areas()
+    geometry = config.get_empty_area_geometry(1080, 960)
+    for polygon, source in zip(geometry["polygons"], reference):
+        np.testing.assert_allclose(polygon, np.asarray(source) * [0.5, 0.25])
+    assert geometry["scale"] == 0.25
+    assert config.get_empty_area_geometry(1080, 960) is geometry
+    # Сквозная нумерация ребер контуров
+    assert len(geometry["segments"]) == sum(len(polygon) for polygon in reference)
+    assert geometry["segments"].max() == len(geometry["segments"]) - 1
+
+
+def test_normalized_units(config):
+    config = config.with_overrides({"units": "normalized", "area_1": "[(0.25,0.25),(0.75,0.25),(0.5,0.75)]"})
+    geometry = config.get_empty_area_geometry(200, 400)
+    np.testing.assert_allclose(geometry["polygons"][0], [[50, 100], [150, 100], [100, 300]])
+
+
+def test_resize_keeps_areas_proportional(config):
+    animation_manager = AnimationManager(config)
+    animation_manager.reset(4)
+    phases = [param['phase'] for param in animation_manager.hole_vertex_params[0]]
+    animation_manager.set_width(540)
+    animation_manager.set_height(960)
+    np.testing.assert_allclose(animation_manager.empty_areas[0], np.asarray(config.get_empty_areas()[0]) / 4)
+    assert [param['phase'] for param in animation_manager.hole_vertex_params[0]] == phases
+    param = animation_manager.hole_vertex_params[0][0]
+    assert param['radius'] == param['base_radius'] * 0.25
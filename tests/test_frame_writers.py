@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from PIL import Image
+from modules.frame_writers import (MAPPED_HEADER_SIZE, MAPPED_WRITTEN_OFFSET, AnimatedImageWriter, MappedFrameWriter,
+                                   RawStreamWriter)
+
+PALETTE = np.random.default_rng(0).integers(0, 256, (103, 3))
+
+
+def _index_frames(count, width=64, height=48):
+    return [np.random.default_rng(i).integers(0, len(PALETTE), (height, width)).astype(np.uint8)
+            for i in range(count)]
+
+
+def test_gif_is_streamed_frame_by_frame(tmp_path):
+    path = str(tmp_path / "anim.gif")
+    frames = _index_frames(5)
+    writer = AnimatedImageWriter(path, 30, (64, 48), PALETTE)
+    for index, frame in enumerate(frames):
+        writer.write(frame, index)
+    assert writer.frames == []
+    writer.close()
+
+    with Image.open(path) as image:
+        assert image.n_frames == len(frames)
+        for index, frame in enumerate(frames):
+            image.seek(index)
+            np.testing.assert_array_equal(np.asarray(image.convert("RGB")), PALETTE[frame])
+
+
+def test_webp_over_memory_limit_fails_before_rendering(tmp_path):
+    path = tmp_path / "anim.webp"
+    with pytest.raises(ValueError, match="WebP"):
+        AnimatedImageWriter(str(path), 30, (64, 48), PALETTE, total_frames=100, max_bytes=64 * 48 * 10)
+    assert not path.exists()
+
+
+def test_webp_within_memory_limit(tmp_path):
+    path = str(tmp_path / "anim.webp")
+    writer = AnimatedImageWriter(path, 30, (64, 48), PALETTE, total_frames=3, max_bytes=64 * 48 * 3)
+    for index, frame in enumerate(_index_frames(3)):
+        writer.write(frame, index)
+    writer.close()
+    with Image.open(path) as image:
+        assert image.n_frames == 3
+
+
+def test_odd_y4m_size_is_rejected_before_opening(tmp_path):
+    path = tmp_path / "stream.y4m"
+    with pytest.raises(ValueError, match="четными"):
+        RawStreamWriter(str(path), 30, (65, 48))
+    assert not path.exists()
+
+
+def test_y4m_stream_layout(tmp_path):
+    path = tmp_path / "stream.y4m"
+    writer = RawStreamWriter(str(path), 30, (64, 48))
+    for index in range(2):
+        writer.write(np.full((48, 64, 3), 200, dtype=np.uint8), index)
+    writer.close()
+    data = path.read_bytes()
+    header, _, body = data.partition(b"\n")
+    assert header == b"YUV4MPEG2 W64 H48 F30:1 Ip A1:1 C420jpeg"
+    assert len(body) == 2 * (len(b"FRAME\n") + 64 * 48 * 3 // 2)
+
+
+def test_mapped_frames_reject_empty_file(tmp_path):
+    path = tmp_path / "clip.frames"
+    with pytest.raises(ValueError):
+        MappedFrameWriter(str(path), 30, (64, 48), 0)
+    assert not path.exists()
+
+
+def test_mapped_frames_round_trip(tmp_path):
+    path = str(tmp_path / "clip.frames")
+    writer = MappedFrameWriter(path, 30, (64, 48), 2)
+    frames = [np.random.default_rng(i).integers(0, 256, (48, 64, 3), dtype=np.uint8) for i in range(2)]
+    for index, frame in enumerate(frames):
+        writer.write(frame, index)
+    writer.close()
+    stored = np.memmap(path, dtype=np.uint8, mode="r", offset=MAPPED_HEADER_SIZE, shape=(2, 48, 64, 3))
+    np.testing.assert_array_equal(stored, np.stack(frames))
+    assert np.memmap(path, dtype=np.uint32, mode="r", offset=MAPPED_WRITTEN_OFFSET, shape=(1,))[0] == 2
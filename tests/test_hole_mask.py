@@ -0,0 +1,36 @@
+import numpy as np
+from modules.hole_mask import HoleMask, interior_point, points_in_polygon
+
+# Невыпуклая область (буква L) и треугольник
+POLYGONS = [
+    np.array([[40, 40], [200, 40], [200, 90], [90, 90], [90, 260], [40, 260]], dtype=np.float64),
+    np.array([[150, 300], [260, 420], [120, 460]], dtype=np.float64),
+]
+
+
+def _brute_force(points, polygons):
+    result = np.full(len(points), HoleMask.OUTSIDE)
+    for area_idx, polygon in reversed(list(enumerate(polygons))):
+        result[points_in_polygon(points, polygon)] = area_idx
+    return result
+
+
+def test_locate_matches_exact_geometry():
+    mask = HoleMask(270, 480, cell_size=16)
+    mask.build(POLYGONS)
+    points = np.random.default_rng(0).uniform((-10, -10), (280, 490), size=(20000, 2))
+    np.testing.assert_array_equal(mask.locate(points, POLYGONS), _brute_force(points, POLYGONS))
+    assert 0 < mask.free_fraction() < 1
+
+
+def test_map_stays_valid_within_slack():
+    mask = HoleMask(270, 480, cell_size=16)
+    mask.build(POLYGONS, slack=6.0)
+    moved = [polygon + np.random.default_rng(idx).uniform(-4, 4, polygon.shape) for idx, polygon in enumerate(POLYGONS)]
+    points = np.random.default_rng(1).uniform((0, 0), (270, 480), size=(20000, 2))
+    np.testing.assert_array_equal(mask.locate(points, moved), _brute_force(points, moved))
+
+
+def test_interior_point_of_concave_polygon():
+    point = interior_point(POLYGONS[0])
+    assert points_in_polygon(point, POLYGONS[0])[0]
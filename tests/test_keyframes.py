@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from modules.animation_manager import AnimationManager
+from modules.render_manager import RenderManager
+
+
+def _keyframe_flags(config, frames=6):
+    animation_manager = AnimationManager(config)
+    flags = []
+    update_frame = animation_manager.update_frame
+
+    def record(keyframe=True):
+        flags.append(keyframe)
+        update_frame(keyframe)
+
+    animation_manager.update_frame = record
+    list(RenderManager(config, None, "ERROR")._simulate(animation_manager, frames))
+    return flags
+
+
+def test_topology_reuse_is_off_by_default(config):
+    assert config.get_int("Export", "keyframe_interval") == 1
+    assert _keyframe_flags(config) == [True] * 6
+
+
+def test_topology_reuse_is_opt_in(config):
+    assert _keyframe_flags(config.with_overrides({"keyframe_interval": 3})) == [True, False, False] * 2
+
+
+@pytest.mark.parametrize("motion_model", ["ballistic", "repulsion"])
+def test_reused_frames_follow_points(config, motion_model):
+    animation_manager = AnimationManager(config.with_overrides({"motion_model": motion_model}))
+    animation_manager.reset(3)
+    animation_manager.update_frame()
+    for _ in range(5):
+        animation_manager.update_frame(keyframe=False)
+        frame = animation_manager.get_frame()
+        np.testing.assert_array_equal(frame['vertices'], animation_manager.frame["points"])
+        assert len(frame['triangles'])
+
+
+def _flip_one_triangle(animation_manager):
+    """Отражение свободной точки через противолежащее ребро ее треугольника: тот гарантированно выворачивается."""
+    points = animation_manager.frame["points"]
+    limits = np.array([animation_manager.frame_width, animation_manager.frame_height])
+    for triangle in np.asarray(animation_manager.frame["triangles"]['triangles']).tolist():
+        for position, index in enumerate(triangle):
+            if index < 12:
+                continue
+            a, b = points[triangle[(position + 1) % 3]], points[triangle[(position + 2) % 3]]
+            direction = (b - a) / np.linalg.norm(b - a)
+            foot = a + np.dot(points[index] - a, direction) * direction
+            reflected = 2 * foot - points[index]
+            if np.all((reflected > 1) & (reflected < limits - 1)):
+                points[index] = reflected
+                return index
+    raise AssertionError("нет подходящего треугольника")
+
+
+def test_flipped_triangle_forces_retriangulation(config):
+    animation_manager = AnimationManager(config.with_overrides({"holes_check": False, "points_amount": 50}))
+    animation_manager.reset(4)
+    animation_manager.update_frame()
+    reference = animation_manager.get_frame()
+    rebuilds = []
+    update_triangles = animation_manager._update_triangles
+    animation_manager._update_triangles = lambda: rebuilds.append(True) or update_triangles()
+    animation_manager._update_points = lambda: _flip_one_triangle(animation_manager)
+
+    animation_manager.update_frame(keyframe=False)
+    frame = animation_manager.get_frame()
+    assert rebuilds == [True]
+    assert frame is not reference
+    np.testing.assert_array_equal(frame['vertices'], animation_manager.frame["points"])
+    report = animation_manager.mesh_validator.inspect(animation_manager.frame["points"], frame)
+    assert len(report["flipped"]) == 0 and len(report["degenerate"]) == 0
+
+
+def test_unchanged_topology_is_reused(config):
+    animation_manager = AnimationManager(config.with_overrides({"holes_check": False, "points_amount": 50}))
+    animation_manager.reset(4)
+    animation_manager.update_frame()
+    simplices = animation_manager.get_frame()['triangles']
+    animation_manager._update_points = lambda: None
+    animation_manager._update_triangles = lambda: pytest.fail("сетка перестроена без изменений")
+    animation_manager.update_frame(keyframe=False)
+    assert animation_manager.get_frame()['triangles'] is simplices
@@ -0,0 +1,39 @@
+import numpy as np
+from modules.animation_manager import AnimationManager
+from modules.render_manager import RenderManager
+
+
+def test_large_frame_is_meshed_and_drawn(config):
+    config = config.with_overrides({"points_amount": 20000})
+    animation_manager = AnimationManager(config)
+    animation_manager.reset(2)
+    animation_manager.update_frame()
+    frame = animation_manager.get_frame()
+    points = animation_manager.frame["points"]
+    assert len(points) >= 20012
+    assert np.all(np.bincount(np.asarray(frame['triangles']).ravel(), minlength=len(points)) > 0)
+    assert np.all((points >= 0) & (points <= [animation_manager.frame_width, animation_manager.frame_height]))
+
+    render_manager = RenderManager(config, None, "ERROR")
+    render_manager.reset(2)
+    render_manager.points_check = False
+    render_manager._draw(frame)
+    assert render_manager._is_large_frame()
+    assert np.any(render_manager.buffer != render_manager.rgb_bg_color)
+
+
+def test_triangle_shade_follows_vertex_set(config):
+    render_manager = RenderManager(config, None, "ERROR")
+    render_manager.reset(4)
+    simplices = np.array([[3, 7, 11], [11, 3, 7], [7, 11, 3], [3, 7, 12]])
+    shades = render_manager._triangle_shades(simplices)
+    assert shades[0] == shades[1] == shades[2]
+    low = render_manager.hsv_color["v"] - render_manager.fill_variation
+    high = render_manager.hsv_color["v"] + render_manager.fill_variation
+    assert np.all((shades >= max(0, low)) & (shades <= min(100, high)))
+
+
+def test_shared_edges_are_drawn_once(config):
+    render_manager = RenderManager(config, None, "ERROR")
+    edges = render_manager._unique_edges(np.array([[0, 1, 2], [2, 1, 3]]))
+    assert sorted(map(tuple, edges.tolist())) == [(0, 1), (0, 2), (1, 2), (1, 3), (2, 3)]
@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+import textwrap
+import numpy as np
+from modules.animation_manager import AnimationManager
+from modules.mesh_validation import MeshValidator, duplicate_points
+from tests.conftest import CONFIG_PATH
+
+
+def test_duplicate_points_finds_every_copy():
+    points = np.array([[0, 0], [5, 5], [0, 0], [3, 1], [5, 5], [0, 0]], dtype=np.float64)
+    np.testing.assert_array_equal(duplicate_points(points), [0, 1, 2, 4, 5])
+    assert len(duplicate_points(points[[0, 1, 3]])) == 0
+
+
+def test_inspect_reports_unused_and_flipped():
+    vertices = np.array([[0, 0], [10, 0], [0, 10], [10, 10], [5, 20]], dtype=np.float64)
+    triangles = {'vertices': vertices, 'triangles': np.array([[0, 1, 2], [1, 3, 2], [1, 2, 3]])}
+    report = MeshValidator().inspect(vertices, triangles)
+    assert not report["valid"]
+    np.testing.assert_array_equal(report["unused"], [4])
+    assert len(report["flipped"]) == 1
+
+
+def test_side_points_never_land_on_corners(config):
+    animation_manager = AnimationManager(config.with_overrides({"width": 16, "height": 16}))
+    for seed in range(50):
+        animation_manager.rng = np.random.default_rng(seed)
+        side_points = animation_manager._generate_side_points()
+        along = np.concatenate([side_points[:4, 0], side_points[4:, 1]])
+        assert np.all((along > 0) & (along < 16))
+
+
+def test_side_point_on_corner_is_moved_inward(config):
+    config = config.with_overrides({"width": 540, "height": 960})
+    animation_manager = AnimationManager(config)
+    for seed in range(40):
+        animation_manager.reset(seed)
+        points = animation_manager.frame["points"].copy()
+        # Точка верхней стороны ровно в углу 2 — конце обязательного ребра верхней стороны
+        points[4] = points[2]
+        triangles = animation_manager._triangulate_validated(points)
+        assert len(duplicate_points(points)) == 0
+        assert points[4, 1] == 960 and 0 < points[4, 0] < 540
+        assert len(triangles['triangles'])
+
+
+def test_resize_loop_does_not_crash_triangle():
+    # Падение triangle убивает процесс, поэтому сценарий из отчета идет в отдельном процессе
+    script = textwrap.dedent(f"""
+        from loguru import logger
+        logger.remove()
+        from modules.config_manager import ConfigManager
+        from modules.animation_manager import AnimationManager
+        animation_manager = AnimationManager(ConfigManager({CONFIG_PATH!r}, "ERROR"))
+        for _ in range(150):
+            animation_manager.set_width(540)
+            animation_manager.set_height(960)
+            animation_manager.set_width(541)
+            animation_manager.set_height(961)
+            animation_manager.update_frame()
+    """)
+    result = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(CONFIG_PATH),
+                            capture_output=True, timeout=300)
+    assert result.returncode == 0, result.stderr.decode(errors="replace")[-2000:]
@@ -0,0 +1,50 @@
+import numpy as np
+from modules.animation_manager import AnimationManager
+
+
+def _two_point_frame(animation_manager, distance):
+    """Кадр из 12 опорных точек и двух свободных точек на расстоянии distance, соединенных ребром."""
+    center = np.array([animation_manager.frame_width / 2, animation_manager.frame_height / 2])
+    points = np.vstack([np.zeros((12, 2)), center - [distance / 2, 0], center + [distance / 2, 0]])
+    velocities = np.zeros_like(points)
+    velocities[12:] = [[0.0, 1.0], [0.0, 1.0]]
+    animation_manager.frame = {"points": points, "velocities": velocities,
+                               "triangles": {'vertices': points, 'triangles': np.array([[0, 12, 13]]),
+                                             'edges': np.array([[12, 13]])}}
+    return velocities
+
+
+def test_close_neighbours_push_apart(config):
+    animation_manager = AnimationManager(config.with_overrides({"motion_model": "repulsion"}))
+    animation_manager.speed_damping = 0
+    velocities = _two_point_frame(animation_manager, 2.0)
+    animation_manager._apply_neighbour_forces(12, 14)
+    assert velocities[12, 0] < 0 < velocities[13, 0]
+    # Силы попарные: суммарный импульс не меняется
+    np.testing.assert_allclose(velocities[12:].sum(axis=0), [0.0, 2.0])
+
+
+def test_distant_neighbours_do_not_interact(config):
+    animation_manager = AnimationManager(config.with_overrides({"motion_model": "repulsion"}))
+    animation_manager.speed_damping = 0
+    velocities = _two_point_frame(animation_manager, animation_manager.frame_width)
+    animation_manager._apply_neighbour_forces(12, 14)
+    np.testing.assert_array_equal(velocities[12:], [[0.0, 1.0], [0.0, 1.0]])
+
+
+def test_full_damping_restores_speed_range(config):
+    animation_manager = AnimationManager(config.with_overrides({"motion_model": "repulsion"}))
+    animation_manager.speed_damping = 100
+    animation_manager.repulsion_strength = 100
+    velocities = _two_point_frame(animation_manager, 0.5)
+    animation_manager._apply_neighbour_forces(12, 14)
+    speeds = np.linalg.norm(velocities[12:], axis=1)
+    assert np.all(speeds >= animation_manager.min_points_speed - 1e-9)
+    assert np.all(speeds <= animation_manager.max_points_speed + 1e-9)
+
+
+def test_ballistic_model_keeps_velocities(config):
+    animation_manager = AnimationManager(config.with_overrides({"motion_model": "ballistic", "holes_check": False}))
+    velocities = _two_point_frame(animation_manager, 2.0)
+    animation_manager._update_points()
+    np.testing.assert_array_equal(velocities[12:], [[0.0, 1.0], [0.0, 1.0]])
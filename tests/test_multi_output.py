@@ -0,0 +1,32 @@
+import numpy as np
+from modules.animation_manager import AnimationManager
+from modules.frame_writers import MAPPED_HEADER_SIZE, MAPPED_WRITTEN_OFFSET
+from modules.render_manager import RenderManager
+
+
+def _frames(path, count, width, height):
+    assert np.memmap(path, dtype=np.uint32, mode="r", offset=MAPPED_WRITTEN_OFFSET, shape=(1,))[0] == count
+    return np.array(np.memmap(path, dtype=np.uint8, mode="r", offset=MAPPED_HEADER_SIZE,
+                              shape=(count, height, width, 3)))
+
+
+def test_outputs_share_one_simulation(config, tmp_path):
+    animation_manager = AnimationManager(config)
+    render_manager = RenderManager(config, None, "ERROR")
+    render_manager.reset(1)
+    outputs = [
+        {"path": str(tmp_path / "full.frames"), "width": 270, "height": 480, "fps_divisor": 1},
+        {"path": str(tmp_path / "half_rate.frames"), "width": 270, "height": 480, "fps_divisor": 2},
+        {"path": str(tmp_path / "small.frames"), "width": 136, "height": 240, "fps_divisor": 1},
+    ]
+    calls = []
+    update_frame = animation_manager.update_frame
+    animation_manager.update_frame = lambda **kwargs: calls.append(kwargs) or update_frame(**kwargs)
+
+    render_manager.render_outputs(animation_manager, outputs, fps=6, duration=1, seed=3)
+    assert len(calls) == 6
+    full = _frames(outputs[0]["path"], 6, 270, 480)
+    # Выход с делителем получает каждый второй кадр того же движения
+    np.testing.assert_array_equal(_frames(outputs[1]["path"], 3, 270, 480), full[::2])
+    small = _frames(outputs[2]["path"], 6, 136, 240)
+    assert not np.array_equal(small[0], small[-1])
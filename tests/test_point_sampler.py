@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+from modules.animation_manager import AnimationManager
+from modules.hole_mask import points_in_polygon
+
+
+@pytest.mark.parametrize("points_amount", [50, 5000])
+def test_points_avoid_holes(config, points_amount):
+    animation_manager = AnimationManager(config.with_overrides({"points_amount": points_amount}))
+    animation_manager.reset(6)
+    points = animation_manager._generate_random_points()
+    assert points.shape == (points_amount, 2)
+    assert np.all((points >= 0) & (points <= [animation_manager.frame_width, animation_manager.frame_height]))
+    for polygon in animation_manager._hole_polygons():
+        assert not points_in_polygon(points, polygon).any()
+
+
+def test_points_without_holes_cover_canvas(config):
+    animation_manager = AnimationManager(config.with_overrides({"points_amount": 2000, "holes_check": False}))
+    points = animation_manager._generate_random_points()
+    assert points.shape == (2000, 2)
+    assert points[:, 1].max() > animation_manager.frame_height * 0.9
+
+
+def test_covered_canvas_is_rejected(config):
+    config = config.with_overrides({"area_1": "[(-500,-500),(2660,-500),(2660,4340),(-500,4340)]"})
+    with pytest.raises(ValueError):
+        AnimationManager(config)
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from modules.render_manager import RenderManager
+
+
+@pytest.mark.parametrize("points_size", [1, 2, 7, 12])
+def test_sprite_matches_draw_circle(config, points_size):
+    import pygame
+    render_manager = RenderManager(config, None, "ERROR")
+    render_manager.points_check, render_manager.lines_check, render_manager.fill_check = True, False, False
+    render_manager.points_antialias = False
+    render_manager.points_size = points_size
+    vertices = np.random.default_rng(points_size).uniform((-5, -5), (275, 485), size=(60, 2))
+    render_manager._draw({'vertices': vertices, 'triangles': np.array([[0, 1, 2]])})
+
+    expected = pygame.Surface((render_manager.frame_width, render_manager.frame_height))
+    expected.fill(render_manager.rgb_bg_color)
+    radius = points_size // 2
+    for point in vertices.astype(np.int32).tolist():
+        if radius > 0:
+            pygame.draw.circle(expected, render_manager.rgb_color, point, radius)
+        else:
+            expected.set_at(point, render_manager.rgb_color)
+    np.testing.assert_array_equal(render_manager.buffer,
+                                  pygame.surfarray.pixels3d(expected).transpose(1, 0, 2))
+
+
+def test_sprite_is_cached_until_style_changes(config):
+    render_manager = RenderManager(config, None, "ERROR")
+    sprite = render_manager._point_sprite()
+    assert render_manager._point_sprite() is sprite
+    render_manager.points_size += 2
+    assert render_manager._point_sprite() is not sprite
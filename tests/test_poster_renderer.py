@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from modules.animation_manager import AnimationManager
+from modules.poster_renderer import PosterRenderer
+from modules.render_manager import RenderManager
+
+WIDTH, HEIGHT = 1200, 2000
+
+
+@pytest.fixture
+def scene(config):
+    animation_manager = AnimationManager(config)
+    animation_manager.reset(5)
+    render_manager = RenderManager(config, None, "ERROR")
+    render_manager.reset(5)
+    render_manager.fill_check = True
+    return render_manager, animation_manager.get_frame()
+
+
+def _render(render_manager, triangles, path, **options):
+    import cv2
+    renderer = PosterRenderer(render_manager, WIDTH, HEIGHT, workers=2, **options)
+    renderer.render(triangles, str(path))
+    return cv2.imread(str(path)), renderer
+
+
+def test_tiles_match_single_pass(scene, tmp_path):
+    render_manager, triangles = scene
+    single, _ = _render(render_manager, triangles, tmp_path / "single.png",
+                        tile_size=WIDTH + HEIGHT, band_memory=2 ** 40)
+    tiled, renderer = _render(render_manager, triangles, tmp_path / "tiled.png",
+                              tile_size=256, max_margin=WIDTH + HEIGHT, band_memory=300 * WIDTH)
+    assert renderer.band_height == 100
+    assert renderer.clipped_tiles == 0
+    np.testing.assert_array_equal(tiled, single)
+
+
+def test_short_margin_is_reported(scene, tmp_path):
+    render_manager, triangles = scene
+    single, _ = _render(render_manager, triangles, tmp_path / "single.png",
+                        tile_size=WIDTH + HEIGHT, band_memory=2 ** 40)
+    tiled, renderer = _render(render_manager, triangles, tmp_path / "tiled.png", tile_size=256, max_margin=0)
+    assert renderer.clipped_tiles > 0
+    # Отличаются только пиксели обрезанных ребер
+    assert np.mean(np.any(tiled != single, axis=2)) < 0.01
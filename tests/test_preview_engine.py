@@ -0,0 +1,57 @@
+import numpy as np
+import pygame
+from modules.animation_manager import AnimationManager
+from modules.preview_engine import PreviewEngine
+from modules.render_manager import RenderManager
+from tests.conftest import CONFIG_PATH
+
+
+def test_animation_state_round_trip(config):
+    source = AnimationManager(config)
+    source.reset(5)
+    source.update_frame()
+    target = AnimationManager(config)
+    target.set_state(source.get_state())
+    np.testing.assert_array_equal(target.get_frame()['triangles'], source.get_frame()['triangles'])
+    for _ in range(3):
+        source.update_frame()
+        target.update_frame()
+    np.testing.assert_array_equal(target.frame["points"], source.frame["points"])
+
+
+def test_export_uses_synced_scene(config, tmp_path):
+    animation_manager = AnimationManager(config)
+    preview = RenderManager(config, None, "ERROR")
+    preview.set_hue(200)
+    preview.set_saturation(80)
+    preview.set_fill_check(True)
+
+    exporter = RenderManager(config, None, "ERROR")
+    exporter.set_state(preview.get_state())
+    exporter.triangles = animation_manager.get_frame()
+    path = str(tmp_path / "frame.png")
+    exporter.write_image(path)
+
+    preview.render_frame(animation_manager.get_frame())
+    image = pygame.surfarray.pixels3d(pygame.image.load(path)).swapaxes(0, 1)
+    np.testing.assert_array_equal(image, preview.buffer)
+    assert len(np.unique(image.reshape(-1, 3), axis=0)) > 1
+
+
+def test_snapshot_reflects_forwarded_parameters(config):
+    engine = PreviewEngine(config, CONFIG_PATH, "ERROR")
+    engine.start()
+    try:
+        engine.call("animation", "set_points_amount", 50)
+        engine.call("render", "set_hue", 200)
+        animation_state, render_state = engine.snapshot()
+    finally:
+        engine.stop()
+    assert animation_state["points_amount"] == 50
+    assert len(animation_state["frame"]["points"]) >= 50 + 12
+    assert render_state["hsv_color"]["h"] == 200
+
+    animation_manager = AnimationManager(config)
+    animation_manager.set_state(animation_state)
+    np.testing.assert_array_equal(animation_manager.get_frame()['vertices'],
+                                  animation_state["frame"]["triangles"]['vertices'])
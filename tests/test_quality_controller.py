@@ -0,0 +1,60 @@
+from modules.animation_manager import AnimationManager
+from modules.quality_controller import QualityController
+from modules.render_manager import RenderManager
+
+BUDGET = 1 / 60
+
+
+def test_slow_frames_degrade_one_level_at_a_time():
+    controller = QualityController()
+    changes = [controller.update(BUDGET * 2, BUDGET) for _ in range(QualityController.DEGRADE_AFTER)]
+    assert changes == [False] * (QualityController.DEGRADE_AFTER - 1) + [True]
+    assert controller.level == 1
+    for _ in range(100):
+        controller.update(BUDGET * 2, BUDGET)
+    assert controller.level == len(QualityController.LEVELS) - 1
+
+
+def test_fast_frames_restore_quality():
+    controller = QualityController()
+    controller.level = 2
+    for _ in range(QualityController.RESTORE_AFTER - 1):
+        assert not controller.update(BUDGET * 0.1, BUDGET)
+    assert controller.update(BUDGET * 0.1, BUDGET)
+    assert controller.level == 1
+    controller.reset()
+    assert controller.level == 0 and controller.describe() == "100%"
+
+
+def test_frames_within_budget_keep_level():
+    controller = QualityController()
+    controller.level = 1
+    for _ in range(200):
+        controller.update(BUDGET * 0.8, BUDGET)
+    assert controller.level == 1
+
+
+def test_preview_quality_leaves_export_renderer_untouched(config):
+    animation_manager = AnimationManager(config)
+    render_manager = RenderManager(config, None, "ERROR")
+    render_manager.fill_check = True
+    buffer = render_manager.render_preview(animation_manager.get_frame(), QualityController.LEVELS[-1])
+    assert buffer.shape == (120, 68, 3)
+    assert render_manager.fill_check and render_manager.buffer is None
+    assert render_manager.preview_renderer.fill_check is False
+
+
+def test_setters_redraw_with_preview_quality(config):
+    animation_manager = AnimationManager(config)
+    render_manager = RenderManager(config, None, "ERROR")
+    controller = QualityController()
+    controller.level = len(QualityController.LEVELS) - 1
+    render_manager.preview_controller = controller
+    render_manager.triangles = animation_manager.get_frame()
+    render_manager.set_hue(120)
+    renderer = render_manager.preview_renderer
+    render_manager.set_points_size(4)
+    # Полный кадр не растеризуется: кадр рисует только рендерер предпросмотра с новым стилем
+    assert render_manager.buffer is None
+    assert render_manager.preview_renderer is not renderer
+    assert render_manager.preview_renderer.buffer.shape == (120, 68, 3)
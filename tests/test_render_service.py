@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+import modules.batch_manager as batch_manager
+from modules.render_manager import RenderManager
+from modules.render_service import RenderService
+
+JOB = {"params": {"points_amount": 30}, "seed": 7, "outputs": ["png"]}
+
+
+def test_identical_jobs_share_one_entry(config, tmp_path):
+    service = RenderService(config, output_dir=str(tmp_path), workers=1, log_level="ERROR")
+    first = service.submit(dict(JOB))
+    assert service.submit(dict(JOB))["id"] == first["id"]
+    assert service.submit(dict(JOB, outputs=["jpg"]))["id"] != first["id"]
+
+    # Повтор с большим приоритетом поднимает ожидающее задание
+    assert service.submit(dict(JOB, priority=5))["priority"] == 5
+    assert len(service.list_jobs()) == 2
+
+    service.cancel(first["id"])
+    assert service.submit(dict(JOB))["id"] != first["id"]
+
+
+def test_concurrent_jobs_use_distinct_tmp_files(config, tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_manager, "_worker_config", config)
+    monkeypatch.setattr(batch_manager, "_worker_managers", None)
+    written = []
+    write_image = RenderManager.write_image
+
+    def record(self, file_path):
+        written.append(file_path)
+        write_image(self, file_path)
+
+    monkeypatch.setattr(RenderManager, "write_image", record)
+    job = {"name": "same", "params": JOB["params"], "seed": 7, "outputs": ["png"]}
+    batch_manager._run_job(dict(job, id="first"), str(tmp_path))
+    batch_manager._run_job(dict(job, id="second"), str(tmp_path))
+
+    assert len(set(written)) == 2
+    assert os.listdir(tmp_path) == ["same.png"]
+
+
+def test_futures_cancelled_on_stop_mark_jobs_cancelled(config, tmp_path):
+    from concurrent.futures import Future
+    service = RenderService(config, output_dir=str(tmp_path), workers=1, log_level="ERROR")
+    job = service.submit(dict(JOB))
+    service.jobs[job["id"]]["status"] = RenderService.STATUS_RUNNING
+    service.slots.acquire()
+    future = Future()
+    future.cancel()
+    service._finish(job["id"], future)
+    assert service.get(job["id"])["status"] == RenderService.STATUS_CANCELLED
+
+
+def test_stopped_service_submits_nothing(config, tmp_path):
+    class ClosedExecutor:
+        def submit(self, *args):
+            raise AssertionError("задание передано в пул после остановки")
+
+        def shutdown(self, **kwargs):
+            pass
+
+    service = RenderService(config, output_dir=str(tmp_path), workers=1, log_level="ERROR")
+    service.executor = ClosedExecutor()
+    job = service.submit(dict(JOB))
+    service.stop()
+    service._dispatch()
+    assert service.get(job["id"])["status"] == RenderService.STATUS_CANCELLED
+
+
+def test_closed_pool_cancels_job_instead_of_raising(config, tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    service = RenderService(config, output_dir=str(tmp_path), workers=1, log_level="ERROR")
+    service.executor = ThreadPoolExecutor(max_workers=1)
+    service.executor.shutdown()
+    service.running = True
+    job = service.submit(dict(JOB))
+    thread = threading.Thread(target=service._dispatch, daemon=True)
+    thread.start()
+    deadline = time.time() + 5
+    while service.get(job["id"])["status"] == RenderService.STATUS_QUEUED and time.time() < deadline:
+        time.sleep(0.01)
+    assert service.get(job["id"])["status"] == RenderService.STATUS_CANCELLED
+    service.stop()
+    thread.join(5)
+    assert not thread.is_alive()
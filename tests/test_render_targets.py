@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from modules.animation_manager import AnimationManager
+from modules.render_manager import RenderManager
+from modules.render_targets import RenderTargetPool
+
+
+def test_pool_reuses_and_evicts_least_recent():
+    pool = RenderTargetPool(capacity=2)
+    first, surface = pool.acquire(64, 48)
+    assert first.shape == (48, 64, 3) and surface.get_size() == (64, 48)
+    pool.acquire(32, 24)
+    assert pool.acquire(64, 48)[0] is first
+    pool.acquire(16, 16)  # Вытесняет 32x24, использованный давнее всего
+    assert (32, 24, 3) not in pool.targets
+    assert pool.acquire(64, 48)[0] is first
+    assert (pool.hits, pool.misses) == (2, 3)
+    assert pool.nbytes() == 64 * 48 * 3 + 16 * 16 * 3
+
+
+def test_index_buffers_have_no_surface():
+    buffer, surface = RenderTargetPool().acquire(20, 10, channels=1)
+    assert buffer.shape == (10, 20) and surface is None
+
+
+def test_resolution_change_switches_buffer(config):
+    animation_manager = AnimationManager(config)
+    render_manager = RenderManager(config, None, "ERROR")
+    render_manager.render_frame(animation_manager.get_frame())
+    original = render_manager.buffer
+    render_manager.set_frame_size(136, 240)
+    assert render_manager.triangles is None
+    animation_manager.set_width(136)
+    animation_manager.set_height(240)
+    render_manager.render_frame(animation_manager.get_frame())
+    assert render_manager.buffer.shape == (240, 136, 3)
+    render_manager.set_frame_size(270, 480)
+    animation_manager.set_width(270)
+    animation_manager.set_height(480)
+    render_manager.render_frame(animation_manager.get_frame())
+    assert render_manager.buffer is original
+
+
+def test_writer_rejects_mismatched_frame(config):
+    class Writer:
+        size = (270, 480)
+
+    render_manager = RenderManager(config, None, "ERROR")
+    render_manager._check_frame_size(Writer, np.zeros((480, 270, 3), dtype=np.uint8))
+    with pytest.raises(ValueError):
+        render_manager._check_frame_size(Writer, np.zeros((240, 136, 3), dtype=np.uint8))
@@ -0,0 +1,38 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from modules.animation_manager import AnimationManager
+from modules.render_manager import RenderManager
+
+
+def _render_scene(config, seed, frames=4):
+    animation_manager = AnimationManager(config)
+    render_manager = RenderManager(config, None, "ERROR")
+    animation_manager.reset(seed)
+    render_manager.reset(seed)
+    render_manager.fill_check = True
+    result = []
+    for _ in range(frames):
+        animation_manager.update_frame()
+        render_manager._draw(animation_manager.get_frame())
+        result.append(render_manager.buffer.copy())
+    return np.stack(result)
+
+
+def test_seeded_scene_ignores_global_random_state(config):
+    random.seed(1)
+    np.random.seed(1)
+    first = _render_scene(config, 11)
+    random.seed(2)
+    np.random.seed(2)
+    np.testing.assert_array_equal(_render_scene(config, 11), first)
+    assert not np.array_equal(_render_scene(config, 12), first)
+
+
+def test_threaded_scenes_match_sequential(config):
+    seeds = [21, 22, 23, 24]
+    sequential = [_render_scene(config, seed) for seed in seeds]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        threaded = list(executor.map(lambda seed: _render_scene(config, seed), seeds))
+    for expected, frames in zip(sequential, threaded):
+        np.testing.assert_array_equal(frames, expected)
@@ -0,0 +1,43 @@
+import json
+import os
+from modules.animation_manager import AnimationManager
+from modules.render_manager import RenderManager
+
+MARKER = b"stale frame"
+
+
+def _export(config, path, hue=0):
+    animation_manager = AnimationManager(config)
+    render_manager = RenderManager(config, None, "ERROR")
+    render_manager.set_hue(hue)
+    render_manager.render_sequence(animation_manager, path, fps=4, duration=1)
+
+
+def _sidecar(tmp_path):
+    with open(tmp_path / "seq.sequence.json", encoding="utf-8") as sidecar:
+        return json.load(sidecar)
+
+
+def test_resume_skips_finished_frames(config, tmp_path):
+    path = str(tmp_path / "seq.png")
+    _export(config, path)
+    assert sorted(os.listdir(tmp_path)) == ["seq.sequence.json"] + [f"seq_{i:06d}.png" for i in range(4)]
+    state = _sidecar(tmp_path)
+    (tmp_path / "seq_000000.png").write_bytes(MARKER)
+    os.remove(tmp_path / "seq_000002.png")
+
+    _export(config, path)
+    assert (tmp_path / "seq_000000.png").read_bytes() == MARKER
+    assert (tmp_path / "seq_000002.png").exists()
+    assert _sidecar(tmp_path)["seed"] == state["seed"]
+
+
+def test_changed_settings_restart_export(config, tmp_path):
+    path = str(tmp_path / "seq.png")
+    _export(config, path)
+    state = _sidecar(tmp_path)
+    (tmp_path / "seq_000000.png").write_bytes(MARKER)
+
+    _export(config, path, hue=120)
+    assert (tmp_path / "seq_000000.png").read_bytes() != MARKER
+    assert _sidecar(tmp_path)["settings_hash"] != state["settings_hash"]
@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+from modules.render_manager import RenderManager
+from modules.utils import hsv_to_rgb, hsv_to_rgb_array
+
+
+def test_vectorized_conversion_matches_scalar():
+    hues = np.arange(0, 361, 7)
+    values = np.arange(0, 101, 9)
+    for s in (0, 35, 100):
+        table = hsv_to_rgb_array(hues[:, None], s, values[None, :])
+        expected = [[hsv_to_rgb(h, s, v) for v in values] for h in hues]
+        np.testing.assert_array_equal(table, np.array(expected, dtype=np.uint8))
+
+
+@pytest.mark.parametrize("setter, value", [("set_hue", 200), ("set_saturation", 40), ("set_brightness", 30)])
+def test_lut_follows_colour_setters(config, setter, value):
+    render_manager = RenderManager(config, None, "ERROR")
+    getattr(render_manager, setter)(value)
+    h, s, v = (render_manager.hsv_color[key] for key in "hsv")
+    for shade in (0, 17, v, 100):
+        assert render_manager._shade_color(shade) == tuple(hsv_to_rgb(h, s, shade))
+    assert render_manager.rgb_color == tuple(hsv_to_rgb(h, s, v))
@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+import textwrap
+from tests.conftest import CONFIG_PATH
+
+
+def _run(script):
+    # Импорты проверяются в чистом процессе: в процессе тестов модули уже могли загрузиться
+    result = subprocess.run([sys.executable, "-c", textwrap.dedent(script)], cwd=os.path.dirname(CONFIG_PATH),
+                            capture_output=True, timeout=120)
+    assert result.returncode == 0, result.stderr.decode(errors="replace")[-2000:]
+    return result.stdout.decode()
+
+
+def test_managers_start_without_heavy_imports():
+    output = _run(f"""
+        import sys
+        from loguru import logger
+        logger.remove()
+        from modules.config_manager import ConfigManager
+        from modules.animation_manager import AnimationManager
+        from modules.render_manager import RenderManager
+        config = ConfigManager({CONFIG_PATH!r}, "ERROR")
+        AnimationManager(config)
+        render_manager = RenderManager(config, None, "ERROR")
+        assert render_manager.buffer is None
+        print(sorted(name for name in ("pygame", "cv2", "PySide6", "modules.frame_writers") if name in sys.modules))
+    """)
+    assert output.strip() == "[]"
+
+
+def test_first_render_allocates_buffer_without_pygame_init():
+    output = _run(f"""
+        from loguru import logger
+        logger.remove()
+        from modules.config_manager import ConfigManager
+        from modules.animation_manager import AnimationManager
+        from modules.render_manager import RenderManager
+        config = ConfigManager({CONFIG_PATH!r}, "ERROR").with_overrides({{"width": 270, "height": 480}})
+        animation_manager = AnimationManager(config)
+        render_manager = RenderManager(config, None, "ERROR")
+        render_manager.render_frame(animation_manager.get_frame())
+        import pygame
+        print(render_manager.buffer.shape, pygame.get_init())
+    """)
+    assert output.strip() == "(480, 270, 3) False"
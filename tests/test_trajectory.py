@@ -0,0 +1,40 @@
+import os
+import numpy as np
+import pytest
+from modules.trajectory import TrajectoryReader, TrajectoryWriter
+
+
+def _frame(count, shift=0.0):
+    vertices = np.arange(count * 2, dtype=np.float32).reshape(-1, 2) + shift
+    return {'vertices': vertices, 'triangles': np.array([[0, 1, 2]], dtype=np.int32)}
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "run.bbtraj")
+    with TrajectoryWriter(path, 270, 480, 30) as writer:
+        writer.append(_frame(3))
+        writer.append(_frame(4, 0.5))
+    reader = TrajectoryReader(path)
+    assert (len(reader), reader.width, reader.height, reader.fps) == (2, 270, 480, 30)
+    np.testing.assert_array_equal(reader.get_frame(1)['vertices'], _frame(4, 0.5)['vertices'])
+    np.testing.assert_array_equal(reader.get_frame(0)['triangles'], [[0, 1, 2]])
+
+
+def test_failed_run_leaves_no_file(tmp_path):
+    path = str(tmp_path / "run.bbtraj")
+    with pytest.raises(RuntimeError):
+        with TrajectoryWriter(path, 270, 480, 30) as writer:
+            writer.append(_frame(3))
+            raise RuntimeError("прерывание симуляции")
+    assert os.listdir(tmp_path) == []
+
+
+def test_empty_trajectory(tmp_path):
+    path = str(tmp_path / "empty.bbtraj")
+    with TrajectoryWriter(path, 270, 480, 30):
+        pass
+    reader = TrajectoryReader(path)
+    assert len(reader) == 0
+    assert list(reader) == []
+    with pytest.raises(IndexError):
+        reader.get_frame(0)
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from modules.triangulation import ScipyDelaunayBackend, TriangleBackend, Triangulator
+
+SQUARE = np.array([[0, 0], [100, 0], [0, 100], [100, 100]], dtype=np.float64)
+SEGMENTS = [[0, 1], [1, 3], [3, 2], [2, 0]]
+
+
+def _scene(count=200, seed=0):
+    interior = np.random.default_rng(seed).uniform(5, 95, (count, 2))
+    return np.vstack([SQUARE, interior])
+
+
+def _edge_set(result):
+    return {tuple(edge) for edge in np.sort(np.asarray(result['edges']), axis=1).tolist()}
+
+
+def test_scipy_backend_returns_mesh_edges():
+    points = _scene()
+    result = ScipyDelaunayBackend().triangulate(points, SEGMENTS, [], edges=True)
+    simplices = result['triangles']
+    expected = {tuple(sorted(pair)) for tri in simplices.tolist() for pair in ((tri[0], tri[1]), (tri[1], tri[2]),
+                                                                                (tri[2], tri[0]))}
+    assert _edge_set(result) == expected
+
+
+def test_named_backend_is_deterministic():
+    points = _scene()
+    first = Triangulator("triangle").triangulate(points, SEGMENTS, [])
+    second = Triangulator("triangle").triangulate(points, SEGMENTS, [])
+    np.testing.assert_array_equal(first['triangles'], second['triangles'])
+
+
+def test_default_backend_is_fixed(config):
+    assert Triangulator().preferred == "triangle"
+    assert config.get_str("GenerationParams", "triangulation_backend") == "triangle"
+
+
+@pytest.mark.skipif(not TriangleBackend.available(), reason="нужен пакет triangle")
+def test_auto_mode_keeps_hole_scenes_on_constrained_backends():
+    points = _scene(50)
+    hole = np.array([[40, 40], [60, 40], [60, 60], [40, 60]], dtype=np.float64)
+    points = np.vstack([points[np.any((points < 38) | (points > 62), axis=1)], hole])
+    loop = np.arange(len(points) - 4, len(points))
+    segments = SEGMENTS + np.column_stack([loop, np.roll(loop, -1)]).tolist()
+    triangulator = Triangulator("auto")
+    # Замер идет только по движкам, соблюдающим контуры; остальные остаются запасными
+    assert triangulator._order(points, segments, [loop])[0] == "triangle"
+    assert triangulator._order(points, segments, [loop])[1:] == [
+        name for name in triangulator.backends if name != "triangle"]
+    assert triangulator.selected == {(int(np.log2(len(points))), True): "triangle"}
+
+
+@pytest.mark.skipif(not ScipyDelaunayBackend.available(), reason="нужен scipy")
+def test_scipy_backend_copies_vertices():
+    points = _scene()
+    result = ScipyDelaunayBackend().triangulate(points, SEGMENTS, [])
+    points[:] += 1
+    assert not np.shares_memory(result['vertices'], points)
+    np.testing.assert_array_equal(result['vertices'], _scene())
+
+
+@pytest.mark.skipif(not ScipyDelaunayBackend.available(), reason="нужен scipy")
+def test_hole_scene_falls_back_to_unconstrained_backend(config, monkeypatch):
+    from modules.animation_manager import AnimationManager
+    from modules.hole_mask import points_in_polygon
+
+    def fail(self, points, segments, hole_loops, edges=False):
+        raise RuntimeError("сбой движка")
+
+    monkeypatch.setattr(TriangleBackend, "triangulate", fail)
+    animation_manager = AnimationManager(config)
+    assert animation_manager.holes_check
+    animation_manager.update_frame()
+    frame = animation_manager.get_frame()
+    assert len(frame['triangles']) > 0
+    centroids = np.asarray(frame['vertices'])[np.asarray(frame['triangles'])].mean(axis=1)
+    for polygon in animation_manager._hole_polygons():
+        assert not points_in_polygon(centroids, polygon).any()
@@ -0,0 +1,52 @@
+import re
+import zlib
+import xml.etree.ElementTree as ElementTree
+import pytest
+from modules.animation_manager import AnimationManager
+from modules.render_manager import RenderManager
+from modules.vector_export import pdf_document, svg_document, write_vector
+
+
+@pytest.fixture
+def scene(config):
+    animation_manager = AnimationManager(config)
+    animation_manager.reset(8)
+    render_manager = RenderManager(config, None, "ERROR")
+    render_manager.reset(8)
+    render_manager.fill_check = True
+    triangles = animation_manager.get_frame()
+    return render_manager.vector_scene(triangles), len(triangles['triangles'])
+
+
+def test_svg_has_one_path_per_layer(scene):
+    scene, triangle_count = scene
+    root = ElementTree.fromstring(svg_document(scene))
+    assert root.get("viewBox") == f"0 0 {scene['width']} {scene['height']}"
+    paths = root.findall("{http://www.w3.org/2000/svg}path")
+    assert len(paths) == len(scene["layers"])
+    fills = [path for path in paths if path.get("fill") != "none"]
+    assert sum(path.get("d").count("Z") for path in fills) == triangle_count
+
+
+def test_pdf_structure_and_content(scene):
+    scene, triangle_count = scene
+    document = pdf_document(scene)
+    # Смещения в таблице xref указывают на начала объектов
+    xref = int(re.search(rb"startxref\n(\d+)", document).group(1))
+    offsets = [int(offset) for offset in re.findall(rb"(\d{10}) 00000 n", document[xref:])]
+    for number, offset in enumerate(offsets, start=1):
+        assert document[offset:].startswith(f"{number} 0 obj".encode("ascii"))
+    stream = re.search(rb"stream\n(.*)\nendstream", document, re.S).group(1)
+    content = zlib.decompress(stream).decode("ascii")
+    assert content.count(" h\n") == triangle_count
+
+
+def test_vector_files_are_written_by_extension(scene, tmp_path):
+    scene, _ = scene
+    write_vector(str(tmp_path / "frame.svg"), scene)
+    write_vector(str(tmp_path / "frame.pdf"), scene)
+    assert (tmp_path / "frame.svg").read_bytes().startswith(b"<?xml")
+    assert (tmp_path / "frame.pdf").read_bytes().startswith(b"%PDF-1.4")
+    with pytest.raises(ValueError):
+        write_vector(str(tmp_path / "frame.eps"), scene)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["frame.pdf", "frame.svg"]